@@ -0,0 +1,168 @@
+"""Summarize close approaches in groups, by year, by month, by NEO, or by hazard flag.
+
+The `aggregate_approaches` function counts the close approaches that match a
+collection of filters (from `create_filters`) in each group, along with the
+minimum, mean, and maximum of their distances and velocities. It returns a list
+of rows - one dictionary per group, with the keys in `fieldnames(by)` - in
+order of the group.
+
+The statistics are gathered by `summarize` in a single streaming pass over the
+matching close approaches, keeping a running total for each group, so the
+matches are never all held in memory at once. When the database has a
+columnar store, `summarize_columns` instead computes them as a handful of
+vectorized operations over the columns of the matches (except by NEO, since
+the store doesn't hold the NEO of each close approach).
+
+The main module calls `aggregate_approaches` for the `aggregate` subcommand,
+and writes the rows with `write_table_to_csv` or `write_table_to_json`.
+"""
+import datetime
+import functools
+
+from columnar import numpy
+from helpers import DATE_CACHE_SIZE, EPOCH, MINUTES_PER_DAY
+
+
+# The proleptic Gregorian ordinal of the Unix epoch, to turn days since the epoch into dates.
+EPOCH_ORDINAL = EPOCH.toordinal()
+
+# The attributes by which close approaches can be grouped.
+GROUPS = ('year', 'month', 'neo', 'hazardous')
+
+# The statistics of each group, in order.
+SUMMARY_FIELDS = ('count',
+                  'distance_min', 'distance_mean', 'distance_max',
+                  'velocity_min', 'velocity_mean', 'velocity_max')
+
+
+def fieldnames(by):
+    """Return the names of the fields of the rows of a summary grouped by an attribute."""
+    return (by,) + SUMMARY_FIELDS
+
+
+def aggregate_approaches(database, filters=(), by='year'):
+    """Summarize the close approaches that match a collection of filters, in groups.
+
+    :param database: The `NEODatabase` to query.
+    :param filters: A collection of filters capturing user-specified criteria.
+    :param by: The attribute by which to group the close approaches, one of `GROUPS`.
+    :return: A list of dictionaries, one per group, with the keys in `fieldnames(by)`.
+    """
+    if by not in GROUPS:
+        raise ValueError(f"Can't group close approaches by {by!r}.")
+    if by != 'neo':
+        selection = database.select_columns(filters)
+        if selection is not None:
+            return summarize_columns(*selection, by=by)
+    return summarize(database.query(filters), by)
+
+
+def summarize(approaches, by='year'):
+    """Summarize a stream of close approaches in groups, in one pass.
+
+    :param approaches: An iterable of `CloseApproach` objects.
+    :param by: The attribute by which to group the close approaches, one of `GROUPS`.
+    :return: A list of dictionaries, one per group, with the keys in `fieldnames(by)`.
+    """
+    key = GROUP_KEYS[by]
+    groups = {}
+    for approach in approaches:
+        group = key(approach)
+        distance, velocity = approach.distance, approach.velocity
+        stats = groups.get(group)
+        if stats is None:
+            groups[group] = [1, distance, distance, distance, velocity, velocity, velocity]
+            continue
+        stats[0] += 1
+        if distance < stats[1]:
+            stats[1] = distance
+        stats[2] += distance
+        if distance > stats[3]:
+            stats[3] = distance
+        if velocity < stats[4]:
+            stats[4] = velocity
+        stats[5] += velocity
+        if velocity > stats[6]:
+            stats[6] = velocity
+
+    fields = fieldnames(by)
+    rows = []
+    for group in sorted(groups):
+        stats = groups[group]
+        count = stats[0]
+        rows.append(dict(zip(fields, (group, count,
+                                      stats[1], stats[2] / count, stats[3],
+                                      stats[4], stats[5] / count, stats[6]))))
+    return rows
+
+
+def summarize_columns(store, positions, by='year'):
+    """Summarize the close approaches at some positions of a columnar store in groups.
+
+    The positions are grouped with `numpy.unique`, and then ordered by group,
+    so that the statistics of each group can be reduced over a contiguous slice.
+
+    :param store: A `ColumnarStore`.
+    :param positions: An array of positions in the store.
+    :param by: The attribute by which to group the close approaches: 'year', 'month', or 'hazardous'.
+    :return: A list of dictionaries, one per group, with the keys in `fieldnames(by)`.
+    """
+    if by == 'hazardous':
+        keys = store.hazardous[positions]
+        label = bool
+    elif by in ('year', 'month'):
+        # Count whole years or months since the Unix epoch.
+        keys = store.day[positions].astype('datetime64[D]').astype(f'datetime64[{by[0].upper()}]')
+        keys = keys.astype(numpy.int64)
+        label = _year_label if by == 'year' else _month_label
+    else:
+        raise ValueError(f"Can't group the columns of close approaches by {by!r}.")
+    if not len(keys):
+        return []
+
+    groups, inverse = numpy.unique(keys, return_inverse=True)
+    order = numpy.argsort(inverse, kind='stable')
+    counts = numpy.bincount(inverse, minlength=len(groups))
+    starts = numpy.concatenate(([0], numpy.cumsum(counts)[:-1]))
+    columns = [groups.tolist(), counts.tolist()]
+    for values in (store.distance, store.velocity):
+        values = values[positions][order]
+        columns.append(numpy.minimum.reduceat(values, starts).tolist())
+        columns.append((numpy.add.reduceat(values, starts) / counts).tolist())
+        columns.append(numpy.maximum.reduceat(values, starts).tolist())
+
+    fields = fieldnames(by)
+    return [dict(zip(fields, (label(group), *stats))) for group, *stats in zip(*columns)]
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def _year_of(day):
+    """Return the year of a date, in whole days since the Unix epoch."""
+    return datetime.date.fromordinal(EPOCH_ORDINAL + day).year
+
+
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def _month_of(day):
+    """Return the month of a date, in whole days since the Unix epoch, as a 'YYYY-MM' string."""
+    date = datetime.date.fromordinal(EPOCH_ORDINAL + day)
+    return f'{date.year:04}-{date.month:02}'
+
+
+def _year_label(years):
+    """Return the year that is a number of whole years after the Unix epoch."""
+    return 1970 + years
+
+
+def _month_label(months):
+    """Return the month that is a number of whole months after the Unix epoch, as a 'YYYY-MM' string."""
+    year, month = divmod(months, 12)
+    return f'{1970 + year:04}-{month + 1:02}'
+
+
+# How to get the group of a close approach, by each attribute in `GROUPS`.
+GROUP_KEYS = {
+    'year': lambda approach: _year_of(approach.minutes // MINUTES_PER_DAY),
+    'month': lambda approach: _month_of(approach.minutes // MINUTES_PER_DAY),
+    'neo': lambda approach: approach.neo.designation if approach.neo else approach._designation,
+    'hazardous': lambda approach: bool(approach.neo and approach.neo.hazardous),
+}
@@ -0,0 +1,5 @@
+"""Let Python know that the `benchmarks/` folder is a package.
+
+Each `bench_*` module is a standalone script, meant to be run from the project
+root with `python3 -m benchmarks.<module>`. They are not collected as tests.
+"""
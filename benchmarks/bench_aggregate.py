@@ -0,0 +1,37 @@
+"""Benchmark summarizing close approaches in groups, in a streaming pass or with a columnar store.
+
+This benchmark builds an `NEODatabase` (with and without a columnar store) from
+a synthetic data set that is twenty times larger than the data set, and times
+`aggregate_approaches` over every close approach, grouped by each attribute.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_aggregate
+"""
+import tempfile
+
+from aggregate import GROUPS, aggregate_approaches
+from cache import build_database
+from columnar import numpy
+
+from benchmarks.common import data_files, scale_dataset, timed, report
+
+
+def main():
+    neofile, cadfile = data_files()
+    with tempfile.TemporaryDirectory() as directory:
+        scaled = scale_dataset(neofile, cadfile, 20, directory)
+        databases = {'streaming': build_database(*scaled)}
+        if numpy is not None:
+            databases['columnar'] = build_database(*scaled, columnar=True)
+    count = len(databases['streaming']._approaches)
+
+    print(f"Synthetic data set (20x), {count:,} close approaches:")
+    for by in GROUPS:
+        for name, database in databases.items():
+            rows, elapsed = timed(aggregate_approaches, database, (), by)
+            report(f"  by {by}, {name} ({len(rows):,} groups)", elapsed, count, 'approaches')
+
+
+if __name__ == '__main__':
+    main()
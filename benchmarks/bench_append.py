@@ -0,0 +1,63 @@
+"""Benchmark adding daily deltas of close approaches to an `NEODatabase`.
+
+This benchmark splits a synthetic data set, twenty times larger than the data
+set, into an initial database and thirty daily deltas, each holding a random
+0.1% of the close approaches (at any time). It times adding each delta with
+`add_approaches` against rebuilding the database from scratch, and then times a
+query over the runs of the time index that the deltas leave behind against the
+same query after a rebuild.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_append
+"""
+import random
+import tempfile
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+
+from benchmarks.common import data_files, scale_dataset, timed, report
+
+
+DAYS = 30
+
+
+def main():
+    neofile, cadfile = data_files()
+    with tempfile.TemporaryDirectory() as directory:
+        neofile, cadfile = scale_dataset(neofile, cadfile, 20, directory)
+        neos = load_neos(neofile)
+        approaches = load_approaches(cadfile)
+
+    random.Random(2020).shuffle(approaches)
+    size = len(approaches) // 1000
+    initial, deltas = approaches[:-DAYS * size], approaches[-DAYS * size:]
+    database = NEODatabase(neos, list(initial))
+    print(f"Synthetic data set (20x), {len(initial):,} close approaches "
+          f"and {DAYS} deltas of {size:,}:")
+
+    total = 0.0
+    for day in range(DAYS):
+        _, elapsed = timed(database.add_approaches, deltas[day * size:(day + 1) * size])
+        total += elapsed
+    report(f"  add_approaches, per delta (mean of {DAYS})", total / DAYS, size, 'approaches')
+    print(f"    runs of the time index: {[len(order) for order, _ in database._time_runs]}")
+
+    for neo in neos:
+        neo.approaches = []
+    for approach in approaches:
+        approach.neo = None
+    rebuilt, elapsed = timed(NEODatabase, neos, list(database._approaches))
+    report("  rebuild (NEODatabase constructor)", elapsed, len(approaches), 'approaches')
+
+    filters = create_filters(distance_max=0.1, velocity_min=10)
+    results, elapsed = timed(lambda: list(database.query(filters)))
+    report(f"  query after the deltas ({len(results):,} matches)", elapsed)
+    _, elapsed = timed(lambda: list(rebuilt.query(filters)))
+    report("  query after a rebuild", elapsed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark opening a compiled dataset of close approaches.
+
+This benchmark compiles the data set, and a synthetic data set that is ten times
+larger, and times how long it takes to open each as an `NEODatabase` (not
+counting the time to load the NEOs) and to run a narrow date query on it,
+compared to building the `NEODatabase` from the JSON file.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_compiled
+"""
+import datetime
+import pathlib
+import tempfile
+
+from compiled import compile_dataset, open_compiled
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+
+from benchmarks.common import data_files, scale_dataset, timed, report
+
+
+def open_json(neos, cadfile):
+    """Build an `NEODatabase` from a JSON file of close approaches."""
+    return NEODatabase(neos, load_approaches(cadfile))
+
+
+def open_compiled_database(neos, neofile, directory):
+    """Open an `NEODatabase` on a compiled dataset."""
+    return NEODatabase(neos, open_compiled(directory, neofile, neos))
+
+
+def benchmark_open(label, neofile, cadfile, directory):
+    """Time opening the JSON file and the compiled dataset, and querying each."""
+    compile_dataset(neofile, cadfile, directory)
+    filters = create_filters(date=datetime.date(2020, 3, 2))
+
+    print(f"{label}:")
+    database, elapsed = timed(open_json, load_neos(neofile), cadfile)
+    report("  open from JSON", elapsed)
+    matches, elapsed = timed(lambda: list(database.query(filters)))
+    report(f"  query one date ({len(matches)} matches)", elapsed)
+
+    database, elapsed = timed(open_compiled_database, load_neos(neofile), neofile, directory)
+    report("  open compiled dataset", elapsed)
+    matches, elapsed = timed(lambda: list(database.query(filters)))
+    report(f"  query one date ({len(matches)} matches)", elapsed)
+
+
+def main():
+    neofile, cadfile = data_files()
+    with tempfile.TemporaryDirectory() as directory:
+        directory = pathlib.Path(directory)
+        benchmark_open("Data set", neofile, cadfile, directory / 'cad.compiled')
+
+        scaled_neofile, scaled_cadfile = scale_dataset(neofile, cadfile, 10, directory)
+        benchmark_open("Synthetic data set (10x)", scaled_neofile, scaled_cadfile,
+                       directory / 'cad-x10.compiled')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""Benchmark diameter queries answered with the diameter index, or by scanning every close approach.
+
+This benchmark builds an `NEODatabase` (with and without a columnar store) from
+a synthetic data set that is twenty times larger than the data set, and times
+queries over ranges of diameters of decreasing width, with the diameter index
+and with it disabled (so that every close approach is checked).
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_diameter_index
+"""
+import tempfile
+import unittest.mock
+
+import database
+from cache import build_database
+from columnar import numpy
+from filters import create_filters
+
+from benchmarks.common import data_files, scale_dataset, timed, report
+
+
+RANGES = [(0.1, None), (1.0, None), (1.0, 2.0), (5.0, 5.5), (None, 0.01)]
+
+
+def main():
+    neofile, cadfile = data_files()
+    with tempfile.TemporaryDirectory() as directory:
+        scaled = scale_dataset(neofile, cadfile, 20, directory)
+        databases = {'objects': build_database(*scaled)}
+        if numpy is not None:
+            databases['columnar'] = build_database(*scaled, columnar=True)
+    count = len(databases['objects']._approaches)
+
+    print(f"Synthetic data set (20x), {count:,} close approaches:")
+    for diameter_min, diameter_max in RANGES:
+        filters = create_filters(diameter_min=diameter_min, diameter_max=diameter_max)
+        for name, neo_database in databases.items():
+            matches, elapsed = timed(lambda: sum(1 for _ in neo_database.select(filters)))
+            with unittest.mock.patch.object(database, 'DIAMETER_INDEX_FRACTION', 0), \
+                    unittest.mock.patch.object(database, 'COLUMNAR_DIAMETER_INDEX_FRACTION', 0):
+                scanned, scan_elapsed = timed(lambda: sum(1 for _ in neo_database.select(filters)))
+            assert matches == scanned
+            label = f"  diameter in [{diameter_min}, {diameter_max}], {name} ({matches:,} matches)"
+            report(f"{label}: index", elapsed, count, 'approaches')
+            report(f"{label}: scan", scan_elapsed, count, 'approaches')
+
+
+if __name__ == '__main__':
+    main()
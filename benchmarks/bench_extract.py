@@ -0,0 +1,50 @@
+"""Benchmark extracting NEOs from the CSV data file.
+
+This benchmark compares `load_neos` against a baseline that reads each row into
+a dict with `csv.DictReader`, copies the fields of interest into another dict,
+and only builds the `NearEarthObject`s once the whole file has been read.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_extract
+"""
+import csv
+import tempfile
+
+from extract import load_neos
+from models import NearEarthObject
+
+from benchmarks.common import data_files, scale_dataset, timed, report
+
+
+def load_neos_with_dictreader(neo_csv_path):
+    """Read NEOs by way of a dict per row, as a baseline."""
+    with open(neo_csv_path) as csv_file:
+        rows = [dict(designation=row['pdes'], name=row['name'],
+                     diameter=row['diameter'], hazardous=row['pha'])
+                for row in csv.DictReader(csv_file)]
+    return [NearEarthObject(**row) for row in rows]
+
+
+def benchmark_neos(label, neofile):
+    """Time the baseline and `load_neos` on a CSV file of NEOs."""
+    neos, baseline = timed(load_neos_with_dictreader, neofile)
+    _, elapsed = timed(load_neos, neofile)
+
+    print(f"{label}: {len(neos):,} NEOs")
+    report("  csv.DictReader baseline", baseline, len(neos), 'NEOs')
+    report("  load_neos", elapsed, len(neos), 'NEOs')
+    print(f"  speedup: {baseline / elapsed:.1f}x")
+
+
+def main():
+    neofile, cadfile = data_files()
+    benchmark_neos("Data set", neofile)
+
+    with tempfile.TemporaryDirectory() as directory:
+        scaled_neofile, _ = scale_dataset(neofile, cadfile, 10, directory)
+        benchmark_neos("Synthetic data set (10x)", scaled_neofile)
+
+
+if __name__ == '__main__':
+    main()
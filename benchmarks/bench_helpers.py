@@ -0,0 +1,40 @@
+"""Benchmark converting NASA-formatted calendar dates to and from datetimes.
+
+This benchmark parses the `cd` field of every close approach with
+`cd_to_datetime` and with `datetime.strptime`, and formats each result with
+`datetime_to_str` and with `datetime.strftime`.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_helpers
+"""
+import datetime
+import json
+
+from helpers import cd_to_datetime, datetime_to_str
+
+from benchmarks.common import data_files, timed, report
+
+
+def main():
+    _, cadfile = data_files()
+    with open(cadfile) as infile:
+        calendar_dates = [row[3] for row in json.load(infile)['data']]
+    count = len(calendar_dates)
+    print(f"{count:,} calendar dates:")
+
+    _, elapsed = timed(lambda: [datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
+                                for calendar_date in calendar_dates])
+    report("  datetime.strptime", elapsed, count, 'dates')
+    datetimes, elapsed = timed(lambda: [cd_to_datetime(calendar_date)
+                                        for calendar_date in calendar_dates])
+    report("  cd_to_datetime", elapsed, count, 'dates')
+
+    _, elapsed = timed(lambda: [dt.strftime("%Y-%m-%d %H:%M") for dt in datetimes])
+    report("  datetime.strftime", elapsed, count, 'datetimes')
+    _, elapsed = timed(lambda: [datetime_to_str(dt) for dt in datetimes])
+    report("  datetime_to_str", elapsed, count, 'datetimes')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Benchmark how long it takes to start up an `NEODatabase`.
+
+Startup consists of extracting NEOs and close approaches from the data files and
+then linking them together in the `NEODatabase` constructor. This benchmark
+times each of those steps on the data set and on a synthetic data set that is
+ten times larger.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_link
+"""
+import tempfile
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+
+from benchmarks.common import data_files, scale_dataset, timed, report
+
+
+def benchmark_startup(label, neofile, cadfile):
+    """Time the extraction and linking steps of starting up an `NEODatabase`."""
+    neos, neo_time = timed(load_neos, neofile)
+    approaches, cad_time = timed(load_approaches, cadfile)
+    _, link_time = timed(NEODatabase, neos, approaches)
+
+    print(f"{label}: {len(neos):,} NEOs, {len(approaches):,} close approaches")
+    report("  load_neos", neo_time, len(neos), 'NEOs')
+    report("  load_approaches", cad_time, len(approaches), 'approaches')
+    report("  link (NEODatabase constructor)", link_time, len(approaches), 'approaches')
+
+
+def main():
+    neofile, cadfile = data_files()
+    benchmark_startup("Data set", neofile, cadfile)
+
+    with tempfile.TemporaryDirectory() as directory:
+        scaled_neofile, scaled_cadfile = scale_dataset(neofile, cadfile, 10, directory)
+        benchmark_startup("Synthetic data set (10x)", scaled_neofile, scaled_cadfile)
+
+
+if __name__ == '__main__':
+    main()
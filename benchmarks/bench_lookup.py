@@ -0,0 +1,45 @@
+"""Benchmark fetching NEOs by primary designation and by name.
+
+This benchmark performs 100,000 lookups of each kind against an `NEODatabase`
+built from the data set, cycling through every designation and name in the data
+set along with a sprinkling of misses.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_lookup
+"""
+import itertools
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+
+from benchmarks.common import data_files, timed, report
+
+
+LOOKUPS = 100_000
+
+
+def run_lookups(method, keys):
+    """Call `method` on each of `keys`, returning the number of hits."""
+    return sum(1 for key in keys if method(key) is not None)
+
+
+def main():
+    neofile, cadfile = data_files()
+    neos = load_neos(neofile)
+    database = NEODatabase(neos, load_approaches(cadfile))
+
+    designations = [neo.designation for neo in neos] + ['not a designation']
+    names = [neo.name for neo in neos if neo.name] + ['not a name']
+
+    keys = list(itertools.islice(itertools.cycle(designations), LOOKUPS))
+    hits, elapsed = timed(run_lookups, database.get_neo_by_designation, keys)
+    report(f"get_neo_by_designation ({hits:,} hits)", elapsed, LOOKUPS, 'lookups')
+
+    keys = list(itertools.islice(itertools.cycle(names), LOOKUPS))
+    hits, elapsed = timed(run_lookups, database.get_neo_by_name, keys)
+    report(f"get_neo_by_name ({hits:,} hits)", elapsed, LOOKUPS, 'lookups')
+
+
+if __name__ == '__main__':
+    main()
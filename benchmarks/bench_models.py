@@ -0,0 +1,89 @@
+"""Benchmark the memory footprint and construction speed of the models.
+
+This benchmark builds a `NearEarthObject` for every row of the NEO file and a
+`CloseApproach` for every record of the close approach file, from fields that
+have already been read, and reports the memory used per object and the number
+of objects built per second. As a baseline, it does the same with the earlier,
+`__dict__`-based versions of the models, which set each attribute in a loop over
+keyword arguments.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_models
+"""
+import csv
+import json
+import tracemalloc
+
+from helpers import cd_to_datetime
+from models import NearEarthObject, CloseApproach
+
+from benchmarks.common import data_files, timed, report
+
+
+class DictNearEarthObject:
+    """The earlier `NearEarthObject`, with a per-instance `__dict__`."""
+    def __init__(self, **info):
+        self.approaches = []
+        for key, value in info.items():
+            if key == 'name' and value == '':
+                setattr(self, key, None)
+            elif key == 'diameter':
+                setattr(self, key, float('nan') if value == '' else float(value))
+            elif key == 'hazardous':
+                setattr(self, key, value == 'Y')
+            else:
+                setattr(self, key, value)
+
+
+class DictCloseApproach:
+    """The earlier `CloseApproach`, with a per-instance `__dict__`."""
+    def __init__(self, **info):
+        self.time = None
+        self.neo = None
+        for key, value in info.items():
+            if key == 'time':
+                setattr(self, key, cd_to_datetime(value) if value else None)
+            elif key in ('distance', 'velocity'):
+                setattr(self, key, float(value) if value else 0.0)
+            else:
+                setattr(self, key, value)
+
+
+def build(cls, rows):
+    """Build an object of a class from the keyword arguments in each row."""
+    return [cls(**row) for row in rows]
+
+
+def measure(label, cls, rows):
+    """Report the memory per object and the objects built per second for a class."""
+    tracemalloc.start()
+    objects = build(cls, rows)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objects
+
+    _, elapsed = timed(build, cls, rows)
+    report(f"  {label} ({size / len(rows):,.0f} bytes/object)", elapsed, len(rows), 'objects')
+
+
+def main():
+    neofile, cadfile = data_files()
+    with open(neofile) as infile:
+        neo_rows = [dict(designation=row['pdes'], name=row['name'],
+                         diameter=row['diameter'], hazardous=row['pha'])
+                    for row in csv.DictReader(infile)]
+    with open(cadfile) as infile:
+        cad_rows = [dict(_designation=row[0], time=row[3], distance=row[4], velocity=row[7])
+                    for row in json.load(infile)['data']]
+
+    print(f"{len(neo_rows):,} NEOs:")
+    measure("__dict__ NearEarthObject", DictNearEarthObject, neo_rows)
+    measure("__slots__ NearEarthObject", NearEarthObject, neo_rows)
+    print(f"{len(cad_rows):,} close approaches:")
+    measure("__dict__ CloseApproach", DictCloseApproach, cad_rows)
+    measure("__slots__ CloseApproach", CloseApproach, cad_rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Benchmark parsing the close approach data in chunks across worker processes.
+
+This benchmark writes a synthetic data set that is twenty times larger than
+the data set, and times `load_approaches_in_parallel` on it with 1, 2, 4, ...
+worker processes, up to the number of CPUs, against `load_approaches`.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_parallel_extract
+"""
+import os
+import tempfile
+
+from extract import load_approaches
+from parallel import load_approaches_in_parallel
+
+from benchmarks.common import data_files, scale_dataset, timed, report
+
+
+def worker_counts():
+    """Return the worker counts to benchmark: powers of two, up to and including the number of CPUs."""
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 < cpus:
+        counts.append(counts[-1] * 2)
+    return sorted({*counts, cpus, 2})
+
+
+def main():
+    neofile, cadfile = data_files()
+    with tempfile.TemporaryDirectory() as directory:
+        _, scaled_cadfile = scale_dataset(neofile, cadfile, 20, directory)
+
+        approaches, serial = timed(load_approaches, scaled_cadfile)
+        count = len(approaches)
+        del approaches
+        print(f"Synthetic data set (20x), {count:,} close approaches on {os.cpu_count()} CPU(s):")
+        report("  load_approaches", serial, count, 'approaches')
+
+        for workers in worker_counts():
+            _, elapsed = timed(load_approaches_in_parallel, scaled_cadfile, workers=workers)
+            report(f"  load_approaches_in_parallel ({workers} workers)", elapsed, count, 'approaches')
+            print(f"    speedup: {serial / elapsed:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Benchmark loading the data files one after the other and concurrently.
+
+This benchmark builds an `NEODatabase` from the data set, and from a synthetic
+data set that is ten times larger, first loading the data files one after the
+other and then loading them at the same time in worker processes. The timeline
+of each concurrent load shows how the workers overlapped.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_parallel_load
+"""
+import tempfile
+
+from cache import build_database
+from parallel import LoadTimings
+
+from benchmarks.common import data_files, scale_dataset, timed, report
+
+
+def benchmark_load(label, neofile, cadfile):
+    """Time building an `NEODatabase` with serial and with concurrent loading."""
+    _, serial = timed(build_database, neofile, cadfile)
+    timings = LoadTimings()
+    _, concurrent = timed(build_database, neofile, cadfile, parallel=True, timings=timings)
+
+    print(f"{label}:")
+    report("  serial load", serial)
+    report("  concurrent load", concurrent)
+    print(f"  speedup: {serial / concurrent:.2f}x")
+    print('\n'.join(f"    {line}" for line in str(timings).splitlines()))
+
+
+def main():
+    neofile, cadfile = data_files()
+    benchmark_load("Data set", neofile, cadfile)
+    with tempfile.TemporaryDirectory() as directory:
+        scaled_neofile, scaled_cadfile = scale_dataset(neofile, cadfile, 10, directory)
+        benchmark_load("Synthetic data set (10x)", scaled_neofile, scaled_cadfile)
+
+
+if __name__ == '__main__':
+    main()
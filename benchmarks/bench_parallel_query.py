@@ -0,0 +1,42 @@
+"""Benchmark evaluating a wide query in parallel worker processes.
+
+This benchmark builds an `NEODatabase` from a synthetic data set that is twenty
+times larger than the data set, and times a query with no date bounds (so that
+every close approach must be checked) in this process and with 2, 4, ...
+worker processes, up to the number of CPUs.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_parallel_query
+"""
+import os
+import tempfile
+
+from cache import build_database
+from filters import create_filters
+
+from benchmarks.bench_parallel_extract import worker_counts
+from benchmarks.common import data_files, scale_dataset, timed, report
+
+
+def main():
+    neofile, cadfile = data_files()
+    with tempfile.TemporaryDirectory() as directory:
+        database = build_database(*scale_dataset(neofile, cadfile, 20, directory))
+    filters = create_filters(distance_max=0.3, velocity_min=10, diameter_max=1.0, hazardous=False)
+    count = len(database._approaches)
+
+    print(f"Synthetic data set (20x), {count:,} close approaches on {os.cpu_count()} CPU(s):")
+    results, serial = timed(lambda: list(database.query(filters)))
+    report(f"  serial query ({len(results):,} matches)", serial, count, 'approaches')
+    for workers in worker_counts():
+        if workers == 1:
+            continue
+        parallel_results, elapsed = timed(lambda: list(database.query(filters, workers=workers)))
+        assert parallel_results == results
+        report(f"  parallel query ({workers} workers)", elapsed, count, 'approaches')
+        print(f"    speedup: {serial / elapsed:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Benchmark answering a repeated query from a `QueryCache`.
+
+This benchmark builds an `NEODatabase` from a synthetic data set that is twenty
+times larger than the data set, and times a wide query (with no date bounds)
+when it is first evaluated, when it is answered again from the cache, and when
+a smaller page of its results is answered from the cache.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_query_cache
+"""
+import tempfile
+
+from cache import build_database
+from filters import create_filters
+from querycache import QueryCache
+
+from benchmarks.common import data_files, scale_dataset, timed, report
+
+
+def main():
+    neofile, cadfile = data_files()
+    with tempfile.TemporaryDirectory() as directory:
+        database = build_database(*scale_dataset(neofile, cadfile, 20, directory))
+    filters = create_filters(distance_max=0.3, velocity_min=10, diameter_max=1.0, hazardous=False)
+    cache = QueryCache()
+
+    results, elapsed = timed(lambda: list(cache.query(database, filters)))
+    report(f"first query ({len(results):,} matches)", elapsed, len(results), 'matches')
+    _, elapsed = timed(lambda: list(cache.query(database, filters)))
+    report("repeated query, from the cache", elapsed, len(results), 'matches')
+    _, elapsed = timed(lambda: list(cache.query(database, filters, limit=10)))
+    report("repeated query with --limit 10, from the cache", elapsed)
+    print(cache)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Benchmark selecting the first few query results by an attribute, with a heap or a full sort.
+
+This benchmark builds an `NEODatabase` from a synthetic data set that is twenty
+times larger than the data set, and selects the first `k` matches of a wide
+query by distance, with `sort_results` (a bounded heap) and by sorting all of
+the matches. It reports the time taken and the peak memory allocated while
+selecting, for a few values of `k`.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_sort
+"""
+import operator
+import tempfile
+import tracemalloc
+
+from cache import build_database
+from filters import create_filters, sort_results
+
+from benchmarks.common import data_files, scale_dataset, timed, report
+
+
+def full_sort(results, n):
+    """Select the first `n` close approaches by distance by sorting all of them."""
+    return sorted(results, key=operator.attrgetter('distance'))[:n]
+
+
+def peak_memory(func, *args):
+    """Return the peak memory allocated while calling `func(*args)`, in KiB."""
+    tracemalloc.start()
+    try:
+        list(func(*args))
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    neofile, cadfile = data_files()
+    with tempfile.TemporaryDirectory() as directory:
+        database = build_database(*scale_dataset(neofile, cadfile, 20, directory))
+    filters = create_filters(velocity_min=5)
+    count = sum(1 for _ in database.query(filters))
+
+    print(f"Synthetic data set (20x), {count:,} matches to select from:")
+    _, elapsed = timed(lambda: sum(1 for _ in database.query(filters)))
+    report("  query alone, for reference", elapsed, count, 'matches')
+    for n in (10, 100, 1000, count):
+        heap = lambda: list(sort_results(database.query(filters), 'distance', n=n))
+        ordered = lambda: full_sort(database.query(filters), n)
+        assert heap() == ordered()
+        _, elapsed = timed(heap)
+        report(f"  k={n:,}: heap (sort_results) "
+               f"[peak {peak_memory(heap):,.0f} KiB]", elapsed, count, 'matches')
+        _, elapsed = timed(ordered)
+        report(f"  k={n:,}: full sort "
+               f"[peak {peak_memory(ordered):,.0f} KiB]", elapsed, count, 'matches')
+
+
+if __name__ == '__main__':
+    main()
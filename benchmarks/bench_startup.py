@@ -0,0 +1,41 @@
+"""Benchmark cold and warm startup of an `NEODatabase`.
+
+A cold start builds the database from the data files (and saves a snapshot of
+it), while a warm start loads that snapshot. This benchmark times both on the
+data set and on a synthetic data set that is ten times larger.
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_startup
+"""
+import pathlib
+import tempfile
+
+from cache import load_database
+
+from benchmarks.common import data_files, scale_dataset, timed, report
+
+
+def benchmark_startup(label, neofile, cadfile, cache_root):
+    """Time a cold and a warm start of an `NEODatabase`."""
+    _, cold = timed(load_database, neofile, cadfile, cache_root=cache_root, rebuild=True)
+    _, warm = timed(load_database, neofile, cadfile, cache_root=cache_root)
+
+    print(f"{label}:")
+    report("  cold start (build and save snapshot)", cold)
+    report("  warm start (load snapshot)", warm)
+    print(f"  speedup: {cold / warm:.1f}x")
+
+
+def main():
+    neofile, cadfile = data_files()
+    with tempfile.TemporaryDirectory() as directory:
+        cache_root = pathlib.Path(directory) / 'cache'
+        benchmark_startup("Data set", neofile, cadfile, cache_root)
+
+        scaled_neofile, scaled_cadfile = scale_dataset(neofile, cadfile, 10, directory)
+        benchmark_startup("Synthetic data set (10x)", scaled_neofile, scaled_cadfile, cache_root)
+
+
+if __name__ == '__main__':
+    main()
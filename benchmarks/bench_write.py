@@ -0,0 +1,94 @@
+"""Benchmark writing query results to output files.
+
+This benchmark builds an `NEODatabase` from a synthetic data set that is ten
+times larger than the data set, and writes every close approach to a file with
+each writer, reporting the throughput and the peak memory allocated while
+writing. As baselines, it does the same with the earlier `write_to_csv`, which
+wrote each row as a dictionary through a `csv.DictWriter`, and the earlier
+`write_to_json`, which collected every result before dumping the whole list at
+once (and printed each NEO along the way, which here goes to `os.devnull`).
+
+To run this benchmark from the project root, run::
+
+    $ python3 -m benchmarks.bench_write
+"""
+import contextlib
+import csv
+import json
+import os
+import pathlib
+import tempfile
+import tracemalloc
+
+from cache import build_database
+from helpers import datetime_to_str
+from write import write_to_csv, write_to_json, write_to_ndjson, write_to_sqlite
+
+from benchmarks.common import data_files, scale_dataset, timed, report
+
+
+def dict_write_to_csv(results, filename):
+    """The earlier `write_to_csv`, which writes each row as a dictionary (without the NEO's fields)."""
+    field_names = {'time': 'datetime_utc', 'distance': 'distance_au', 'velocity': 'velocity_km_s',
+                   '_designation': 'designation', 'name': 'name', 'diameter': 'diameter_km',
+                   'hazardous': 'potentially_hazardous'}
+    with open(filename, 'w', newline='') as csv_outfile:
+        writer = csv.DictWriter(csv_outfile, fieldnames=field_names, extrasaction='ignore')
+        writer.writerow(field_names)
+        for elem in results:
+            writer.writerow({'time': elem.time, 'distance': elem.distance,
+                             'velocity': elem.velocity, '_designation': elem._designation})
+
+
+def buffered_write_to_json(results, filename):
+    """The earlier `write_to_json`, which buffers every result before writing any."""
+    json_list = []
+    with open(filename, 'w') as json_outfile:
+        for elem in results:
+            print(elem.neo)
+            result_dict = dict(datetime_utc=datetime_to_str(elem.time), distance_au=elem.distance,
+                               velocity_km_s=elem.velocity, neo={
+                                   "designation": elem.neo.designation,
+                                   "name": elem.neo.name,
+                                   "diameter_km": elem.neo.diameter,
+                                   "potentially_hazardous": elem.neo.hazardous
+                               })
+            json_list.append(result_dict)
+        json.dump(json_list, json_outfile, indent=4)
+
+
+def benchmark_writer(label, writer, database, path):
+    """Time writing every close approach in a database with a writer, and measure its peak memory."""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        _, elapsed = timed(writer, database.query(), path)
+        tracemalloc.start()
+        writer(database.query(), path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    count = sum(1 for _ in database.query())
+    report(f"  {label}", elapsed, count, 'rows')
+    print(f"    peak memory: {peak / 2 ** 20:,.1f} MiB, output: {path.stat().st_size / 2 ** 20:,.1f} MiB")
+
+
+def main():
+    neofile, cadfile = data_files()
+    with tempfile.TemporaryDirectory() as directory:
+        directory = pathlib.Path(directory)
+        database = build_database(*scale_dataset(neofile, cadfile, 10, directory))
+        # Build every datetime up front, so that neither writer pays for it.
+        for approach in database.query():
+            approach.time
+
+        print("Synthetic data set (10x):")
+        benchmark_writer("DictWriter write_to_csv (baseline)", dict_write_to_csv,
+                         database, directory / 'baseline.csv')
+        benchmark_writer("write_to_csv", write_to_csv, database, directory / 'results.csv')
+        benchmark_writer("buffered write_to_json (baseline)", buffered_write_to_json,
+                         database, directory / 'baseline.json')
+        benchmark_writer("write_to_json", write_to_json, database, directory / 'results.json')
+        benchmark_writer("write_to_ndjson", write_to_ndjson, database, directory / 'results.ndjson')
+        benchmark_writer("write_to_sqlite", write_to_sqlite, database, directory / 'results.sqlite')
+
+
+if __name__ == '__main__':
+    main()
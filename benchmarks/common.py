@@ -0,0 +1,113 @@
+"""Shared utilities for the benchmark scripts.
+
+The benchmarks run against the full data set in the `data` folder when it is
+available, and otherwise fall back to the (much smaller) test data files. Most
+benchmarks also want a larger-than-life data set, so `scale_dataset` writes
+synthetic copies of the data files in which every NEO (and each of its close
+approaches) is replicated a number of times under fresh primary designations.
+
+Each benchmark is a script that can be run from the project root, e.g.::
+
+    $ python3 -m benchmarks.bench_link
+"""
+import csv
+import json
+import pathlib
+import sys
+import time
+
+
+PROJECT_ROOT = pathlib.Path(__file__).parent.parent.resolve()
+DATA_ROOT = PROJECT_ROOT / 'data'
+TESTS_ROOT = PROJECT_ROOT / 'tests'
+
+
+def data_files():
+    """Return the paths to the NEO and close approach data files to benchmark against.
+
+    Prefer the full data set, but fall back to the test data files (with a
+    warning on stderr) if the full data set isn't available.
+
+    :return: A tuple of the paths to a CSV file of NEOs and a JSON file of close approaches.
+    """
+    neofile, cadfile = DATA_ROOT / 'neos.csv', DATA_ROOT / 'cad.json'
+    if neofile.exists() and cadfile.exists():
+        return neofile, cadfile
+    print("The full data set is unavailable; benchmarking against the test data instead.",
+          file=sys.stderr)
+    return TESTS_ROOT / 'test-neos-2020.csv', TESTS_ROOT / 'test-cad-2020.json'
+
+
+def scale_dataset(neofile, cadfile, factor, directory):
+    """Write synthetic data files that replicate the given data files `factor` times.
+
+    The first copy of each record is left untouched. In every further copy, the
+    primary designation (and name, if any) of each NEO and the designation of
+    each close approach are suffixed with the index of the copy, so that the
+    synthetic data set has `factor` times as many distinct NEOs and as many
+    close approaches.
+
+    :param neofile: A path to a CSV file of NEOs.
+    :param cadfile: A path to a JSON file of close approaches.
+    :param factor: The number of copies of each record to write.
+    :param directory: A path to a directory in which to write the synthetic data files.
+    :return: A tuple of the paths to the synthetic CSV file and JSON file.
+    """
+    directory = pathlib.Path(directory)
+    scaled_neofile = directory / f'neos-x{factor}.csv'
+    scaled_cadfile = directory / f'cad-x{factor}.json'
+
+    with open(neofile) as infile, open(scaled_neofile, 'w', newline='') as outfile:
+        reader = csv.reader(infile)
+        writer = csv.writer(outfile)
+        header = next(reader)
+        pdes, name = header.index('pdes'), header.index('name')
+        rows = list(reader)
+        writer.writerow(header)
+        for copy in range(factor):
+            for row in rows:
+                if copy:
+                    row = list(row)
+                    row[pdes] = f'{row[pdes]}-{copy}'
+                    if row[name]:
+                        row[name] = f'{row[name]}-{copy}'
+                writer.writerow(row)
+
+    with open(cadfile) as infile:
+        contents = json.load(infile)
+    data = []
+    for copy in range(factor):
+        for record in contents['data']:
+            if copy:
+                record = [f'{record[0]}-{copy}'] + record[1:]
+            data.append(record)
+    contents['data'] = data
+    contents['count'] = len(data)
+    with open(scaled_cadfile, 'w') as outfile:
+        json.dump(contents, outfile)
+
+    return scaled_neofile, scaled_cadfile
+
+
+def timed(func, *args, **kwargs):
+    """Call `func(*args, **kwargs)` and measure how long it takes.
+
+    :return: A tuple of the return value and the elapsed wall-clock time in seconds.
+    """
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def report(label, seconds, count=None, unit='items'):
+    """Print a single line of benchmark results.
+
+    :param label: A description of what was measured.
+    :param seconds: The elapsed time, in seconds.
+    :param count: If given, the number of items processed, used to report a rate.
+    :param unit: The name of the items that were processed.
+    """
+    line = f"{label:<48} {seconds * 1000:10.1f} ms"
+    if count:
+        line += f"  ({count / seconds:,.0f} {unit}/s)" if seconds else f"  ({count:,} {unit})"
+    print(line)
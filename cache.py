@@ -0,0 +1,253 @@
+"""Cache snapshots of fully built `NEODatabase`s to speed up startup.
+
+Extracting NEOs and close approaches from the data files and linking them
+together takes far longer than most commands take to run. The `load_database`
+function saves a snapshot of the `NEODatabase` it builds (with `pickle`) and, as
+long as the data files haven't changed, loads that snapshot instead of building
+the database again the next time around.
+
+A snapshot is keyed by the path, size, modification time, and content hash of
+each data file, as well as of the source of the modules that define the pickled
+objects, so that it is rebuilt whenever either the data or the code changes. A
+file is only hashed again when a snapshot is loaded if its size or modification
+time differs from the key.
+
+Snapshots are saved in a `.cache` folder next to this module, or, if that
+can't be written, in a folder of the user's cache directory (see
+`default_cache_root`).
+
+The main module calls `load_database` with the data files and cache options
+provided at the command line. When the database is built, the data files can
+optionally be loaded concurrently with `parallel.load_concurrently`.
+"""
+import gc
+import hashlib
+import os
+import pathlib
+import pickle
+import sys
+import tempfile
+
+import columnar
+import database
+import models
+from compiled import fingerprint, is_compiled, matches_fingerprint, open_compiled
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from parallel import LoadTimings, load_concurrently
+
+
+# The default folder in which to save snapshots.
+CACHE_ROOT = pathlib.Path(__file__).parent.resolve() / '.cache'
+
+# The name of the folder in the user's cache directory in which to save
+# snapshots if `CACHE_ROOT` can't be written.
+USER_CACHE_NAME = 'near-earth-objects'
+
+# The modules whose classes are pickled into a snapshot.
+SNAPSHOT_MODULES = (models, database, columnar)
+
+
+def load_database(neofile, cadfile, columnar=False, cache_root=None,
+                  use_cache=True, rebuild=False, parallel=False, workers=None, timings=None):
+    """Load an `NEODatabase` from a snapshot if possible, or else build it from the data files.
+
+    After building a database from the data files, save a snapshot of it for
+    next time (unless `use_cache` is false).
+
+    :param neofile: A path to a CSV file containing data about near-Earth objects.
+    :param cadfile: A path to a JSON file containing data about close approaches.
+    :param columnar: Whether the database should evaluate queries with a columnar store.
+    :param cache_root: A path to the folder in which to save snapshots, or None for `default_cache_root()`.
+    :param use_cache: Whether to load and save snapshots at all.
+    :param rebuild: Whether to rebuild the database (and its snapshot) even if a snapshot exists.
+    :param parallel: Whether to load the data files concurrently when building the database.
+    :param workers: The number of worker processes for a concurrent load, or None for the number of CPUs.
+    :param timings: If given, a `LoadTimings` in which to record each step of loading.
+    :return: An `NEODatabase` of the data in the data files.
+    """
+    if timings is None:
+        timings = LoadTimings()
+
+    if not use_cache or is_compiled(cadfile):
+        # A compiled dataset opens quickly enough without a snapshot.
+        return build_database(neofile, cadfile, columnar, parallel, workers, timings)
+
+    if cache_root is None:
+        cache_root = default_cache_root()
+    path = snapshot_path(cache_root, neofile, cadfile, columnar)
+
+    if not rebuild:
+        with timings.record('read snapshot'):
+            neo_database = read_snapshot(path, neofile, cadfile, columnar)
+        if neo_database is not None:
+            return neo_database
+
+    # Describe the data files before they are read, in case they change meanwhile.
+    key = snapshot_key(neofile, cadfile, columnar)
+    neo_database = build_database(neofile, cadfile, columnar, parallel, workers, timings)
+    try:
+        write_snapshot(path, key, neo_database)
+    except OSError as err:
+        print(f"Unable to save a snapshot of the database: {err}", file=sys.stderr)
+    return neo_database
+
+
+def build_database(neofile, cadfile, columnar=False, parallel=False, workers=None, timings=None):
+    """Build an `NEODatabase` from the data files.
+
+    The close approach data can either be a JSON file or a compiled dataset. A
+    JSON file can be loaded at the same time as the NEO file, in a pool of
+    `workers` worker processes, if `parallel` is true.
+    """
+    if timings is None:
+        timings = LoadTimings()
+
+    if parallel and not is_compiled(cadfile):
+        neos, approaches = load_concurrently(neofile, cadfile, timings, workers)
+    else:
+        with timings.record('load neos'):
+            neos = load_neos(neofile)
+        with timings.record('load approaches'):
+            if is_compiled(cadfile):
+                approaches = open_compiled(cadfile, neofile, neos)
+            else:
+                approaches = load_approaches(cadfile)
+    with timings.record('link'):
+        return NEODatabase(neos, approaches, columnar=columnar)
+
+
+def default_cache_root():
+    """Return the folder in which to save snapshots by default.
+
+    This is `CACHE_ROOT`, unless it can't be written (e.g. if the project is
+    installed in a read-only location), in which case it is a folder in the
+    user's cache directory: `$XDG_CACHE_HOME`, or else `~/.cache`.
+    """
+    if _is_writable(CACHE_ROOT):
+        return CACHE_ROOT
+    user_cache = os.environ.get('XDG_CACHE_HOME', '')
+    if not os.path.isabs(user_cache):
+        user_cache = pathlib.Path.home() / '.cache'
+    return pathlib.Path(user_cache) / USER_CACHE_NAME
+
+
+def snapshot_key(neofile, cadfile, columnar=False):
+    """Describe the data files and code that a snapshot depends on.
+
+    :param neofile: A path to a CSV file containing data about near-Earth objects.
+    :param cadfile: A path to a JSON file containing data about close approaches.
+    :param columnar: Whether the database evaluates queries with a columnar store.
+    :return: A dictionary of the fingerprint of each file (by resolved path), and of `columnar`.
+    """
+    return {'files': {path: fingerprint(path) for path in _snapshot_files(neofile, cadfile)},
+            'columnar': bool(columnar)}
+
+
+def key_matches(key, neofile, cadfile, columnar=False):
+    """Return whether the key of a snapshot still describes the data files and code.
+
+    A file is only hashed if its size or modification time differs from its
+    fingerprint in the key (see `compiled.matches_fingerprint`).
+
+    :param key: The key of a snapshot, from `snapshot_key`.
+    :param neofile: A path to a CSV file containing data about near-Earth objects.
+    :param cadfile: A path to a JSON file containing data about close approaches.
+    :param columnar: Whether the database evaluates queries with a columnar store.
+    :return: Whether the snapshot can be used for the data files.
+    """
+    if not isinstance(key, dict) or key.get('columnar') != bool(columnar):
+        return False
+    files, paths = key.get('files'), _snapshot_files(neofile, cadfile)
+    if not isinstance(files, dict) or list(files) != paths:
+        return False
+    return all(matches_fingerprint(path, files[path]) for path in paths)
+
+
+def snapshot_path(cache_root, neofile, cadfile, columnar=False):
+    """Return the path of the snapshot for a pair of data files.
+
+    Each pair of data files has a single snapshot, which is overwritten when the
+    data files change.
+    """
+    paths = f"{pathlib.Path(neofile).resolve()}\n{pathlib.Path(cadfile).resolve()}\n{bool(columnar)}"
+    name = hashlib.sha256(paths.encode()).hexdigest()[:32]
+    return pathlib.Path(cache_root) / f'{name}.pickle'
+
+
+def read_snapshot(path, neofile, cadfile, columnar=False):
+    """Read a snapshot of an `NEODatabase`, if it exists and matches the data files.
+
+    A snapshot file holds two pickles: the key, and then the database. A stale
+    (see `key_matches`) or unreadable snapshot is treated as a missing one.
+
+    None of the objects of the database is garbage, so the cyclic garbage
+    collector is paused while they are unpickled (rather than traversing the
+    partially loaded database over and over), and they are then frozen out of
+    its reach with `gc.freeze` (where it is available).
+
+    :param path: A path to the snapshot file.
+    :param neofile: A path to a CSV file containing data about near-Earth objects.
+    :param cadfile: A path to a JSON file containing data about close approaches.
+    :param columnar: Whether the database evaluates queries with a columnar store.
+    :return: The `NEODatabase` in the snapshot, or None.
+    """
+    try:
+        with open(path, 'rb') as snapshot_file:
+            if not key_matches(pickle.load(snapshot_file), neofile, cadfile, columnar):
+                return None
+            enabled = gc.isenabled()
+            gc.disable()
+            try:
+                neo_database = pickle.load(snapshot_file)
+            finally:
+                if enabled:
+                    gc.enable()
+    except FileNotFoundError:
+        return None
+    except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as err:
+        print(f"Ignoring an unreadable snapshot of the database: {err}", file=sys.stderr)
+        return None
+    # `gc.freeze` is new in Python 3.7.
+    if hasattr(gc, 'freeze'):
+        gc.freeze()
+    return neo_database
+
+
+def write_snapshot(path, key, neo_database):
+    """Write a snapshot of an `NEODatabase` under a key.
+
+    The snapshot is written to a temporary file that then replaces `path`, so a
+    concurrent reader never sees a partially written snapshot.
+
+    :param path: A path to the snapshot file.
+    :param key: The key of the snapshot, from `snapshot_key`.
+    :param neo_database: The `NEODatabase` to save.
+    """
+    path = pathlib.Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    descriptor, temporary = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'wb') as snapshot_file:
+            pickle.dump(key, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(neo_database, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def _is_writable(folder):
+    """Return whether a folder exists and can be written, or else could be created."""
+    folder = pathlib.Path(folder)
+    while not folder.exists():
+        if folder.parent == folder:
+            return False
+        folder = folder.parent
+    return folder.is_dir() and os.access(folder, os.W_OK | os.X_OK)
+
+
+def _snapshot_files(neofile, cadfile):
+    """Return the resolved paths of the data files and of the code that a snapshot depends on."""
+    paths = (neofile, cadfile) + tuple(module.__file__ for module in SNAPSHOT_MODULES)
+    return [str(pathlib.Path(path).resolve()) for path in paths]
@@ -0,0 +1,188 @@
+"""A columnar store of close approach data for vectorized query evaluation.
+
+A `ColumnarStore` keeps the attributes of a collection of close approaches (and
+of their NEOs) that can be filtered on as NumPy arrays, aligned position by
+position with the collection. Rather than checking every criterion against one
+`CloseApproach` at a time, the store evaluates all of the filters from
+`create_filters` at once as a single boolean mask over those arrays.
+
+NumPy is an optional dependency: if it isn't installed, `numpy` is `None` here
+and an `NEODatabase` can't be asked to use a columnar store.
+"""
+import datetime
+
+from helpers import MINUTES_PER_DAY, date_to_days
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class ColumnarStore:
+    """Columns of close approach data, aligned with a sequence of `CloseApproach`es.
+
+    The store holds the approach time (in whole minutes since the Unix epoch)
+    and date (in whole days since the Unix epoch), the nominal approach
+    distance, the relative approach velocity, the diameter of the approaching
+    NEO (NaN if unknown), and whether that NEO is potentially hazardous.
+
+    More close approaches can be appended to the store with `extend`.
+    """
+    # The columns that hold an attribute of each close approach, in order.
+    COLUMNS = ('time', 'distance', 'velocity', 'diameter', 'hazardous', '_day')
+
+    def __init__(self, time, distance, velocity, diameter, hazardous, order=None):
+        """Create a new `ColumnarStore` from arrays of equal length.
+
+        The store can additionally hold an ordering of the positions of the
+        close approaches (such as the time index of an `NEODatabase`), from
+        which `select` picks out matches while preserving that order.
+
+        :param time: An int64 array of approach times, in minutes since the Unix epoch.
+        :param distance: A float64 array of nominal approach distances.
+        :param velocity: A float64 array of relative approach velocities.
+        :param diameter: A float64 array of NEO diameters, NaN if unknown.
+        :param hazardous: A boolean array of whether each NEO is potentially hazardous.
+        :param order: An array of positions, or None for the natural order of the arrays.
+        """
+        self.time = time
+        self.distance = distance
+        self.velocity = velocity
+        self.diameter = diameter
+        self.hazardous = hazardous
+        self.order = order
+        self._day = None
+        self._buffers = {}
+
+    @classmethod
+    def from_approaches(cls, approaches, order=None):
+        """Create a new `ColumnarStore` from a sequence of linked `CloseApproach`es.
+
+        :param approaches: A sequence of `CloseApproach`es, already linked to their NEOs.
+        :param order: A sequence of positions in `approaches`, or None for their natural order.
+        :return: A `ColumnarStore` aligned with `approaches`.
+        """
+        if numpy is None:
+            raise ImportError("The columnar store requires NumPy.")
+
+        count = len(approaches)
+        return cls(
+            time=numpy.fromiter((approach.minutes for approach in approaches),
+                                dtype=numpy.int64, count=count),
+            distance=numpy.fromiter((approach.distance for approach in approaches),
+                                    dtype=numpy.float64, count=count),
+            velocity=numpy.fromiter((approach.velocity for approach in approaches),
+                                    dtype=numpy.float64, count=count),
+            diameter=numpy.fromiter(
+                (approach.neo.diameter if approach.neo else float('nan') for approach in approaches),
+                dtype=numpy.float64, count=count),
+            hazardous=numpy.fromiter(
+                (bool(approach.neo and approach.neo.hazardous) for approach in approaches),
+                dtype=numpy.bool_, count=count),
+            order=None if order is None else numpy.asarray(order, dtype=numpy.intp),
+        )
+
+    def set_order(self, order):
+        """Replace the ordering of the positions of the close approaches in this store.
+
+        :param order: A sequence of positions, or None for the natural order of the arrays.
+        """
+        self.order = None if order is None else numpy.asarray(order, dtype=numpy.intp)
+
+    def extend(self, approaches):
+        """Append the columns of more close approaches to this store.
+
+        Each array is grown geometrically (with spare room at its end), so that
+        appending takes amortized time proportional to the number of new close
+        approaches. The ordering of the positions isn't changed.
+
+        :param approaches: A sequence of `CloseApproach`es, already linked to their NEOs.
+        """
+        new = ColumnarStore.from_approaches(approaches)
+        if self._day is not None:
+            new._day = new.day
+        count, total = len(self), len(self) + len(new)
+        for name in self.COLUMNS:
+            values = getattr(self, name)
+            if values is None:
+                continue
+            buffer = self._buffers.get(name)
+            if buffer is None or len(buffer) < total:
+                buffer = numpy.empty(max(total, 2 * count), dtype=values.dtype)
+                buffer[:count] = values
+                self._buffers[name] = buffer
+            buffer[count:total] = getattr(new, name)
+            setattr(self, name, buffer[:total])
+
+    def set_neo(self, positions, neo):
+        """Set the NEO of the close approaches at some positions, having linked them to it.
+
+        :param positions: A sequence of positions in this store.
+        :param neo: The `NearEarthObject` of those close approaches.
+        """
+        positions = numpy.asarray(positions, dtype=numpy.intp)
+        self.diameter[positions] = neo.diameter
+        self.hazardous[positions] = neo.hazardous
+
+    @property
+    def day(self):
+        """The approach dates, in whole days since the Unix epoch, computed on first use."""
+        if self._day is None:
+            self._day = self.time // MINUTES_PER_DAY
+        return self._day
+
+    def __len__(self):
+        """Return `len(self)`, the number of close approaches in this store."""
+        return len(self.time)
+
+    def select(self, filters, start=0, stop=None, order=None):
+        """Select the positions of the close approaches that match a collection of filters.
+
+        Only the slice `[start:stop]` of this store's ordering of positions (or
+        of another ordering) is considered, and matches are returned in that
+        order.
+
+        :param filters: A collection of `AttributeFilter`s.
+        :param start: The start of the slice of the ordering to consider.
+        :param stop: The end of the slice of the ordering to consider, or None for the end.
+        :param order: A sequence of positions to consider in place of this store's ordering.
+        :return: An array of the positions of matching close approaches.
+        """
+        if order is not None:
+            positions = numpy.asarray(order[start:stop], dtype=numpy.intp)
+        elif self.order is None:
+            positions = numpy.arange(len(self))[start:stop]
+        else:
+            positions = self.order[start:stop]
+        return positions[self.mask(filters, positions)]
+
+    def mask(self, filters, positions=None):
+        """Evaluate a collection of filters as a boolean mask.
+
+        Each filter must name the `column` of this store that holds the
+        attribute it compares, and its comparator must work elementwise on
+        arrays (as the comparators from the `operator` module do).
+
+        :param filters: A collection of `AttributeFilter`s.
+        :param positions: If given, an array of positions to restrict the evaluation to.
+        :return: A boolean array, aligned with `positions` if given (or else with this store).
+        """
+        mask = numpy.ones(len(self) if positions is None else len(positions), dtype=numpy.bool_)
+        for criterion in filters:
+            values = getattr(self, criterion.column)
+            if positions is not None:
+                values = values[positions]
+            mask &= criterion.op(values, _column_value(criterion.value))
+        return mask
+
+
+def _column_value(value):
+    """Convert the reference value of a filter to compare against the values in a column.
+
+    Dates are stored as whole days since the Unix epoch, and every other value
+    is compared as-is.
+    """
+    if isinstance(value, datetime.date):
+        return date_to_days(value)
+    return value
@@ -0,0 +1,315 @@
+"""Compile close approach data into a memory-mapped columnar format, and open it.
+
+Parsing the JSON file of close approach data gets slower the more data there
+is. A compiled dataset is a folder that instead stores each field of the close
+approaches (sorted by approach time) as a fixed-width array in its own file,
+behind a small header:
+
+    designation.col  The position of the approach's designation in `designations.txt`.
+    time.col         The approach time, in whole minutes since the Unix epoch.
+    distance.col     The nominal approach distance, in astronomical units.
+    velocity.col     The relative approach velocity, in kilometers per second.
+    neo.col          The position of the approach's NEO in the NEO file, or -1.
+    diameter.col     The diameter of the approach's NEO (NaN if unknown).
+    hazardous.col    Whether the approach's NEO is potentially hazardous.
+    by_neo.col       The positions of the approaches, grouped by NEO...
+    neo_offsets.col  ...where the approaches of the NEO at position `i` in the
+                     NEO file start, and where they stop at position `i + 1`.
+    diameter_order.col  The positions of the NEOs of known diameter in the NEO
+                        file, by diameter (and then by primary designation)...
+    diameter_keys.col   ...and their diameters, in the same order.
+
+A `manifest.json` records the number of close approaches and a fingerprint of
+the NEO file that the dataset was compiled against: its size, modification
+time, and content hash. The NEO file is only hashed again when it is opened if
+its size or modification time differs from the fingerprint.
+
+The `open_compiled` function memory-maps these files, so opening a compiled
+dataset takes about the same time no matter how many close approaches it holds,
+queries only touch the pages they need, and concurrent processes share the
+operating system's page cache. The `CloseApproach` objects themselves are only
+built when they are accessed, and the view of each NEO's close approaches is
+only made when its `.approaches` are first read.
+
+The `compile_dataset` function builds a compiled dataset from the data files.
+The main module calls it for the `compile` subcommand, and accepts a compiled
+dataset in place of `--cadfile`.
+"""
+import array
+import collections.abc
+import hashlib
+import json
+import math
+import mmap
+import pathlib
+import struct
+import sys
+import weakref
+
+from extract import load_neos, iter_approaches
+from models import CloseApproach
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# The version of the compiled format, bumped whenever the format changes.
+FORMAT_VERSION = 2
+
+# Each column file starts with a fixed-size header: a magic string, the byte
+# order and `array` typecode of the values, and the number of values.
+MAGIC = b'NEOCOL01'
+HEADER = struct.Struct('<8scc6xQ')
+HEADER_SIZE = 64
+
+# The `array` typecode of each column.
+COLUMNS = {
+    'designation': 'i',
+    'time': 'q',
+    'distance': 'd',
+    'velocity': 'd',
+    'neo': 'i',
+    'diameter': 'd',
+    'hazardous': 'b',
+    'by_neo': 'q',
+    'neo_offsets': 'q',
+    'diameter_order': 'i',
+    'diameter_keys': 'd',
+}
+
+BYTEORDER = b'<' if sys.byteorder == 'little' else b'>'
+
+
+class CompiledFormatError(ValueError):
+    """A compiled dataset is malformed, or doesn't match the NEO file."""
+
+
+def is_compiled(path):
+    """Return whether a path refers to a compiled dataset."""
+    return (pathlib.Path(path) / 'manifest.json').is_file()
+
+
+def compile_dataset(neofile, cadfile, directory):
+    """Compile the close approaches in a JSON file into a compiled dataset.
+
+    :param neofile: A path to a CSV file containing data about near-Earth objects.
+    :param cadfile: A path to a JSON file containing data about close approaches.
+    :param directory: A path to the folder in which to write the compiled dataset.
+    :return: The number of close approaches that were compiled.
+    """
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    neos = load_neos(neofile)
+    neo_positions = {neo.designation: position for position, neo in enumerate(neos)}
+    approaches = sorted(iter_approaches(cadfile), key=lambda approach: approach.minutes)
+
+    designations = {}
+    for approach in approaches:
+        designations.setdefault(approach._designation, len(designations))
+    references = [neo_positions.get(approach._designation, -1) for approach in approaches]
+
+    columns = {
+        'designation': [designations[approach._designation] for approach in approaches],
+        'time': [approach.minutes for approach in approaches],
+        'distance': [approach.distance for approach in approaches],
+        'velocity': [approach.velocity for approach in approaches],
+        'neo': references,
+        'diameter': [neos[reference].diameter if reference >= 0 else float('nan')
+                     for reference in references],
+        'hazardous': [reference >= 0 and neos[reference].hazardous for reference in references],
+    }
+
+    # Group the positions of the approaches by NEO, keeping each group in time order.
+    groups = [[] for _ in neos]
+    for position, reference in enumerate(references):
+        if reference >= 0:
+            groups[reference].append(position)
+    columns['by_neo'] = [position for group in groups for position in group]
+    columns['neo_offsets'] = [0]
+    for group in groups:
+        columns['neo_offsets'].append(columns['neo_offsets'][-1] + len(group))
+
+    # Index the NEOs of known diameter by diameter, as `NEODatabase` does.
+    known = sorted((neo.diameter, neo.designation, position) for position, neo in enumerate(neos)
+                   if not math.isnan(neo.diameter))
+    columns['diameter_order'] = [position for _, _, position in known]
+    columns['diameter_keys'] = [diameter for diameter, _, _ in known]
+
+    for name, values in columns.items():
+        _write_column(directory / f'{name}.col', COLUMNS[name], values)
+    with open(directory / 'designations.txt', 'w') as outfile:
+        outfile.writelines(f'{designation}\n' for designation in designations)
+    with open(directory / 'manifest.json', 'w') as outfile:
+        json.dump({'version': FORMAT_VERSION, 'count': len(approaches),
+                   'neofile': fingerprint(neofile)}, outfile)
+
+    return len(approaches)
+
+
+def open_compiled(directory, neofile, neos):
+    """Open a compiled dataset of close approaches.
+
+    :param directory: A path to the folder of a compiled dataset.
+    :param neofile: A path to the CSV file that the dataset was compiled against.
+    :param neos: The `NearEarthObject`s loaded from `neofile`, in order.
+    :return: A `CompiledApproaches` sequence.
+    :raise CompiledFormatError: If the dataset is malformed or was compiled against another NEO file.
+    """
+    directory = pathlib.Path(directory)
+    with open(directory / 'manifest.json') as infile:
+        manifest = json.load(infile)
+    if manifest.get('version') != FORMAT_VERSION:
+        raise CompiledFormatError(f"{directory} has an unsupported compiled format; recompile it.")
+    if not matches_fingerprint(neofile, manifest.get('neofile')):
+        raise CompiledFormatError(f"{directory} was compiled against a different NEO file; "
+                                  "recompile it.")
+    return CompiledApproaches(directory, manifest['count'], neos)
+
+
+class CompiledApproaches(collections.abc.Sequence):
+    """A read-only, time-sorted sequence of `CloseApproach`es backed by a compiled dataset.
+
+    A `CloseApproach` is built (and linked to its NEO) when it is first accessed,
+    and the same object is returned for as long as anything else refers to it.
+    """
+    def __init__(self, directory, count, neos):
+        """Memory-map the columns of a compiled dataset.
+
+        :param directory: A path to the folder of a compiled dataset.
+        :param count: The number of close approaches in the dataset.
+        :param neos: The `NearEarthObject`s of the NEO file, in order.
+        """
+        self.directory = pathlib.Path(directory)
+        self.count = count
+        self.neos = neos
+        self._maps = {}
+        self.columns = {name: self._map_column(name, typecode) for name, typecode in COLUMNS.items()}
+        self._designations = None
+        self._neo_positions = None
+        self._materialized = weakref.WeakValueDictionary()
+
+    def __len__(self):
+        """Return `len(self)`, the number of close approaches."""
+        return self.count
+
+    def __getitem__(self, index):
+        """Return the close approach at a position, building it if needed."""
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(self.count))]
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError("compiled close approach index out of range")
+
+        approach = self._materialized.get(index)
+        if approach is None:
+            if self._designations is None:
+                with open(self.directory / 'designations.txt') as infile:
+                    self._designations = infile.read().splitlines()
+            columns = self.columns
+            approach = CloseApproach(_designation=self._designations[columns['designation'][index]],
+                                     minutes=columns['time'][index],
+                                     distance=columns['distance'][index],
+                                     velocity=columns['velocity'][index])
+            reference = columns['neo'][index]
+            if reference >= 0:
+                approach.neo = self.neos[reference]
+            self._materialized[index] = approach
+        return approach
+
+    def link(self):
+        """Link each NEO to this dataset, which makes a view of its close approaches when they are read.
+
+        See `approaches_of`.
+        """
+        for neo in self.neos:
+            neo.approaches = self
+
+    def approaches_of(self, neo):
+        """Return a view of the close approaches of an NEO, without building them."""
+        if self._neo_positions is None:
+            self._neo_positions = {neo.designation: position for position, neo in enumerate(self.neos)}
+        return _NEOApproaches(self, self._neo_positions[neo.designation])
+
+    def positions_of(self, position):
+        """Return the positions of the close approaches of the NEO at a position in the NEO file, by time."""
+        offsets = self.columns['neo_offsets']
+        return self.columns['by_neo'][offsets[position]:offsets[position + 1]]
+
+    def array(self, name):
+        """Return a NumPy array over a memory-mapped column, without copying it."""
+        mapped, count = self._maps[name]
+        return numpy.frombuffer(mapped, dtype=numpy.dtype(COLUMNS[name]),
+                                count=count, offset=HEADER_SIZE)
+
+    def _map_column(self, name, typecode):
+        """Memory-map a column file and return a view of its values."""
+        path = self.directory / f'{name}.col'
+        with open(path, 'rb') as infile:
+            mapped = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, byteorder, stored_typecode, count = HEADER.unpack_from(mapped)
+        if magic != MAGIC or byteorder != BYTEORDER or stored_typecode != typecode.encode():
+            raise CompiledFormatError(f"{path} is not a compatible column file.")
+        self._maps[name] = mapped, count
+        return memoryview(mapped)[HEADER_SIZE:].cast(typecode)
+
+
+class _NEOApproaches(collections.abc.Sequence):
+    """A read-only view of the close approaches of the NEO at a position in the NEO file."""
+    def __init__(self, approaches, position):
+        self.approaches = approaches
+        self.position = position
+
+    def _positions(self):
+        return self.approaches.positions_of(self.position)
+
+    def __len__(self):
+        return len(self._positions())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.approaches[position] for position in self._positions()[index]]
+        return self.approaches[self._positions()[index]]
+
+
+def _write_column(path, typecode, values):
+    """Write a column file of fixed-width values behind a header."""
+    values = array.array(typecode, values)
+    with open(path, 'wb') as outfile:
+        outfile.write(HEADER.pack(MAGIC, BYTEORDER, typecode.encode(), len(values))
+                      .ljust(HEADER_SIZE, b'\0'))
+        values.tofile(outfile)
+
+
+def file_digest(path, chunk_size=1024 * 1024):
+    """Return a hex digest of the contents of a file."""
+    digest = hashlib.blake2b()
+    with open(path, 'rb') as infile:
+        for chunk in iter(lambda: infile.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def fingerprint(path):
+    """Return the size, modification time, and content hash of a file."""
+    stat = pathlib.Path(path).stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': file_digest(path)}
+
+
+def matches_fingerprint(path, fingerprint):
+    """Return whether a file matches a fingerprint from `fingerprint`.
+
+    The file is only hashed if its size or modification time differs from the
+    fingerprint (e.g. it was copied, or touched without being changed).
+    """
+    if not isinstance(fingerprint, dict):
+        return False
+    stat = pathlib.Path(path).stat()
+    if stat.st_size != fingerprint.get('size'):
+        return False
+    if stat.st_mtime_ns == fingerprint.get('mtime_ns'):
+        return True
+    return file_digest(path) == fingerprint.get('hash')
@@ -11,7 +11,39 @@ data on NEOs and close approaches extracted by `extract.load_neos` and
 
 You'll edit this file in Tasks 2 and 3.
 """
-from datetime import datetime
+import array
+import bisect
+import heapq
+import math
+import multiprocessing
+import operator
+
+from columnar import ColumnarStore, numpy
+from compiled import CompiledApproaches
+from filters import DateFilter, DiameterFilter
+from helpers import MINUTES_PER_DAY, date_to_days
+
+
+# How many close approaches to scan between reorderings of the filters.
+REORDER_INTERVAL = 1024
+
+# How many shards to split a parallel scan into for each worker process.
+SHARDS_PER_WORKER = 4
+
+# A query uses the diameter index only if the close approaches of the NEOs in its
+# diameter range are at most this fraction of those in its date range, since
+# they then have to be sorted by time. Checking the rest of the filters on the
+# columnar store is much cheaper per close approach than on the objects.
+DIAMETER_INDEX_FRACTION = 1 / 2
+COLUMNAR_DIAMETER_INDEX_FRACTION = 1 / 32
+
+# Parallel scans rely on forked workers sharing the data of this process.
+FORK_AVAILABLE = 'fork' in multiprocessing.get_all_start_methods()
+
+# In a worker process of a parallel scan, the database, run of the time index,
+# and predicates of that scan (see `_start_scan_worker`).
+_PARALLEL_SCAN = None
+
 
 class NEODatabase:
     """A database of near-Earth objects and their close approaches.
@@ -21,7 +53,7 @@ class NEODatabase:
     help fetch NEOs by primary designation or by name and to help speed up
     querying for close approaches that match criteria.
     """
-    def __init__(self, neos, approaches):
+    def __init__(self, neos, approaches, columnar=False):
         """Create a new `NEODatabase`.
 
         As a precondition, this constructor assumes that the collections of NEOs
@@ -36,19 +68,214 @@ class NEODatabase:
         a collection of that NEO's close approaches, and the `.neo` attribute of
         each close approach references the appropriate NEO.
 
+        A `CompiledApproaches` sequence is already linked, sorted by time, and
+        indexed by diameter, so in that case each NEO is just linked to the
+        dataset, which makes a view of its close approaches when they are read.
+
+        If `columnar` is true, the database additionally keeps a `ColumnarStore`
+        of the close approaches and evaluates queries on it with NumPy, which
+        must be installed.
+
         :param neos: A collection of `NearEarthObject`s.
-        :param approaches: A collection of `CloseApproach`es.
+        :param approaches: A collection of `CloseApproach`es, or a `CompiledApproaches`.
+        :param columnar: Whether to evaluate queries with a columnar store.
+        """
+        self._neos = neos
+        self._approaches = approaches
+
+        # Index the NEOs by primary designation and by name. The designation
+        # index also lets each close approach find its NEO without scanning the
+        # entire collection of NEOs. Unnamed NEOs are left out of the name index.
+        self._neos_by_designation = {neo.designation: neo for neo in self._neos}
+        self._neos_by_name = {neo.name: neo for neo in self._neos if neo.name}
+
+        if isinstance(self._approaches, CompiledApproaches):
+            # A compiled dataset is already linked, sorted by time, and indexed
+            # by diameter, so there is no need to touch (or even build) every
+            # close approach. The diameter index holds the positions of the NEOs
+            # in the NEO file, rather than their designations.
+            self._approaches.link()
+            self._diameter_keys = self._approaches.columns['diameter_keys']
+            self._diameter_designations = None
+            self._time_runs = [(range(len(self._approaches)), self._approaches.columns['time'])]
+            self._columns = None
+            if columnar:
+                self._columns = ColumnarStore(
+                    time=self._approaches.array('time'),
+                    distance=self._approaches.array('distance'),
+                    velocity=self._approaches.array('velocity'),
+                    diameter=self._approaches.array('diameter'),
+                    hazardous=self._approaches.array('hazardous').view(bool),
+                )
+            return
+
+        # Index the NEOs with known diameters by diameter. The index is a pair
+        # of sorted lists of diameters and of the corresponding designations,
+        # ready for bisection, and the positions of the close approaches of
+        # each of those NEOs are kept by designation (as they are linked).
+        self._diameter_positions = {neo.designation: array.array('q') for neo in self._neos
+                                    if not math.isnan(neo.diameter)}
+        self._diameter_keys, self._diameter_designations = [], []
+        self._index_diameters(self._neos)
+
+        # Link together the NEOs and their close approaches. The positions of
+        # close approaches without a known NEO are kept by designation, in case
+        # that NEO is added later.
+        self._orphans = {}
+        self._link(range(len(self._approaches)))
+
+        # Index the close approaches by time, in runs. Each run is a pair of
+        # a list of the positions of some of the close approaches in
+        # `_approaches`, sorted by approach time, and a list of the
+        # corresponding times (in minutes since the Unix epoch, so that no
+        # `datetime`s need to be built), ready for bisection. The close
+        # approaches that the database is created with make up the first run,
+        # and any that are added later make up further runs (see `add_approaches`).
+        time_order = sorted(range(len(self._approaches)),
+                            key=lambda index: self._approaches[index].minutes)
+        time_keys = [self._approaches[index].minutes for index in time_order]
+        self._time_runs = [(time_order, time_keys)]
+
+        # Optionally, keep columns of the filterable attributes of the close
+        # approaches so that queries can be evaluated as vectorized operations.
+        self._columns = None
+        if columnar:
+            self._columns = ColumnarStore.from_approaches(self._approaches, time_order)
+
+    def extend(self, neos=(), approaches=()):
+        """Add NEOs and then close approaches to this database, with `add_neos` and `add_approaches`.
+
+        :param neos: A collection of new `NearEarthObject`s.
+        :param approaches: A collection of new `CloseApproach`es.
+        :raise ValueError: If a new NEO has the primary designation of another NEO.
+        :raise TypeError: If this database holds a compiled dataset, which is read-only.
+        """
+        self.add_neos(neos)
+        self.add_approaches(approaches)
+
+    def add_neos(self, neos):
+        """Add NEOs to this database.
+
+        The new NEOs are indexed by primary designation, by name, and by
+        diameter, and linked to any close approaches of theirs that are already
+        in the database.
+        This takes time proportional to the number of new NEOs and of those
+        close approaches, plus a single pass over the diameter index to merge
+        the new NEOs into it.
+
+        As in the constructor, the new NEOs must not yet be linked. They are
+        appended to the collection of NEOs that this database was created with.
+
+        :param neos: A collection of new `NearEarthObject`s.
+        :raise ValueError: If a new NEO has the primary designation of another NEO.
+        :raise TypeError: If this database holds a compiled dataset, which is read-only.
+        """
+        self._check_extensible()
+        neos = list(neos)
+        designations = [neo.designation for neo in neos]
+        if len(set(designations)) < len(designations) or \
+                any(designation in self._neos_by_designation for designation in designations):
+            raise ValueError("A new NEO has the primary designation of another NEO.")
+
+        for neo in neos:
+            self._neos.append(neo)
+            self._neos_by_designation[neo.designation] = neo
+            if neo.name:
+                self._neos_by_name[neo.name] = neo
+            positions = self._orphans.pop(neo.designation, ())
+            for index in positions:
+                approach = self._approaches[index]
+                neo.approaches.append(approach)
+                approach.neo = neo
+            if positions and self._columns is not None:
+                self._columns.set_neo(positions, neo)
+            if not math.isnan(neo.diameter):
+                self._diameter_positions[neo.designation] = array.array('q', positions)
+        self._index_diameters(neos)
+
+    def _index_diameters(self, neos):
+        """Add the NEOs with known diameters to the diameter index.
+
+        The NEOs are sorted by diameter and merged into the index in a single
+        pass, which copies the runs of the index between them a slice at a time.
+
+        :param neos: A collection of `NearEarthObject`s, with positions in `_diameter_positions`.
         """
-        self._neos = neos 
-        self._approaches = approaches 
+        known = sorted((neo.diameter, neo.designation) for neo in neos if not math.isnan(neo.diameter))
+        if not known:
+            return
+        old_keys, old_designations = self._diameter_keys, self._diameter_designations
+        keys, designations, start = [], [], 0
+        for diameter, designation in known:
+            stop = bisect.bisect_right(old_keys, diameter, start)
+            keys += old_keys[start:stop]
+            keys.append(diameter)
+            designations += old_designations[start:stop]
+            designations.append(designation)
+            start = stop
+        keys += old_keys[start:]
+        designations += old_designations[start:]
+        self._diameter_keys, self._diameter_designations = keys, designations
 
-        # Link together the NEOs and their close approaches.
-        for x in range(len(self._approaches)):
-            for i in range(len(self._neos)):
-                if self._neos[i].designation == self._approaches[x]._designation:
-                    self._neos[i].approaches.append(self._approaches[x])
-                    self._approaches[x].neo = self._neos[i]
+    def add_approaches(self, approaches):
+        """Add close approaches to this database.
 
+        The new close approaches are linked to their NEOs, if those are in the
+        database (or else they are linked once `add_neos` adds them), and are
+        generated by `query` from then on.
+
+        The new close approaches are sorted into a new run of the time index.
+        Whenever the most recent run is at most twice as large as the new one,
+        the two are merged, so that each run is more than twice as large as the
+        one after it. There are thus only logarithmically many runs for `query`
+        to search, and adding close approaches takes amortized time proportional
+        to their number (times a logarithmic factor).
+
+        As in the constructor, the new close approaches must not yet be linked.
+        They are appended to the collection of close approaches that this
+        database was created with.
+
+        :param approaches: A collection of new `CloseApproach`es.
+        :raise TypeError: If this database holds a compiled dataset, which is read-only.
+        """
+        self._check_extensible()
+        start = len(self._approaches)
+        self._approaches.extend(approaches)
+        positions = range(start, len(self._approaches))
+        if not positions:
+            return
+        self._link(positions)
+        if self._columns is not None:
+            self._columns.extend(self._approaches[start:])
+
+        time_order = sorted(positions, key=lambda index: self._approaches[index].minutes)
+        time_keys = [self._approaches[index].minutes for index in time_order]
+        runs = self._time_runs
+        while runs and len(runs[-1][0]) <= 2 * len(time_order):
+            time_order, time_keys = _merge_runs(runs.pop(), (time_order, time_keys))
+        runs.append((time_order, time_keys))
+        if len(runs) == 1 and self._columns is not None:
+            self._columns.set_order(time_order)
+
+    def _check_extensible(self):
+        """Raise a `TypeError` if this database holds a compiled dataset, which is read-only."""
+        if isinstance(self._approaches, CompiledApproaches):
+            raise TypeError("A compiled dataset can't be extended; recompile it instead.")
+
+    def _link(self, positions):
+        """Link the close approaches at some positions to their NEOs, if they are known."""
+        diameter_positions = self._diameter_positions
+        for index in positions:
+            approach = self._approaches[index]
+            neo = self._neos_by_designation.get(approach._designation)
+            if neo is not None:
+                neo.approaches.append(approach)
+                approach.neo = neo
+                indexed = diameter_positions.get(approach._designation)
+                if indexed is not None:
+                    indexed.append(index)
+            else:
+                self._orphans.setdefault(approach._designation, []).append(index)
 
     def get_neo_by_designation(self, designation):
         """Find and return an NEO by its primary designation.
@@ -63,18 +290,7 @@ class NEODatabase:
         :param designation: The primary designation of the NEO to search for.
         :return: The `NearEarthObject` with the desired primary designation, or `None`.
         """
-        # Fetch an NEO by its primary designation.
-        neo_by_designation = ''
-        
-        for i in range(len(self._neos)):
-            if self._neos[i].designation == designation:
-                neo_by_designation = self._neos[i]
-
-        if neo_by_designation=='' or neo_by_designation == None:
-           return None
-
-        return neo_by_designation
-        
+        return self._neos_by_designation.get(designation)
 
     def get_neo_by_name(self, name):
         """Find and return an NEO by its name.
@@ -90,20 +306,9 @@ class NEODatabase:
         :param name: The name, as a string, of the NEO to search for.
         :return: The `NearEarthObject` with the desired name, or `None`.
         """
+        return self._neos_by_name.get(name)
 
-        
-        # Fetch an NEO by its name.
-        neo_by_name = ''
-        for i in range(len(self._neos)):
-            if self._neos[i].name == name:
-                neo_by_name = self._neos[i]
-       
-        if neo_by_name=='' or neo_by_name == None:
-           return None
-            
-        return neo_by_name    
-
-    def query(self, filters=()):
+    def query(self, filters=(), workers=None):
         """Query close approaches to generate those that match a collection of filters.
 
         This generates a stream of `CloseApproach` objects that match all of the
@@ -111,39 +316,329 @@ class NEODatabase:
 
         If no arguments are provided, generate all known close approaches.
 
-        The `CloseApproach` objects are generated in internal order, which isn't
-        guaranteed to be sorted meaningfully, although is often sorted by time.
+        The `CloseApproach` objects are generated in order of approach time.
+
+        The filters can be checked in parallel by a pool of worker processes,
+        each scanning a shard of the close approaches. The workers are forked
+        from this process, so they share its data without copying it. Closing
+        the stream early (as `limit` does) stops the workers.
 
         :param filters: A collection of filters capturing user-specified criteria.
+        :param workers: The number of worker processes to scan with, or None to scan in this process.
         :return: A stream of matching `CloseApproach` objects.
         """
-        # ELABORATE: Generate `CloseApproach` objects that match all of the filters 
-        self.filters = filters
-
-        for approach in self._approaches:
-            if self.filters['date'] and self.filters['date'] != datetime.date(approach.time):
-                continue
-            if self.filters['start_date'] and not (self.filters['start_date'] <= datetime.date(approach.time)):
-                continue            
-            if self.filters['end_date'] and not (self.filters['end_date'] >= datetime.date(approach.time)):
-                continue 
-            if self.filters['distance_min'] and not self.filters['distance_min'] <= float(approach.distance):
-                continue
-            if self.filters['distance_max'] and not self.filters['distance_max'] >= float(approach.distance):
-                continue
-            if self.filters['velocity_min'] and not self.filters['velocity_min'] <= float(approach.velocity):
-                continue
-            if self.filters['velocity_max'] and not self.filters['velocity_max'] >= float(approach.velocity):
-                continue 
-            if self.filters['diameter_min'] and approach.neo.diameter != '':
-                if not (self.filters['diameter_min'] <= float(approach.neo.diameter)):
-                    continue  
-            if self.filters['diameter_max'] and approach.neo.diameter != '':
-                if not (self.filters['diameter_max'] >= float(approach.neo.diameter)):
-                    continue  
-            if self.filters.get('hazardous')==True and not approach.neo.hazardous == True:
-                continue  
-            if self.filters.get('hazardous')==False and not approach.neo.hazardous == False:
-                continue   
-            
-            yield approach
+        return self.approaches_at(self.select(filters, workers))
+
+    def select(self, filters=(), workers=None):
+        """Query close approaches to generate the positions of those that match a collection of filters.
+
+        This is the same as `query`, except that it generates the positions of
+        the matching close approaches, which `approaches_at` turns back into
+        `CloseApproach` objects, so that the results can be kept compactly.
+
+        Date filters are answered by bisecting each run of the time index, and a
+        narrow range of diameters by bisecting the diameter index (see
+        `_diameter_candidates`). The rest of the filters are checked against
+        each close approach that is left.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param workers: The number of worker processes to scan with, or None to scan in this process.
+        :return: A stream of the positions of matching close approaches, in order of approach time.
+        """
+        start_dates, end_dates, predicates = self._split_filters(filters)
+
+        # A narrow diameter range is answered with the diameter index instead.
+        candidates = self._diameter_candidates(start_dates, end_dates, predicates)
+        if candidates is not None:
+            positions, predicates = candidates
+            if self._columns is not None and all(criterion.column for criterion in predicates):
+                positions = numpy.asarray(positions, dtype=numpy.intp)
+                yield from positions[self._columns.mask(predicates, positions)].tolist()
+            else:
+                yield from self._scan(positions, predicates)
+            return
+
+        # Each run of the time index is searched separately, and the matches
+        # from all of them are merged back into time order.
+        selections = []
+        for run, (time_order, time_keys) in enumerate(self._time_runs):
+            start, stop = self._time_slice(time_keys, start_dates, end_dates)
+            if self._columns is not None and all(criterion.column for criterion in predicates):
+                order = None if run == 0 else time_order
+                selections.append(self._columns.select(predicates, start, stop, order))
+            elif workers and workers > 1 and predicates and FORK_AVAILABLE:
+                selections.append(self._scan_in_parallel(time_order, start, stop,
+                                                         predicates, workers))
+            else:
+                selections.append(self._scan(time_order[start:stop], predicates))
+
+        if len(selections) == 1:
+            yield from selections[0]
+        else:
+            approaches = self._approaches
+            yield from heapq.merge(*selections,
+                                   key=lambda index: (approaches[index].minutes, index))
+
+    def select_columns(self, filters=()):
+        """Select the close approaches that match a collection of filters with the columnar store.
+
+        This is the same as `select`, except that the positions of the matches
+        are returned all at once, as an array in no particular order, along with
+        the store, so that the matches can be processed as vectorized operations.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: A tuple of the `ColumnarStore` and an array of the positions of the matches in it,
+                 or None if the database has no columnar store or it can't evaluate every filter.
+        """
+        start_dates, end_dates, predicates = self._split_filters(filters)
+        if self._columns is None or not all(criterion.column for criterion in predicates):
+            return None
+        candidates = self._diameter_candidates(start_dates, end_dates, predicates)
+        if candidates is not None:
+            positions, predicates = candidates
+            positions = numpy.asarray(positions, dtype=numpy.intp)
+            return self._columns, positions[self._columns.mask(predicates, positions)]
+        selections = []
+        for run, (time_order, time_keys) in enumerate(self._time_runs):
+            start, stop = self._time_slice(time_keys, start_dates, end_dates)
+            order = None if run == 0 else time_order
+            selections.append(self._columns.select(predicates, start, stop, order))
+        return self._columns, numpy.concatenate(selections)
+
+    def approaches_at(self, positions):
+        """Generate the close approaches at some positions, as generated by `select`.
+
+        :param positions: An iterable of positions of close approaches.
+        :return: A stream of `CloseApproach` objects.
+        """
+        approaches = self._approaches
+        for index in positions:
+            yield approaches[index]
+
+    @staticmethod
+    def _split_filters(filters):
+        """Split a collection of filters into date bounds and other predicates.
+
+        Filters that bound the date of a close approach are answered with the
+        time index. The remaining filters are only checked against the slice of
+        the time index within those bounds.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: A tuple of lists of start dates, of end dates, and of the other filters.
+        """
+        start_dates, end_dates, predicates = [], [], []
+        for criterion in filters:
+            if isinstance(criterion, DateFilter) and criterion.op in (operator.eq, operator.ge, operator.le):
+                if criterion.op is not operator.le:
+                    start_dates.append(criterion.value)
+                if criterion.op is not operator.ge:
+                    end_dates.append(criterion.value)
+            else:
+                predicates.append(criterion)
+        return start_dates, end_dates, predicates
+
+    def _diameter_candidates(self, start_dates, end_dates, predicates):
+        """Find the close approaches within a diameter range with the diameter index, if it is narrow.
+
+        The diameter filters bound the diameters of the NEOs of interest, which
+        are found by bisecting the diameter index. NEOs of unknown diameter
+        (and close approaches without a known NEO) never match a diameter
+        filter, so they are skipped entirely. The close approaches of the NEOs
+        of interest are then limited to the date bounds and sorted by time.
+
+        The index is only used if there are diameter filters, and if it leaves
+        a small fraction of the close approaches within the date bounds to
+        check against the rest of the filters (see `DIAMETER_INDEX_FRACTION`).
+
+        :param start_dates: A collection of `date`s on or after which a close approach occurs.
+        :param end_dates: A collection of `date`s on or before which a close approach occurs.
+        :param predicates: A collection of the other filters.
+        :return: A tuple of a sequence of the positions of the candidate close approaches, in order
+                 of approach time (as an array, if the rest of the filters can be checked against
+                 the columnar store), and a list of the filters that are left to check, or None.
+        """
+        lower, upper, remaining = -math.inf, math.inf, []
+        for criterion in predicates:
+            if isinstance(criterion, DiameterFilter) and criterion.op in (operator.eq, operator.ge, operator.le):
+                if criterion.op is not operator.le:
+                    lower = max(lower, criterion.value)
+                if criterion.op is not operator.ge:
+                    upper = min(upper, criterion.value)
+            else:
+                remaining.append(criterion)
+        if len(remaining) == len(predicates):
+            return None
+
+        first = bisect.bisect_left(self._diameter_keys, lower)
+        last = bisect.bisect_right(self._diameter_keys, upper)
+        groups = self._diameter_groups(first, last)
+        columnar = self._columns is not None and all(criterion.column for criterion in remaining)
+        fraction = COLUMNAR_DIAMETER_INDEX_FRACTION if columnar else DIAMETER_INDEX_FRACTION
+        dated = 0
+        for _, time_keys in self._time_runs:
+            start, stop = self._time_slice(time_keys, start_dates, end_dates)
+            dated += stop - start
+        if sum(map(len, groups)) > fraction * dated:
+            return None
+
+        # Sort the candidates by time, breaking ties by position as the time index does.
+        earliest, latest = self._time_bounds(start_dates, end_dates)
+        if columnar:
+            positions = numpy.concatenate([numpy.asarray(positions, dtype=numpy.intp)
+                                           for positions in groups] or [numpy.empty(0, numpy.intp)])
+            times = self._columns.time[positions]
+            within = (times >= earliest) & (times < latest)
+            positions, times = positions[within], times[within]
+            return positions[numpy.lexsort((positions, times))], remaining
+        approaches = self._approaches
+        if isinstance(approaches, CompiledApproaches):
+            minutes_at = approaches.columns['time'].__getitem__
+        else:
+            minutes_at = lambda index: approaches[index].minutes
+        candidates = []
+        for positions in groups:
+            for index in positions:
+                minutes = minutes_at(index)
+                if earliest <= minutes < latest:
+                    candidates.append((minutes, index))
+        candidates.sort()
+        return [index for _, index in candidates], remaining
+
+    def _diameter_groups(self, first, last):
+        """Return the positions of the close approaches of the NEOs in a slice of the diameter index.
+
+        :param first: The start of the slice of the diameter index.
+        :param last: The end of the slice of the diameter index.
+        :return: A list of a sequence of positions, in order of approach time, for each NEO in the slice.
+        """
+        approaches = self._approaches
+        if isinstance(approaches, CompiledApproaches):
+            return [approaches.positions_of(position)
+                    for position in approaches.columns['diameter_order'][first:last]]
+        return [self._diameter_positions[designation]
+                for designation in self._diameter_designations[first:last]]
+
+    def _scan_in_parallel(self, time_order, start, stop, predicates, workers):
+        """Generate the positions in a slice of a time index run that satisfy every predicate, in parallel.
+
+        The slice is split into `SHARDS_PER_WORKER` shards for each worker, so
+        that matches from the first shards can be generated while the workers
+        scan the rest.
+
+        :param time_order: The positions of a run of the time index.
+        :param start: The start of the slice of `time_order` to scan.
+        :param stop: The end of the slice of `time_order` to scan.
+        :param predicates: A collection of `AttributeFilter`s.
+        :param workers: The number of worker processes to scan with.
+        :return: A stream of positions in `_approaches`, in order of approach time.
+        """
+        count = workers * SHARDS_PER_WORKER
+        bounds = [start + (stop - start) * shard // count for shard in range(count + 1)]
+        shards = [(lower, upper) for lower, upper in zip(bounds, bounds[1:]) if lower < upper]
+
+        # The workers are forked, so they share the database, run, and
+        # predicates without pickling them. Every worker (including any that
+        # the pool forks later to replace one) is handed them on startup.
+        pool = multiprocessing.get_context('fork').Pool(
+            workers, initializer=_start_scan_worker, initargs=(self, time_order, predicates))
+
+        try:
+            for positions in pool.imap(_scan_shard, shards):
+                yield from positions
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _scan(self, positions, predicates):
+        """Generate the positions of the close approaches that satisfy every predicate.
+
+        The predicates are checked with short-circuiting, cheapest first. While
+        scanning, the database tracks how often each predicate rejects a close
+        approach, and periodically reorders the predicates so that the ones
+        that reject the most close approaches for their cost are checked first.
+
+        :param positions: An iterable of positions in `_approaches`.
+        :param predicates: A collection of `AttributeFilter`s.
+        :return: A stream of the matching positions.
+        """
+        predicates = sorted(predicates, key=lambda predicate: predicate.cost)
+        if not predicates:
+            yield from positions
+            return
+
+        checked = {predicate: 0 for predicate in predicates}
+        rejected = {predicate: 0 for predicate in predicates}
+
+        for count, index in enumerate(positions, 1):
+            approach = self._approaches[index]
+            for predicate in predicates:
+                checked[predicate] += 1
+                if not predicate(approach):
+                    rejected[predicate] += 1
+                    break
+            else:
+                yield index
+
+            if count % REORDER_INTERVAL == 0:
+                # Prefer the predicates with the lowest cost per rejection.
+                predicates.sort(key=lambda predicate: predicate.cost * (checked[predicate] + 1)
+                                / (rejected[predicate] + 1))
+
+    @staticmethod
+    def _time_slice(time_keys, start_dates=(), end_dates=()):
+        """Find the slice of a run of the time index that falls within some date bounds.
+
+        Every bound is inclusive, and a close approach must fall within all of
+        them. With no bounds, the slice covers the entire run.
+
+        :param time_keys: The approach times of a run of the time index.
+        :param start_dates: A collection of `date`s on or after which a close approach occurs.
+        :param end_dates: A collection of `date`s on or before which a close approach occurs.
+        :return: A tuple of the start and stop positions of the slice of the run.
+        """
+        start, stop = 0, len(time_keys)
+        earliest, latest = NEODatabase._time_bounds(start_dates, end_dates)
+        if start_dates:
+            start = bisect.bisect_left(time_keys, earliest)
+        if end_dates:
+            stop = bisect.bisect_left(time_keys, latest)
+        return start, max(start, stop)
+
+    @staticmethod
+    def _time_bounds(start_dates=(), end_dates=()):
+        """Convert some date bounds into a half-open range of approach times.
+
+        :param start_dates: A collection of `date`s on or after which a close approach occurs.
+        :param end_dates: A collection of `date`s on or before which a close approach occurs.
+        :return: A tuple of the earliest approach time within the bounds, and of the first time
+                 after them, in minutes since the Unix epoch (or infinite, if there are no bounds).
+        """
+        earliest, latest = -math.inf, math.inf
+        if start_dates:
+            earliest = date_to_days(max(start_dates)) * MINUTES_PER_DAY
+        if end_dates:
+            latest = (date_to_days(min(end_dates)) + 1) * MINUTES_PER_DAY
+        return earliest, latest
+
+
+def _start_scan_worker(database, time_order, predicates):
+    """Set up a worker process forked by `NEODatabase._scan_in_parallel` to scan shards of a run."""
+    global _PARALLEL_SCAN
+    _PARALLEL_SCAN = database, time_order, predicates
+
+
+def _scan_shard(shard):
+    """Scan a shard of the time index in a worker process forked by `NEODatabase._scan_in_parallel`.
+
+    :param shard: A tuple of the start and stop positions of the shard in the run being scanned.
+    :return: An array of the matching positions in `_approaches`.
+    """
+    database, time_order, predicates = _PARALLEL_SCAN
+    start, stop = shard
+    return array.array('q', database._scan(time_order[start:stop], predicates))
+
+
+def _merge_runs(older, newer):
+    """Merge two runs of the time index into one, breaking ties in time by position."""
+    merged = list(heapq.merge(zip(older[1], older[0]), zip(newer[1], newer[0])))
+    return [index for _, index in merged], [key for key, _ in merged]
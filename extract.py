@@ -2,10 +2,15 @@
 
 The `load_neos` function extracts NEO data from a CSV file, formatted as
 described in the project instructions, into a collection of `NearEarthObject`s.
+It is built on `iter_neos`, which generates the `NearEarthObject`s one row at a
+time, reading only the columns of interest (with `neos_from_lines`).
 
 The `load_approaches` function extracts close approach data from a JSON file,
 formatted as described in the project instructions, into a collection of
-`CloseApproach` objects.
+`CloseApproach` objects. It is built on `iter_approaches`, which parses the
+file incrementally and generates the `CloseApproach` objects one at a time. The
+`find_data_array` function locates the array of close approach records in the
+file, so that it can be split between worker processes (see `parallel`).
 
 The main module calls these functions with the arguments provided at the command
 line, and uses the resulting collections to build an `NEODatabase`.
@@ -14,27 +19,64 @@ You'll edit this file in Task 2.
 """
 import csv
 import json
+import operator
 
 from models import NearEarthObject, CloseApproach
 
 
+# The columns of the NEO CSV file that hold the primary designation, name,
+# diameter, and potentially hazardous flag of each NEO, in that order.
+NEO_COLUMNS = ('pdes', 'name', 'diameter', 'pha')
+
+
 def load_neos(neo_csv_path):
     """Read near-Earth object information from a CSV file.
 
     :param neo_csv_path: A path to a CSV file containing data about near-Earth objects.
     :return: A collection of `NearEarthObject`s.
     """
-    neo_list = []
-    neo_collection = []
+    return list(iter_neos(neo_csv_path))
+
+
+def iter_neos(neo_csv_path):
+    """Generate near-Earth objects from a CSV file, one at a time.
+
+    The positions of the columns of interest are resolved once from the header.
+    Rows without quoted fields are split only as far as the last of those
+    columns, and the remaining rows fall back to a full CSV parse.
+
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth objects.
+    :yield: The `NearEarthObject` for each row of the file, in order.
+    """
+    with open(neo_csv_path, newline='') as csv_file:
+        yield from neos_from_lines(csv_file)
+
 
-    with open(neo_csv_path) as csv_file:
-        csv_reader = csv.DictReader(csv_file)
-        for row in csv_reader:
-             neo_list.append((dict([('designation',row['pdes']), ('name', row['name']),('diameter', row['diameter']),('hazardous', row['pha'])])))
+def neos_from_lines(lines):
+    """Generate near-Earth objects from the lines of a CSV file, starting with its header.
 
-    for neo_dict in neo_list:
-        neo_collection.append(NearEarthObject(**neo_dict))
-    return neo_collection
+    :param lines: An iterator of the lines of a CSV file, with their line endings.
+    :yield: The `NearEarthObject` for each row, in order.
+    """
+    header = next(csv.reader([next(lines)]))
+    positions = [header.index(column) for column in NEO_COLUMNS]
+    project = operator.itemgetter(*positions)
+    splits = max(positions) + 1
+
+    for line in lines:
+        if '"' in line:
+            # A quoted field may contain commas, or even span several lines.
+            while line.count('"') % 2:
+                line += next(lines)
+            row = next(csv.reader([line]))
+        else:
+            row = line.rstrip('\r\n').split(',', splits)
+            if row == ['']:
+                # Skip blank lines, as `csv.DictReader` does.
+                continue
+        designation, name, diameter, hazardous = project(row)
+        yield NearEarthObject(designation=designation, name=name,
+                              diameter=diameter, hazardous=hazardous)
 
 
 def load_approaches(cad_json_path):
@@ -43,16 +85,178 @@ def load_approaches(cad_json_path):
     :param cad_json_path: A path to a JSON file containing data about close approaches.
     :return: A collection of `CloseApproach`es.
     """
-    cap_list = []
-    cap_collection = []
+    return list(iter_approaches(cad_json_path))
+
 
+def iter_approaches(cad_json_path):
+    """Generate close approaches from a JSON file, one at a time.
+
+    The `data` array of the file is parsed incrementally, so only a small window
+    of the raw file is held in memory at once, alongside the `CloseApproach`es
+    that the caller has kept.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :yield: The `CloseApproach` for each record of the `data` array, in order.
+    """
     with open(cad_json_path, 'r') as json_file:
-        json_reader = json.load(json_file)
+        yield from approaches_from_records(_JSONArrayStream(json_file).iter_array('data'))
+
+
+def iter_array_values(json_file):
+    """Generate the values of a JSON array in a text file, one at a time.
+
+    The array must be the next value in the file, and anything after it is
+    ignored.
+
+    :param json_file: A text file, opened for reading.
+    :yield: Each value of the array, in order.
+    """
+    return _JSONArrayStream(json_file).iter_values()
+
+
+def approaches_from_records(records):
+    """Generate close approaches from records of the `data` array of a JSON file.
+
+    :param records: An iterable of records, each a list of the fields of a close approach.
+    :yield: The `CloseApproach` for each record, in order.
+    """
+    for record in records:
+        yield CloseApproach(_designation=record[0], time=record[3],
+                            distance=record[4], velocity=record[7])
+
+
+def find_data_array(cad_json_path):
+    """Find where the `data` array of a JSON file of close approaches starts.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :return: The offset in bytes of the opening bracket of the `data` array.
+    :raise ValueError: If the file isn't an object that has a `data` array.
+    """
+    # Decoding as Latin-1 maps each byte to one character, so that positions in
+    # the text are also offsets in the file. Only the structure of the object
+    # is of interest, and that is all ASCII.
+    with open(cad_json_path, 'r', encoding='latin-1', newline='') as json_file:
+        stream = _JSONArrayStream(json_file)
+        stream.find('data')
+        return stream.tell()
+
+
+class _JSONArrayStream:
+    """An incremental reader of an array of values in a top-level JSON object.
+
+    The file is read in chunks of `CHUNK_SIZE` characters into a buffer, from
+    which the values are decoded one at a time with `json.JSONDecoder.raw_decode`.
+    The values of the other keys of the object are decoded and discarded.
+    """
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, file):
+        """Create a new `_JSONArrayStream` over a text file.
+
+        :param file: A text file, opened for reading, that contains a JSON object.
+        """
+        self.file = file
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.offset = 0
+
+    def iter_array(self, key):
+        """Generate the values of the array under a given key of the top-level object.
+
+        :param key: The key of the array of interest.
+        :yield: Each value of the array, in order.
+        :raise ValueError: If the document isn't an object that has an array under `key`.
+        """
+        self.find(key)
+        yield from self.iter_values()
+
+    def find(self, key):
+        """Skip ahead to the value under a given key of the top-level object.
+
+        :param key: The key of the value of interest.
+        :raise ValueError: If the document isn't an object that has an array under `key`.
+        """
+        self.expect('{')
+        while self.peek() != '}':
+            name = self.decode()
+            self.expect(':')
+            if name == key:
+                if self.peek() != '[':
+                    break
+                return
+            self.decode()
+            if self.peek() == ',':
+                self.pos += 1
+        raise ValueError(f"The JSON document has no {key!r} array.")
+
+    def tell(self):
+        """Return the position in the file of the next unconsumed character."""
+        return self.offset + self.pos
+
+    def iter_values(self):
+        """Generate the values of the array that starts at the current position."""
+        self.expect('[')
+        if self.peek() == ']':
+            return
+        while True:
+            yield self.decode()
+            separator = self.peek()
+            self.pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' in a JSON array, not {separator!r}.")
+
+    def fill(self):
+        """Discard the consumed part of the buffer and read the next chunk into it.
+
+        The chunk is at least as large as the unconsumed part of the buffer, so
+        that a value spanning many chunks is only decoded a logarithmic number
+        of times.
+
+        :return: Whether there was anything left in the file to read.
+        """
+        chunk = self.file.read(max(self.CHUNK_SIZE, len(self.buffer) - self.pos))
+        if not chunk:
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.offset += self.pos
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Skip any whitespace and return the next character, without consuming it."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise ValueError("Unexpected end of the JSON document.")
+
+    def expect(self, character):
+        """Skip any whitespace and consume the given character."""
+        if self.peek() != character:
+            raise ValueError(f"Expected {character!r} in the JSON document, "
+                             f"not {self.buffer[self.pos]!r}.")
+        self.pos += 1
 
-    for i in range(len(json_reader['data'])):
-        cap_list += [dict(zip(['_designation', 'time', 'distance', 'velocity'], [json_reader['data'][i][0], json_reader['data'][i][3], json_reader['data'][i][4], json_reader['data'][i][7]]))] 
+    def decode(self):
+        """Skip any whitespace and decode the next value.
 
-    for cap_dict in cap_list:
-        cap_collection.append(CloseApproach(**cap_dict))
-  
-    return cap_collection
+        A value that runs into the end of the buffer may be incomplete (such as
+        a number cut in two), so it is decoded again after reading more.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            if end < len(self.buffer) or not self.fill():
+                break
+        self.pos = end
+        return value
@@ -12,12 +12,25 @@ method `get` that subclasses can override to fetch an attribute of interest from
 the supplied `CloseApproach`.
 
 The `limit` function simply limits the maximum number of values produced by an
-iterator.
+iterator, and the `sort_results` function sorts a stream of close approaches by
+one of their attributes (or selects the first few of them in that order).
 
 You'll edit this file in Tasks 3a and 3c.
 """
+import functools
+import heapq
+import math
 import operator
-from itertools import islice
+from itertools import chain, islice
+
+from helpers import MINUTES_PER_DAY, date_to_days
+
+
+# Selecting the first `n` close approaches with a heap only pays off if `n` is
+# small, and the stream holds many times as many close approaches; otherwise
+# sorting all of them is faster, and takes little more memory.
+HEAP_SELECTION_MAX = 10000
+HEAP_SELECTION_RATIO = 4
 
 
 class UnsupportedCriterionError(NotImplementedError):
@@ -38,7 +51,15 @@ class AttributeFilter:
 
     Concrete subclasses can override the `get` classmethod to provide custom
     behavior to fetch a desired attribute from the given `CloseApproach`.
+
+    Each subclass also declares a relative `cost` of evaluating it on a close
+    approach, which `NEODatabase.query` uses to decide which filters to check
+    first, and the name of the `column` of a `ColumnarStore` that holds the
+    attribute of interest, if there is one.
     """
+    cost = 1
+    column = None
+
     def __init__(self, op, value):
         """Construct a new `AttributeFilter` from an binary predicate and a reference value.
 
@@ -73,6 +94,72 @@ class AttributeFilter:
         return f"{self.__class__.__name__}(op=operator.{self.op.__name__}, value={self.value})"
 
 
+class DateFilter(AttributeFilter):
+    """A filter on the date of a close approach.
+
+    The filter compares whole days since the Unix epoch, which are cheap to
+    compute from `CloseApproach.minutes`, so that evaluating it doesn't build
+    the `datetime` of every close approach it checks.
+    """
+    cost = 2
+    column = 'day'
+
+    def __init__(self, op, value):
+        super().__init__(op, value)
+        self.day = date_to_days(value)
+
+    def __call__(self, approach):
+        """Invoke `self(approach)`."""
+        return self.op(approach.minutes // MINUTES_PER_DAY, self.day)
+
+    @classmethod
+    def get(cls, approach):
+        """Get the date of a close approach."""
+        return approach.time.date()
+
+
+class DistanceFilter(AttributeFilter):
+    """A filter on the nominal approach distance of a close approach."""
+    column = 'distance'
+
+    @classmethod
+    def get(cls, approach):
+        """Get the nominal approach distance of a close approach."""
+        return approach.distance
+
+
+class VelocityFilter(AttributeFilter):
+    """A filter on the relative approach velocity of a close approach."""
+    column = 'velocity'
+
+    @classmethod
+    def get(cls, approach):
+        """Get the relative approach velocity of a close approach."""
+        return approach.velocity
+
+
+class DiameterFilter(AttributeFilter):
+    """A filter on the diameter of the NEO of a close approach."""
+    cost = 2
+    column = 'diameter'
+
+    @classmethod
+    def get(cls, approach):
+        """Get the diameter of the NEO of a close approach, or NaN if the NEO isn't known."""
+        return approach.neo.diameter if approach.neo else float('nan')
+
+
+class HazardousFilter(AttributeFilter):
+    """A filter on whether the NEO of a close approach is potentially hazardous."""
+    cost = 2
+    column = 'hazardous'
+
+    @classmethod
+    def get(cls, approach):
+        """Get whether the NEO of a close approach is known to be potentially hazardous."""
+        return bool(approach.neo and approach.neo.hazardous)
+
+
 def create_filters(
         date=None, start_date=None, end_date=None,
         distance_min=None, distance_max=None,
@@ -94,8 +181,9 @@ def create_filters(
     `hazardous=False`, not to be confused with `hazardous=None`).
 
     The return value must be compatible with the `query` method of `NEODatabase`
-    because the main module directly passes this result to that method. For now,
-    this can be thought of as a collection of `AttributeFilter`s.
+    because the main module directly passes this result to that method. It is a
+    list of `AttributeFilter`s, one for each criterion that was specified -
+    unspecified criteria produce no filter at all.
 
     :param date: A `date` on which a matching `CloseApproach` occurs.
     :param start_date: A `date` on or after which a matching `CloseApproach` occurs.
@@ -109,17 +197,28 @@ def create_filters(
     :param hazardous: Whether the NEO of a matching `CloseApproach` is potentially hazardous.
     :return: A collection of filters for use with `query`.
     """
-    return dict(date=date,
-                start_date=start_date,
-                end_date=end_date,
-                distance_min=distance_min,
-                distance_max=distance_max,
-                velocity_min=velocity_min,
-                velocity_max=velocity_max,
-                diameter_min=diameter_min,
-                diameter_max=diameter_max,
-                hazardous=hazardous)
-
+    filters = []
+    if date is not None:
+        filters.append(DateFilter(operator.eq, date))
+    if start_date is not None:
+        filters.append(DateFilter(operator.ge, start_date))
+    if end_date is not None:
+        filters.append(DateFilter(operator.le, end_date))
+    if distance_min is not None:
+        filters.append(DistanceFilter(operator.ge, distance_min))
+    if distance_max is not None:
+        filters.append(DistanceFilter(operator.le, distance_max))
+    if velocity_min is not None:
+        filters.append(VelocityFilter(operator.ge, velocity_min))
+    if velocity_max is not None:
+        filters.append(VelocityFilter(operator.le, velocity_max))
+    if diameter_min is not None:
+        filters.append(DiameterFilter(operator.ge, diameter_min))
+    if diameter_max is not None:
+        filters.append(DiameterFilter(operator.le, diameter_max))
+    if hazardous is not None:
+        filters.append(HazardousFilter(operator.eq, hazardous))
+    return filters
 
 
 def limit(iterator, n=None):
@@ -136,3 +235,52 @@ def limit(iterator, n=None):
         limitedIterator = islice(iterator, n)
         return limitedIterator
     return iterator
+
+
+def sort_results(results, by='time', descending=False, n=None):
+    """Sort a stream of close approaches by one of their attributes.
+
+    Close approaches of NEOs with an unknown diameter (or of unknown NEOs) come
+    last when sorting by diameter, in either order. Ties keep the order of the
+    stream.
+
+    If `n` is given, only the first `n` close approaches in sorted order are
+    produced. If `n` is at most `HEAP_SELECTION_MAX` and the stream holds more
+    than `HEAP_SELECTION_RATIO` times as many close approaches, they are
+    selected with a heap of at most `n` close approaches, so that memory use
+    doesn't grow with the length of the stream. Otherwise, they are sorted.
+
+    :param results: An iterable of `CloseApproach`es.
+    :param by: The attribute to sort by, one of `SORT_KEYS`.
+    :param descending: Whether to sort from the largest value to the smallest.
+    :param n: The maximum number of close approaches to produce, or 0 or None for all of them.
+    :return: An iterator of the close approaches, in sorted order.
+    """
+    key = SORT_KEYS[by]
+    if by == 'diameter':
+        key = functools.partial(key, descending)
+    if n and n <= HEAP_SELECTION_MAX:
+        results = iter(results)
+        head = list(islice(results, HEAP_SELECTION_RATIO * n + 1))
+        if len(head) > HEAP_SELECTION_RATIO * n:
+            select = heapq.nlargest if descending else heapq.nsmallest
+            return iter(select(n, chain(head, results), key=key))
+        results = head
+    return iter(sorted(results, key=key, reverse=descending)[:n or None])
+
+
+def _diameter_key(descending, approach):
+    """Get a key to sort close approaches by diameter, with unknown diameters last."""
+    diameter = approach.neo.diameter if approach.neo else float('nan')
+    unknown = math.isnan(diameter)
+    return unknown != descending, 0.0 if unknown else diameter
+
+
+# The functions that get the attribute to sort close approaches by, for each
+# choice of `sort_results`.
+SORT_KEYS = {
+    'time': operator.attrgetter('minutes'),
+    'distance': operator.attrgetter('distance'),
+    'velocity': operator.attrgetter('velocity'),
+    'diameter': _diameter_key,
+}
@@ -9,8 +9,30 @@ The `datetime_to_str` function converts a Python `datetime` into a string.
 Although `datetime`s already have human-readable string representations, those
 representations display seconds, but NASA's data (and our datetimes!) don't
 provide that level of resolution, so the output format also will not.
+
+The `datetime_to_minutes` and `minutes_to_datetime` functions convert between
+Python `datetime`s and a compact integer encoding - whole minutes since the Unix
+epoch - that is convenient for storing times in numeric arrays. The
+`cd_to_minutes` function converts a `cd` string straight into that encoding,
+and `date_to_days` similarly encodes a `date` as whole days since the epoch
+(which `days_to_date` decodes).
 """
 import datetime
+import functools
+
+
+# The abbreviated English month names used by NASA, numbered from 1.
+MONTHS = {name: number for number, name in enumerate(
+    ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'), 1)}
+
+# The reference point for integer encodings of datetimes.
+EPOCH = datetime.datetime(1970, 1, 1)
+
+MINUTES_PER_DAY = 24 * 60
+
+# How many distinct dates to memoize. Close approaches arrive roughly in order
+# of time, so recent dates are the ones that repeat.
+DATE_CACHE_SIZE = 4096
 
 
 def cd_to_datetime(calendar_date):
@@ -23,12 +45,56 @@ def cd_to_datetime(calendar_date):
 
     This will become the Python object `datetime.datetime(2020, 12, 31, 12, 0)`.
 
+    The fixed-width fields are sliced out directly, and the date part of each
+    string is memoized (in a bounded cache) since many close approaches share a
+    date. Any string that isn't exactly in this fixed-width format is left to
+    `strptime`.
+
     :param calendar_date: A calendar date in YYYY-bb-DD hh:mm format.
     :return: A naive `datetime` corresponding to the given calendar date and time.
     """
+    if len(calendar_date) == 17 and calendar_date[11] == ' ' and calendar_date[14] == ':':
+        date = _parse_cd_date(calendar_date[:11])
+        hour, minute = calendar_date[12:14], calendar_date[15:17]
+        if date and hour.isdigit() and minute.isdigit():
+            return datetime.datetime(*date[:3], int(hour), int(minute))
     return datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
 
 
+@functools.lru_cache(maxsize=DATE_CACHE_SIZE)
+def _parse_cd_date(date):
+    """Parse the YYYY-bb-DD date part of a NASA-formatted calendar date.
+
+    :param date: The first 11 characters of a calendar date.
+    :return: A tuple of the year, month, day, and days since the Unix epoch,
+             or None if the date isn't in that format.
+    """
+    year, month, day = date[:4], MONTHS.get(date[5:8]), date[9:11]
+    if date[4] != '-' or date[8] != '-' or not month or not year.isdigit() or not day.isdigit():
+        return None
+    year, day = int(year), int(day)
+    return year, month, day, date_to_days(datetime.date(year, month, day))
+
+
+def cd_to_minutes(calendar_date):
+    """Convert a NASA-formatted calendar date/time description into minutes since the Unix epoch.
+
+    This is equivalent to `datetime_to_minutes(cd_to_datetime(calendar_date))`,
+    but doesn't build a `datetime` for strings in the usual fixed-width format.
+
+    :param calendar_date: A calendar date in YYYY-bb-DD hh:mm format.
+    :return: The number of minutes since 1970-01-01 00:00, as an int.
+    """
+    if len(calendar_date) == 17 and calendar_date[11] == ' ' and calendar_date[14] == ':':
+        date = _parse_cd_date(calendar_date[:11])
+        hour, minute = calendar_date[12:14], calendar_date[15:17]
+        if date and hour.isdigit() and minute.isdigit():
+            hour, minute = int(hour), int(minute)
+            if hour < 24 and minute < 60:
+                return date[3] * MINUTES_PER_DAY + hour * 60 + minute
+    return datetime_to_minutes(cd_to_datetime(calendar_date))
+
+
 def datetime_to_str(dt):
     """Convert a naive Python datetime into a human-readable string.
 
@@ -41,4 +107,47 @@ def datetime_to_str(dt):
     :param dt: A naive Python datetime.
     :return: That datetime, as a human-readable string without seconds.
     """
-    return datetime.datetime.strftime(dt, "%Y-%m-%d %H:%M")
+    return dt.isoformat(' ', 'minutes')
+
+
+def datetime_to_minutes(dt):
+    """Convert a naive Python datetime into whole minutes since the Unix epoch.
+
+    Any seconds (and microseconds) are discarded, and datetimes before the epoch
+    become negative numbers of minutes.
+
+    :param dt: A naive Python datetime.
+    :return: The number of minutes since 1970-01-01 00:00, as an int.
+    """
+    return (dt - EPOCH) // datetime.timedelta(minutes=1)
+
+
+def minutes_to_datetime(minutes):
+    """Convert whole minutes since the Unix epoch into a naive Python datetime.
+
+    This is the inverse of `datetime_to_minutes`.
+
+    :param minutes: A number of minutes since 1970-01-01 00:00.
+    :return: A naive `datetime` corresponding to the given number of minutes.
+    """
+    return EPOCH + datetime.timedelta(minutes=int(minutes))
+
+
+def date_to_days(date):
+    """Convert a Python date into whole days since the Unix epoch.
+
+    :param date: A Python `date`.
+    :return: The number of days since 1970-01-01, as an int.
+    """
+    return (date - EPOCH.date()).days
+
+
+def days_to_date(days):
+    """Convert whole days since the Unix epoch into a Python date.
+
+    This is the inverse of `date_to_days`.
+
+    :param days: A number of days since 1970-01-01.
+    :return: The corresponding `date`.
+    """
+    return EPOCH.date() + datetime.timedelta(days=int(days))
@@ -5,7 +5,7 @@ See `README.md` for a detailed discussion of this project.
 
 This script can be invoked from the command line::
 
-    $ python3 main.py {inspect,query,interactive} [args]
+    $ python3 main.py {inspect,query,aggregate,interactive,compile} [args]
 
 The `inspect` subcommand looks up an NEO by name or by primary designation, and
 optionally lists all of that NEO's known close approaches:
@@ -23,31 +23,84 @@ The `query` subcommand searches for close approaches that match given criteria:
     $ python3 main.py query --start-date 2000-01-01 --max-diameter 0.1 --not-hazardous
     $ python3 main.py query --hazardous --max-distance 0.05 --min-velocity 30
 
-The set of results can be limited in size and/or saved to an output file in CSV
-or JSON format:
+The matches can be sorted by another attribute, optionally in descending order,
+to find (say) the 20 closest approaches of potentially hazardous NEOs this decade:
+
+    $ python3 main.py query --start-date 2020-01-01 --hazardous --sort-by distance --limit 20
+    $ python3 main.py query --max-distance 0.1 --sort-by velocity --desc --limit 5
+
+A query that has to check many close approaches can be run in parallel:
+
+    $ python3 main.py query --min-velocity 30 --limit 100 --jobs 4
+
+The set of results can be limited in size and/or saved to an output file in CSV,
+JSON, newline-delimited JSON, or SQLite format:
 
     $ python3 main.py query --limit 5 --outfile results.csv
     $ python3 main.py query --limit 15 --outfile results.json
+    $ python3 main.py query --outfile results.ndjson
+    $ python3 main.py query --outfile results.sqlite
+
+The `aggregate` subcommand summarizes the close approaches that match the same
+criteria in groups - by year, by month, by NEO, or by hazard flag - with the
+number of close approaches in each group and the minimum, mean, and maximum of
+their distances and velocities. The summary is printed as a table, or saved to
+an output file in CSV or JSON format:
+
+    $ python3 main.py aggregate --by year --hazardous
+    $ python3 main.py aggregate --by month --start-date 2020-01-01 --end-date 2020-12-31
+    $ python3 main.py aggregate --by neo --max-distance 0.01 --outfile neos.csv
+    $ python3 main.py aggregate --by hazardous --min-velocity 30 --outfile hazard.json
 
 The `interactive` subcommand loads the NEO database and spawns an interactive
-command shell that can repeatedly execute `inspect` and `query` commands without
-having to wait to reload the database each time. However, it doesn't hot-reload.
+command shell that can repeatedly execute `inspect`, `query`, and `aggregate` commands without
+having to wait to reload the database each time. When records are appended to
+the data files, the shell adds them to its database in the background (and it
+rebuilds the database if existing records change), unless `--no-reload` is given.
+However, it doesn't hot-reload changes to the code.
+The shell caches the results of recent queries, so that a repeated query (with
+any `--limit` or `--outfile`) is answered without scanning the close approaches
+again; its `cache` command shows how often that happened, or clears the cache.
 
 If needed, the script can load data from data files other than the default with
-`--neofile` or `--cadfile`.
+`--neofile` or `--cadfile`. With `--columnar` (which requires NumPy), queries are
+evaluated as vectorized operations over columns of the close approach data.
+
+After the database is first built from the data files, a snapshot of it is saved
+in the `.cache` folder (or, if that can't be written, in the user's cache
+directory) and loaded on later runs, until the data files change.
+`--no-cache` bypasses the snapshot, and `--rebuild-cache` forces a fresh one.
+With `--parallel-load`, the data files are loaded at the same time in a pool of
+`--workers` worker processes (the close approach data is split into chunks for
+all but one of them), and `--timings` shows how long each step of loading took:
+
+    $ python3 main.py --no-cache --parallel-load --workers 4 --timings query --date 1969-07-29
+
+The `compile` subcommand converts the close approach data into a memory-mapped
+columnar dataset, which opens in near-constant time when passed as `--cadfile`:
+
+    $ python3 main.py compile data/cad.compiled
+    $ python3 main.py --cadfile data/cad.compiled query --date 1969-07-29
 """
 import argparse
 import cmd
 import datetime
+import functools
+import gc
 import pathlib
 import shlex
 import sys
 import time
 
-from extract import load_neos, load_approaches
-from database import NEODatabase
-from filters import create_filters, limit
-from write import write_to_csv, write_to_json
+from aggregate import GROUPS, aggregate_approaches, fieldnames
+from cache import load_database
+from compiled import CompiledFormatError, compile_dataset
+from filters import create_filters, limit, sort_results, SORT_KEYS
+from parallel import LoadTimings
+from querycache import QueryCache, MAX_BYTES, MAX_ENTRIES
+from watch import DataFileWatcher
+from write import (write_to_csv, write_to_json, write_to_ndjson, write_to_sqlite,
+                   write_table_to_csv, write_table_to_json)
 
 
 # Paths to the root of the project and the `data` subfolder.
@@ -73,42 +126,14 @@ def date_fromisoformat(date_string):
         raise argparse.ArgumentTypeError(f"'{date_string}' is not a valid date. Use YYYY-MM-DD.")
 
 
-def make_parser():
-    """Create an ArgumentParser for this script.
+def add_filter_arguments(parser):
+    """Add the arguments that filter close approaches to a subcommand parser.
 
-    :return: A tuple of the top-level, inspect, and query parsers.
+    :param parser: The subparser for the `query` or `aggregate` subcommand.
     """
-    parser = argparse.ArgumentParser(
-        description="Explore past and future close approaches of near-Earth objects."
-    )
-
-    # Add arguments for custom data files.
-    parser.add_argument('--neofile', default=(DATA_ROOT / 'neos.csv'),
-                        type=pathlib.Path,
-                        help="Path to CSV file of near-Earth objects.")
-    parser.add_argument('--cadfile', default=(DATA_ROOT / 'cad.json'),
-                        type=pathlib.Path,
-                        help="Path to JSON file of close approach data.")
-    subparsers = parser.add_subparsers(dest='cmd')
-
-    # Add the `inspect` subcommand parser.
-    inspect = subparsers.add_parser('inspect',
-                                    description="Inspect an NEO by primary designation or by name.")
-    inspect.add_argument('-v', '--verbose', action='store_true',
-                         help="Additionally, print all known close approaches of this NEO.")
-    inspect_id = inspect.add_mutually_exclusive_group(required=True)
-    inspect_id.add_argument('-p', '--pdes',
-                            help="The primary designation of the NEO to inspect (e.g. '433').")
-    inspect_id.add_argument('-n', '--name',
-                            help="The IAU name of the NEO to inspect (e.g. 'Halley').")
-
-    # Add the `query` subcommand parser.
-    query = subparsers.add_parser('query',
-                                  description="Query for close approaches that "
-                                              "match a collection of filters.")
-    filters = query.add_argument_group('Filters',
-                                       description="Filter close approaches by their attributes "
-                                                   "or the attributes of their NEOs.")
+    filters = parser.add_argument_group('Filters',
+                                        description="Filter close approaches by their attributes "
+                                                    "or the attributes of their NEOs.")
     filters.add_argument('-d', '--date', type=date_fromisoformat,
                          help="Only return close approaches on the given date, "
                               "in YYYY-MM-DD format (e.g. 2020-12-31).")
@@ -144,19 +169,125 @@ def make_parser():
     filters.add_argument('--not-hazardous', dest='hazardous', default=None, action='store_false',
                          help="If specified, only return close approaches of NEOs that "
                               "are not potentially hazardous.")
+
+
+def filters_from_args(args):
+    """Create a collection of filters from the filter arguments parsed by a subcommand parser.
+
+    :param args: The arguments from the command line, including those of `add_filter_arguments`.
+    :return: A collection of filters, from `create_filters`.
+    """
+    return create_filters(
+        date=args.date, start_date=args.start_date, end_date=args.end_date,
+        distance_min=args.distance_min, distance_max=args.distance_max,
+        velocity_min=args.velocity_min, velocity_max=args.velocity_max,
+        diameter_min=args.diameter_min, diameter_max=args.diameter_max,
+        hazardous=args.hazardous
+    )
+
+
+def make_parser():
+    """Create an ArgumentParser for this script.
+
+    :return: A tuple of the top-level, inspect, query, and aggregate parsers.
+    """
+    parser = argparse.ArgumentParser(
+        description="Explore past and future close approaches of near-Earth objects."
+    )
+
+    # Add arguments for custom data files.
+    parser.add_argument('--neofile', default=(DATA_ROOT / 'neos.csv'),
+                        type=pathlib.Path,
+                        help="Path to CSV file of near-Earth objects.")
+    parser.add_argument('--cadfile', default=(DATA_ROOT / 'cad.json'),
+                        type=pathlib.Path,
+                        help="Path to JSON file of close approach data, "
+                             "or to a compiled dataset made with the `compile` subcommand.")
+    parser.add_argument('--columnar', action='store_true',
+                        help="Evaluate queries on a columnar store of the close approach data. "
+                             "Requires NumPy.")
+    parser.add_argument('--parallel-load', action='store_true',
+                        help="Load the NEO and close approach data files at the same time, "
+                             "in worker processes.")
+    parser.add_argument('--workers', type=int,
+                        help="The number of worker processes for --parallel-load, at least 2. "
+                             "Defaults to the number of CPUs.")
+    parser.add_argument('--timings', action='store_true',
+                        help="Print a timeline of the steps of loading the database to stderr.")
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument('--no-cache', dest='use_cache', action='store_false',
+                       help="Neither load nor save a snapshot of the database; "
+                            "always build it from the data files.")
+    cache.add_argument('--rebuild-cache', action='store_true',
+                       help="Build the database from the data files, even if a snapshot of it "
+                            "exists, and save a fresh snapshot.")
+    subparsers = parser.add_subparsers(dest='cmd')
+
+    # Add the `inspect` subcommand parser.
+    inspect = subparsers.add_parser('inspect',
+                                    description="Inspect an NEO by primary designation or by name.")
+    inspect.add_argument('-v', '--verbose', action='store_true',
+                         help="Additionally, print all known close approaches of this NEO.")
+    inspect_id = inspect.add_mutually_exclusive_group(required=True)
+    inspect_id.add_argument('-p', '--pdes',
+                            help="The primary designation of the NEO to inspect (e.g. '433').")
+    inspect_id.add_argument('-n', '--name',
+                            help="The IAU name of the NEO to inspect (e.g. 'Halley').")
+
+    # Add the `query` subcommand parser.
+    query = subparsers.add_parser('query',
+                                  description="Query for close approaches that "
+                                              "match a collection of filters.")
+    add_filter_arguments(query)
     query.add_argument('-l', '--limit', type=int,
                        help="The maximum number of matches to return. "
                             "Defaults to 10 if no --outfile is given.")
+    query.add_argument('--sort-by', choices=SORT_KEYS,
+                       help="Sort the matches by an attribute, rather than by time. "
+                            "With --limit, only the first matches in that order are returned.")
+    query.add_argument('--desc', action='store_true',
+                       help="Sort the matches in descending order "
+                            "(by time, unless --sort-by is given).")
+    query.add_argument('-j', '--jobs', type=int,
+                       help="Check the filters in parallel, in the given number of worker processes.")
     query.add_argument('-o', '--outfile', type=pathlib.Path,
-                       help="File in which to save structured results. "
+                       help="File in which to save structured results, "
+                            "as .csv, .json, .ndjson (or .jsonl), or .sqlite (or .db). "
                             "If omitted, results are printed to standard output.")
 
+    # Add the `aggregate` subcommand parser.
+    aggregate = subparsers.add_parser('aggregate',
+                                      description="Summarize the close approaches that match "
+                                                  "a collection of filters, in groups.")
+    add_filter_arguments(aggregate)
+    aggregate.add_argument('-b', '--by', choices=GROUPS, default='year',
+                           help="The attribute by which to group the close approaches. "
+                                "Defaults to the year of the approach.")
+    aggregate.add_argument('-o', '--outfile', type=pathlib.Path,
+                           help="File in which to save the summary, as .csv or .json. "
+                                "If omitted, the summary is printed to standard output.")
+
     repl = subparsers.add_parser('interactive',
                                  description="Start an interactive command session "
                                              "to repeatedly run `interact` and `query` commands.")
     repl.add_argument('-a', '--aggressive', action='store_true',
                       help="If specified, kill the session whenever a project file is modified.")
-    return parser, inspect, query
+    repl.add_argument('--no-reload', dest='reload', action='store_false',
+                      help="If specified, don't reload the data files when they change.")
+    repl.add_argument('--query-cache-size', type=int, default=MAX_ENTRIES,
+                      help="The number of recent queries whose results are cached. "
+                           "Use 0 to disable the cache.")
+    repl.add_argument('--query-cache-memory', type=float,
+                      default=MAX_BYTES / 1024 / 1024,
+                      help="In MiB. The most memory that the cached query results may use.")
+
+    compile_ = subparsers.add_parser('compile',
+                                     description="Compile the close approach data into a "
+                                                 "memory-mapped columnar dataset, which can be "
+                                                 "passed as --cadfile in place of the JSON file.")
+    compile_.add_argument('output', type=pathlib.Path,
+                          help="The folder in which to write the compiled dataset.")
+    return parser, inspect, query, aggregate
 
 
 def inspect(database, pdes=None, name=None, verbose=False):
@@ -195,43 +326,101 @@ def inspect(database, pdes=None, name=None, verbose=False):
     return neo
 
 
-def query(database, args):
+def query(database, args, cache=None):
     """Perform the `query` subcommand.
 
     Create a collection of filters with `create_filters` and supply them to the
-    database's `query` method to produce a stream of matching results.
+    database's `query` method to produce a stream of matching results. If a
+    `QueryCache` is given, ask it for the results instead, so that a repeated
+    query isn't evaluated again.
+
+    The results are in order of time, unless they are sorted by another
+    attribute (or in descending order) with `sort_results`.
 
     If an output file wasn't given, print these results to stdout, limiting to
     10 entries if no limit was specified. If an output file was given, use the
-    file's extension to infer whether the file should hold CSV or JSON data, and
-    then write the results to the output file in that format.
+    file's extension to infer whether the file should hold CSV, JSON,
+    newline-delimited JSON, or SQLite data, and then write the results to the
+    output file in that format.
 
     :param database: The `NEODatabase` containing data on NEOs and their close approaches.
     :param args: All arguments from the command line, as parsed by the top-level parser.
+    :param cache: A `QueryCache` of earlier queries of the database, or None.
     """
     # Construct a collection of filters from arguments supplied at the command line.
-    filters = create_filters(
-        date=args.date, start_date=args.start_date, end_date=args.end_date,
-        distance_min=args.distance_min, distance_max=args.distance_max,
-        velocity_min=args.velocity_min, velocity_max=args.velocity_max,
-        diameter_min=args.diameter_min, diameter_max=args.diameter_max,
-        hazardous=args.hazardous
-    )
-    # Query the database with the collection of filters.
-    results = database.query(filters)
+    filters = filters_from_args(args)
+    # Limit the results to 10 entries if not specified and not writing to a file.
+    count = args.limit if args.outfile else args.limit or 10
+
+    # Query the database (or the cache) with the collection of filters. The
+    # matches are generated in order of time, so any other order calls for all
+    # of them, from which the first `count` in that order are selected.
+    sort_by = args.sort_by or ('time' if args.desc else None)
+    if sort_by in ('time', None) and not args.desc:
+        sort_by, selected = None, count
+    else:
+        selected = None
+    if cache is None:
+        results = limit(database.query(filters, workers=args.jobs), selected)
+    else:
+        results = cache.query(database, filters, selected, workers=args.jobs)
+    if sort_by is not None:
+        results = sort_results(results, sort_by, args.desc, count)
 
     if not args.outfile:
-        # Write the results to stdout, limiting to 10 entries if not specified.
-        for result in limit(results, args.limit or 10):
+        # Write the results to stdout.
+        for result in results:
             print(result)
     else:
         # Write the results to a file.
         if args.outfile.suffix == '.csv':
-            write_to_csv(limit(results, args.limit), args.outfile)
+            write_to_csv(results, args.outfile)
         elif args.outfile.suffix == '.json':
-            write_to_json(limit(results, args.limit), args.outfile)
+            write_to_json(results, args.outfile)
+        elif args.outfile.suffix in ('.ndjson', '.jsonl'):
+            write_to_ndjson(results, args.outfile)
+        elif args.outfile.suffix in ('.sqlite', '.db'):
+            write_to_sqlite(results, args.outfile)
         else:
-            print("Please use an output file that ends with `.csv` or `.json`.", file=sys.stderr)
+            print("Please use an output file that ends with `.csv`, `.json`, `.ndjson`, `.jsonl`, "
+                  "`.sqlite`, or `.db`.", file=sys.stderr)
+
+
+def aggregate(database, args):
+    """Perform the `aggregate` subcommand.
+
+    Create a collection of filters with `create_filters`, and summarize the
+    close approaches that match them in groups with `aggregate_approaches`.
+
+    If an output file wasn't given, print the summary to stdout as a table.
+    Otherwise, use the file's extension to infer whether the file should hold
+    CSV or JSON data, and then write the summary to the output file in that
+    format.
+
+    :param database: The `NEODatabase` containing data on NEOs and their close approaches.
+    :param args: All arguments from the command line, as parsed by the top-level parser.
+    """
+    if args.outfile and args.outfile.suffix not in ('.csv', '.json'):
+        print("Please use an output file that ends with `.csv` or `.json`.", file=sys.stderr)
+        return
+
+    rows = aggregate_approaches(database, filters_from_args(args), args.by)
+    fields = fieldnames(args.by)
+
+    if not args.outfile:
+        # Write the summary to stdout.
+        if not rows:
+            print("No close approaches match these criteria.", file=sys.stderr)
+            return
+        width = max(len(args.by), *(len(str(row[args.by])) for row in rows))
+        print(f"{args.by:<{width}} {'count':>8} " + ' '.join(f'{field:>14}' for field in fields[2:]))
+        for row in rows:
+            print(f"{str(row[args.by]):<{width}} {row['count']:>8} "
+                  + ' '.join(f'{row[field]:>14.6g}' for field in fields[2:]))
+    elif args.outfile.suffix == '.csv':
+        write_table_to_csv(rows, fields, args.outfile)
+    else:
+        write_table_to_json(rows, args.outfile)
 
 
 class NEOShell(cmd.Cmd):
@@ -239,18 +428,19 @@ class NEOShell(cmd.Cmd):
 
     This is a `cmd.Cmd` shell - a specialized tool for command-based REPL sessions.
 
-    It wraps the `inspect` and `query` parsers to parse flags for those commands
-    as if they were supplied at the command line.
+    It wraps the `inspect`, `query`, and `aggregate` parsers to parse flags for
+    those commands as if they were supplied at the command line.
 
     The primary purpose of this shell is to allow users to repeatedly perform
-    inspect and query commands, while only loading the data (which can be quite
+    inspect, query, and aggregate commands, while only loading the data (which can be quite
     slow) once.
     """
     intro = ("Explore close approaches of near-Earth objects. "
              "Type `help` or `?` to list commands and `exit` to exit.\n")
     prompt = '(neo) '
 
-    def __init__(self, database, inspect_parser, query_parser, aggressive=False, **kwargs):
+    def __init__(self, database, inspect_parser, query_parser, aggressive=False, cache=None,
+                 watcher=None, aggregate_parser=None, **kwargs):
         """Create a new `NEOShell`.
 
         Creating this object doesn't start the session - for that, use `.cmdloop()`.
@@ -259,6 +449,9 @@ class NEOShell(cmd.Cmd):
         :param inspect_parser: The subparser for the `inspect` subcommand.
         :param query_parser: The subparser for the `query` subcommand.
         :param aggressive: Whether to kill the session whenever a project file is changed.
+        :param cache: A `QueryCache` in which to keep the results of queries, or None.
+        :param watcher: A `DataFileWatcher` of the data files of the database, or None.
+        :param aggregate_parser: The subparser for the `aggregate` subcommand, or None.
         :param kwargs: A dictionary of excess keyword arguments passed to the superclass.
         """
         super().__init__(**kwargs)
@@ -266,6 +459,9 @@ class NEOShell(cmd.Cmd):
         self.inspect = inspect_parser
         self.query = query_parser
         self.aggressive = aggressive
+        self.cache = cache
+        self.watcher = watcher
+        self.aggregate = aggregate_parser
 
     @classmethod
     def parse_arg_with(cls, arg, parser):
@@ -339,18 +535,86 @@ class NEOShell(cmd.Cmd):
 
             (neo) query --limit 2
 
+        The results can be sorted by `time`, `distance`, `velocity`, or `diameter`
+        with `--sort-by`, in descending order with `--desc`:
+
+            (neo) query --hazardous --sort-by distance --limit 20
+
         The results can be saved to a file (instead of displayed to stdout) with
         `--outfile`:
 
             (neo) query --limit 5 --outfile results.csv
             (neo) query --limit 5 --outfile results.json
+            (neo) query --limit 5 --outfile results.ndjson
+            (neo) query --limit 5 --outfile results.sqlite
+
+        The filters can be checked in parallel with `--jobs`, unless the data
+        files are being watched for changes (so start the session with
+        `--no-reload` to use it).
         """
         args = self.parse_arg_with(arg, self.query)
         if not args:
             return
+        if args.jobs and self.watcher is not None:
+            # Forking worker processes while the watcher's thread runs could
+            # leave them holding a lock that the thread held at the time.
+            print("Can't check the filters in parallel while the data files are watched "
+                  "(restart the session with --no-reload); checking them in this process.",
+                  file=sys.stderr)
+            args.jobs = None
 
-        # Run the `inspect` subcommand.
-        query(self.db, args)
+        # Run the `query` subcommand.
+        query(self.db, args, self.cache)
+
+    def do_aggregate(self, arg):
+        """Perform the `aggregate` subcommand within the REPL session.
+
+        This command behaves the same as the `aggregate` subcommand from the
+        command line. For example, to summarize the close approaches of
+        potentially hazardous NEOs in each month of 2020:
+
+            (neo) aggregate --by month --start-date 2020-01-01 --end-date 2020-12-31 --hazardous
+
+        The close approaches can be grouped by `year`, `month`, `neo`, or
+        `hazardous` with `--by`, and filtered with any of the filters of the
+        `query` command. The summary can be saved to a file with `--outfile`:
+
+            (neo) aggregate --by neo --max-distance 0.01 --outfile neos.csv
+            (neo) aggregate --by hazardous --outfile hazard.json
+        """
+        if self.aggregate is None:
+            print("The `aggregate` command is unavailable in this session.", file=sys.stderr)
+            return
+        args = self.parse_arg_with(arg, self.aggregate)
+        if not args:
+            return
+
+        # Run the `aggregate` subcommand.
+        aggregate(self.db, args)
+
+    def do_cache(self, arg):
+        """Show statistics about the cache of query results, or clear it.
+
+        Repeated queries (even with a different `--limit` or `--outfile`) are
+        answered from a cache of the results of recent queries. To show how
+        often queries were answered from the cache, and how full it is:
+
+            (neo) cache
+
+        To empty the cache:
+
+            (neo) cache clear
+        """
+        if self.cache is None:
+            print("Query results are not being cached.", file=sys.stderr)
+        elif arg.strip() in ('', 'stats'):
+            print(self.cache)
+        elif arg.strip() == 'clear':
+            self.cache.clear()
+            print("Cleared the cache of query results.")
+        else:
+            print("Use `cache` to show statistics about the cache, or `cache clear` to clear it.",
+                  file=sys.stderr)
 
     def do_EOF(self, _arg):
         """Exit the interactive session."""
@@ -361,7 +625,7 @@ class NEOShell(cmd.Cmd):
     do_quit = do_EOF
 
     def precmd(self, line):
-        """Watch for changes to the files in this project."""
+        """Watch for changes to the files in this project, and to the data files."""
         changed = [f for f in PROJECT_ROOT.glob('*.py') if f.stat().st_mtime > _START]
         if changed:
             print("The following file(s) have been modified since this interactive session began: "
@@ -373,24 +637,77 @@ class NEOShell(cmd.Cmd):
             else:
                 print("Preemptively terminating the session aggressively.", file=sys.stderr)
                 return 'exit'
+        if self.watcher is not None:
+            self.reload_data()
         return line
 
+    def reload_data(self):
+        """Apply any changes to the data files that the watcher has finished loading.
+
+        The changes are loaded in the background, so this never waits for them.
+        """
+        update = self.watcher.poll()
+        if update is None:
+            return
+        try:
+            database = update.apply(self.db)
+        except (TypeError, ValueError) as err:
+            print(f"Unable to add the new records to the database ({err}); rebuilding it.",
+                  file=sys.stderr)
+            self.watcher.request_rebuild()
+            return
+        if database is not self.db:
+            # A database loaded from a snapshot is frozen out of the reach of
+            # the garbage collector, so let it collect the one being replaced.
+            if hasattr(gc, 'unfreeze'):
+                gc.unfreeze()
+            self.db = database
+        if update.error is None and self.cache is not None:
+            self.cache.clear()
+        print(update, file=sys.stderr)
+
 
 def main():
     """Run the main script."""
-    parser, inspect_parser, query_parser = make_parser()
+    parser, inspect_parser, query_parser, aggregate_parser = make_parser()
     args = parser.parse_args()
 
-    # Extract data from the data files into structured Python objects.
-    database = NEODatabase(load_neos(args.neofile), load_approaches(args.cadfile))
+    if args.cmd == 'compile':
+        count = compile_dataset(args.neofile, args.cadfile, args.output)
+        print(f"Compiled {count} close approaches into {args.output}.")
+        return
+
+    # Extract data from the data files into structured Python objects, or load
+    # a snapshot of them from a previous run.
+    timings = LoadTimings()
+    try:
+        database = load_database(args.neofile, args.cadfile, columnar=args.columnar,
+                                 use_cache=args.use_cache, rebuild=args.rebuild_cache,
+                                 parallel=args.parallel_load, workers=args.workers,
+                                 timings=timings)
+    except CompiledFormatError as err:
+        print(err, file=sys.stderr)
+        return
+    if args.timings:
+        print(timings, file=sys.stderr)
 
     # Run the chosen subcommand.
     if args.cmd == 'inspect':
         inspect(database, pdes=args.pdes, name=args.name, verbose=args.verbose)
     elif args.cmd == 'query':
         query(database, args)
+    elif args.cmd == 'aggregate':
+        aggregate(database, args)
     elif args.cmd == 'interactive':
-        NEOShell(database, inspect_parser, query_parser, aggressive=args.aggressive).cmdloop()
+        cache = QueryCache(max_entries=args.query_cache_size,
+                           max_bytes=int(args.query_cache_memory * 1024 * 1024))
+        watcher = None
+        if args.reload:
+            rebuild = functools.partial(load_database, args.neofile, args.cadfile,
+                                        columnar=args.columnar, use_cache=args.use_cache)
+            watcher = DataFileWatcher(args.neofile, args.cadfile, rebuild)
+        NEOShell(database, inspect_parser, query_parser, aggressive=args.aggressive,
+                 cache=cache, watcher=watcher, aggregate_parser=aggregate_parser).cmdloop()
 
 
 if __name__ == '__main__':
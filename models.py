@@ -17,8 +17,7 @@ quirks of the data set, such as missing names and unknown diameters.
 
 You'll edit this file in Task 1.
 """
-from helpers import cd_to_datetime, datetime_to_str
-from datetime import datetime
+from helpers import cd_to_minutes, datetime_to_minutes, datetime_to_str, minutes_to_datetime
 
 
 class NearEarthObject:
@@ -34,29 +33,41 @@ class NearEarthObject:
     `NEODatabase` constructor.
     """
 
-    def __init__(self, **info):
+    __slots__ = ('designation', 'name', 'diameter', 'hazardous', '_approaches')
+
+    def __init__(self, designation='', name=None, diameter=None, hazardous=False):
         """Create a new `NearEarthObject`.
 
-        :param info: A dictionary of excess keyword arguments supplied to the constructor.
+        The arguments may be given as they appear in NASA's data set: an empty
+        name or diameter is missing, and a hazardous flag of 'Y' means true.
+
+        :param designation: The primary designation of the NEO.
+        :param name: The IAU name of the NEO, or None (or '') if it has none.
+        :param diameter: The diameter of the NEO in kilometers, or None (or '') if unknown.
+        :param hazardous: Whether the NEO is potentially hazardous, as a bool or 'Y'/'N'.
         """
-        # ELABORATE: assigns default values for some keys to coerce to required data types
+        self.designation = designation
+        self.name = name or None
+        self.diameter = float('nan') if diameter is None or diameter == '' else float(diameter)
+        self.hazardous = hazardous == 'Y' if isinstance(hazardous, str) else bool(hazardous)
         self.approaches = []
 
-        for key, value in info.items():
-            if (key) == 'name' and (value) == '':
-                setattr(self, key, None)
-            elif (key) == 'diameter':
-                if (value) == '':
-                    setattr(self, key, float('nan'))
-                else:
-                    setattr(self, key, float(value))
-            elif (key) == 'hazardous':
-                if (value) == 'Y':
-                    setattr(self, key, True)
-                else:
-                    setattr(self, key, False)
-            else:
-                setattr(self, key, value)
+    @property
+    def approaches(self):
+        """The collection of this NEO's close approaches.
+
+        A compiled dataset links an NEO to the dataset itself, and the
+        collection (a view of the dataset) is only made when it is first read.
+        """
+        approaches = self._approaches
+        approaches_of = getattr(approaches, 'approaches_of', None)
+        if approaches_of is not None:
+            approaches = self._approaches = approaches_of(self)
+        return approaches
+
+    @approaches.setter
+    def approaches(self, approaches):
+        self._approaches = approaches
 
     @property
     def fullname(self):
@@ -89,37 +100,52 @@ class CloseApproach:
     approach distance in astronomical units, and the relative approach velocity
     in kilometers per second.
 
+    The approach time is stored compactly in `minutes`, as whole minutes since
+    the Unix epoch, and the `datetime` in `time` is only built when it is first
+    read.
+
     A `CloseApproach` also maintains a reference to its `NearEarthObject` -
     initially, this information (the NEO's primary designation) is saved in a
     private attribute, but the referenced NEO is eventually replaced in the
     `NEODatabase` constructor.
     """
-    def __init__(self, **info):
+    __slots__ = ('_designation', 'minutes', '_time', 'distance', 'velocity', 'neo', '__weakref__')
+
+    def __init__(self, _designation='', time=None, distance=0.0, velocity=0.0, minutes=None):
         """Create a new `CloseApproach`.
 
-        :param info: A dictionary of excess keyword arguments supplied to the constructor.
+        The arguments may be given as they appear in NASA's data set: the time
+        as a calendar date string, and the distance and velocity as strings
+        (empty if unknown).
+
+        :param _designation: The primary designation of the approaching NEO.
+        :param time: The approach time, as a `datetime` or a NASA-formatted calendar date.
+        :param distance: The nominal approach distance in astronomical units.
+        :param velocity: The relative approach velocity in kilometers per second.
+        :param minutes: The approach time in minutes since the Unix epoch, in place of `time`.
         """
-        self.time = None
+        self._designation = _designation
+        if isinstance(time, str):
+            self.minutes, self._time = cd_to_minutes(time) if time else None, None
+        elif time is not None:
+            self.time = time
+        else:
+            self.minutes, self._time = minutes, None
+        self.distance = float(distance) if distance != '' else 0.0
+        self.velocity = float(velocity) if velocity != '' else 0.0
         self.neo = None
 
-        for key, value in info.items():
-            if (key) == 'time' and (value) == '':
-                setattr(self, key, None)
-            elif (key) == 'time':
-                setattr(self, key, cd_to_datetime(value))
-            elif (key) == 'distance':
-                if (value) == '':
-                    setattr(self, key, 0.0)
-                else:
-                    setattr(self, key, float(value))
-            elif (key) == 'velocity':
-                if (value) == '':
-                    setattr(self, key, 0.0)
-                else:
-                    setattr(self, key, float(value))
-            else:
-                setattr(self, key, value)
-
+    @property
+    def time(self):
+        """The approach time, as a naive `datetime` (in UTC), or None if unknown."""
+        if self._time is None and self.minutes is not None:
+            self._time = minutes_to_datetime(self.minutes)
+        return self._time
+
+    @time.setter
+    def time(self, time):
+        self.minutes = None if time is None else datetime_to_minutes(time)
+        self._time = time
 
     @property
     def time_str(self):
@@ -0,0 +1,266 @@
+"""Load the NEO and close approach data files in parallel, in worker processes.
+
+The two data files don't depend on each other until their contents are linked
+together in the `NEODatabase` constructor, so the `load_concurrently` function
+parses each of them in worker processes at the same time.
+
+The `data` array of the JSON file of close approaches can itself be split into
+chunks by `split_data_array`, each a range of bytes that holds whole records,
+which workers parse independently. `load_approaches_in_parallel` parses the
+chunks in a pool of worker processes, and `load_concurrently` spreads them over
+the workers that aren't parsing the NEO file.
+
+Each worker hands its results back to the main process as columns - a list of
+strings or a compact `array` of numbers per attribute - rather than as pickled
+model objects, since unpickling a column is much cheaper than unpickling an
+object. The main process then rebuilds the `NearEarthObject`s and
+`CloseApproach`es from those columns, in the original order.
+
+A `LoadTimings` records when each step of loading started and stopped, so that
+the overlap between the workers can be shown.
+"""
+import array
+import codecs
+import concurrent.futures
+import contextlib
+import os
+import re
+import time
+
+from extract import load_neos, find_data_array, iter_array_values, approaches_from_records
+from models import NearEarthObject, CloseApproach
+
+
+# The separator between two records of the `data` array. The records only hold
+# strings of digits, designations, and dates, none of which contain brackets.
+RECORD_BOUNDARY = re.compile(rb'\]\s*,\s*\[')
+
+# How many bytes to read at a time while looking for a record boundary.
+SPLIT_WINDOW = 4096
+
+
+def load_concurrently(neofile, cadfile, timings=None, workers=None):
+    """Load NEOs and close approaches from the data files in a pool of worker processes.
+
+    One worker parses the NEO file, and the close approach file is split into
+    a chunk for each of the other workers.
+
+    :param neofile: A path to a CSV file containing data about near-Earth objects.
+    :param cadfile: A path to a JSON file containing data about close approaches.
+    :param timings: If given, a `LoadTimings` in which to record each step of loading.
+    :param workers: The number of worker processes (at least 2), or None for the number of CPUs.
+    :return: A tuple of a list of `NearEarthObject`s and a list of `CloseApproach`es.
+    """
+    if timings is None:
+        timings = LoadTimings()
+    workers = max(2, workers or os.cpu_count() or 1)
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        neo_future = executor.submit(_timed, _load_neo_columns, neofile)
+        approach_futures = _submit_chunks(executor, cadfile, workers - 1)
+
+        neo_columns, start, stop = neo_future.result()
+        timings.add('parse neos (worker)', start, stop)
+        with timings.record('build neos'):
+            neos = [NearEarthObject(designation=designation, name=name,
+                                    diameter=diameter, hazardous=hazardous)
+                    for designation, name, diameter, hazardous in zip(*neo_columns)]
+
+        approaches = _collect_approaches(approach_futures, timings)
+
+    return neos, approaches
+
+
+def load_approaches_in_parallel(cadfile, workers=None, timings=None):
+    """Load close approaches from a JSON file, parsing chunks of it in a pool of worker processes.
+
+    :param cadfile: A path to a JSON file containing data about close approaches.
+    :param workers: The number of worker processes, or None for the number of CPUs.
+    :param timings: If given, a `LoadTimings` in which to record each step of loading.
+    :return: A list of `CloseApproach`es, in the order of the file.
+    """
+    if timings is None:
+        timings = LoadTimings()
+    workers = workers or os.cpu_count() or 1
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        return _collect_approaches(_submit_chunks(executor, cadfile, workers), timings)
+
+
+def split_data_array(cadfile, count):
+    """Split the `data` array of a JSON file of close approaches into chunks of whole records.
+
+    The chunks are roughly equal ranges of bytes. The first starts just inside
+    the array, and each of the others starts at the opening bracket of a
+    record. Each chunk but the last stops just after the closing bracket of its
+    last record, and the last one runs to the end of the file. There may be
+    fewer than `count` chunks if the array is small.
+
+    :param cadfile: A path to a JSON file containing data about close approaches.
+    :param count: The number of chunks to split the array into.
+    :return: A list of the start and stop offsets of each chunk, where the last stop is None.
+    """
+    first = start = find_data_array(cadfile) + 1
+    size = os.path.getsize(cadfile)
+    chunks = []
+    with open(cadfile, 'rb') as json_file:
+        for index in range(1, count):
+            cut = max(first + (size - first) * index // count, start)
+            json_file.seek(cut)
+            window, match = b'', None
+            while not match:
+                data = json_file.read(SPLIT_WINDOW)
+                if not data:
+                    break
+                window += data
+                match = RECORD_BOUNDARY.search(window)
+            if not match:
+                break
+            chunks.append((start, cut + match.start() + 1))
+            start = cut + match.end() - 1
+    chunks.append((start, None))
+    return chunks
+
+
+class LoadTimings:
+    """A record of when each step of loading the data files started and stopped.
+
+    The times are wall-clock times (from `time.time`), so that steps taken in
+    different processes can be compared. `str` renders them as a timeline.
+    """
+    def __init__(self):
+        """Create a new `LoadTimings`, starting the clock now."""
+        self.origin = time.time()
+        self.steps = []
+
+    def add(self, name, start, stop):
+        """Record a step that ran from `start` to `stop`, as returned by `time.time`."""
+        self.steps.append((name, start - self.origin, stop - self.origin))
+
+    @contextlib.contextmanager
+    def record(self, name):
+        """Record a step that runs for the duration of a `with` block."""
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.time())
+
+    @property
+    def total(self):
+        """The time from the start of the clock until the end of the last step, in seconds."""
+        return max((stop for _, _, stop in self.steps), default=0.0)
+
+    @property
+    def overlapped(self):
+        """How much of the steps' combined duration overlapped with other steps, in seconds."""
+        busy, covered, reach = 0.0, 0.0, 0.0
+        for _, start, stop in sorted(self.steps, key=lambda step: step[1]):
+            busy += stop - start
+            covered += max(0.0, stop - max(start, reach))
+            reach = max(reach, stop)
+        return busy - covered
+
+    def __str__(self):
+        """Return `str(self)`, a timeline of the steps."""
+        width = 40
+        scale = width / self.total if self.total else 0
+        lines = []
+        for name, start, stop in self.steps:
+            bar = ' ' * round(start * scale) + '#' * max(1, round((stop - start) * scale))
+            lines.append(f"{name:<32} {start * 1000:8.1f} - {stop * 1000:8.1f} ms  |{bar:<{width}}|")
+        lines.append(f"{'total':<32} {self.total * 1000:19.1f} ms  "
+                     f"({self.overlapped * 1000:.1f} ms of the steps overlapped)")
+        return '\n'.join(lines)
+
+
+def _timed(function, *args):
+    """Call a function, and return its result along with when it started and stopped."""
+    start = time.time()
+    result = function(*args)
+    return result, start, time.time()
+
+
+def _submit_chunks(executor, cadfile, count):
+    """Submit a task to parse each chunk of the `data` array of a JSON file to an executor."""
+    chunks = split_data_array(cadfile, count)
+    return [executor.submit(_timed, _load_approach_chunk, cadfile, start, stop)
+            for start, stop in chunks]
+
+
+def _collect_approaches(futures, timings):
+    """Rebuild the close approaches from the results of the tasks of `_submit_chunks`, in order."""
+    approaches = []
+    for index, future in enumerate(futures, 1):
+        columns, start, stop = future.result()
+        timings.add(f'parse approaches {index}/{len(futures)} (worker)', start, stop)
+        with timings.record(f'build approaches {index}/{len(futures)}'):
+            approaches.extend(CloseApproach(_designation=designation, minutes=minutes,
+                                            distance=distance, velocity=velocity)
+                              for designation, minutes, distance, velocity in zip(*columns))
+    return approaches
+
+
+def _load_neo_columns(neofile):
+    """Load NEOs from a CSV file into columns of their attributes."""
+    neos = load_neos(neofile)
+    return ([neo.designation for neo in neos],
+            [neo.name for neo in neos],
+            array.array('d', [neo.diameter for neo in neos]),
+            bytes(neo.hazardous for neo in neos))
+
+
+def _load_approach_chunk(cadfile, start, stop):
+    """Load the close approaches in a chunk of a JSON file into columns of their attributes.
+
+    :param cadfile: A path to a JSON file containing data about close approaches.
+    :param start: The offset of the chunk, from `split_data_array`.
+    :param stop: The offset of the end of the chunk, or None if it is the last chunk.
+    """
+    columns = [], array.array('q'), array.array('d'), array.array('d')
+    designations, minutes, distances, velocities = columns
+    with open(cadfile, 'rb') as json_file:
+        records = iter_array_values(_ChunkReader(json_file, start, stop))
+        for approach in approaches_from_records(records):
+            designations.append(approach._designation)
+            minutes.append(approach.minutes)
+            distances.append(approach.distance)
+            velocities.append(approach.velocity)
+    return columns
+
+
+class _ChunkReader:
+    """A text reader over a chunk of the `data` array of a JSON file, as an array of its own.
+
+    The chunk is read and decoded a piece at a time, preceded by an opening
+    bracket. Every chunk but the last is followed by a closing bracket, while
+    the last is closed off by the closing bracket of the `data` array itself.
+    """
+    def __init__(self, file, start, stop):
+        """Create a new `_ChunkReader` over a chunk from `split_data_array`.
+
+        :param file: A binary file, opened for reading.
+        :param start: The offset of the chunk.
+        :param stop: The offset of the end of the chunk, or None if it is the last chunk.
+        """
+        file.seek(start)
+        self.file = file
+        self.remaining = None if stop is None else stop - start
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.pending = '['
+        self.finished = False
+
+    def read(self, size):
+        """Read up to about `size` characters, or '' at the end of the chunk."""
+        text, self.pending = self.pending, ''
+        while not text and not self.finished:
+            if self.remaining is not None:
+                size = min(size, self.remaining)
+            data = self.file.read(size) if size else b''
+            if self.remaining is not None:
+                self.remaining -= len(data)
+            self.finished = not data
+            text = self.decoder.decode(data, final=self.finished)
+            if self.finished and self.remaining is not None:
+                text += ']'
+        return text
@@ -0,0 +1,126 @@
+"""Cache the results of queries of an `NEODatabase` for the interactive shell.
+
+In an interactive session, the same query is often run again and again - to
+see more of its results with a larger `--limit`, or to save them with
+`--outfile`. A `QueryCache` remembers the positions of the close approaches
+that matched each recent query (as a compact `array`), so that a repeated
+query is answered without scanning the close approaches again.
+
+Queries are identified by their normalized criteria, so the order in which the
+filters were given doesn't matter. The cache holds a bounded number of queries,
+whose positions take up a bounded amount of memory, and evicts the least
+recently used query first once either bound is exceeded.
+
+A query whose results were cut short by a limit is cached as a partial result,
+which can answer the same query again with the same or a smaller limit.
+"""
+import array
+import collections
+import sys
+
+
+# The default bounds on the number of cached queries, and on their total size in bytes.
+MAX_ENTRIES = 128
+MAX_BYTES = 64 * 1024 * 1024
+
+
+class QueryCache:
+    """A least-recently-used cache of the positions of the close approaches that match queries.
+
+    The cache counts the queries that it answered (hits) and that it had to
+    pass on to the database (misses). `str` renders these statistics.
+    """
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        """Create a new, empty `QueryCache`.
+
+        :param max_entries: The maximum number of queries to cache.
+        :param max_bytes: The maximum total size of the cached positions, in bytes.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        """Return `len(self)`, the number of cached queries."""
+        return len(self._entries)
+
+    def query(self, database, filters, limit=None, workers=None):
+        """Query a database for the close approaches that match a collection of filters, if not cached.
+
+        The cache must only be used with a single database, and must be cleared
+        if the data in that database changes.
+
+        :param database: The `NEODatabase` to query.
+        :param filters: A collection of filters, from `create_filters`.
+        :param limit: The maximum number of matches to generate, or 0 or None for all of them.
+        :param workers: The number of worker processes for the database to scan with, on a miss.
+        :return: A stream of (at most `limit`) matching `CloseApproach` objects, in order of approach time.
+        """
+        key = self.key(filters)
+        entry = self._entries.get(key)
+        if entry is not None:
+            positions, complete = entry
+            if complete or (limit and limit <= len(positions)):
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return database.approaches_at(positions[:limit] if limit else positions)
+
+        self.misses += 1
+        selection = database.select(filters, workers)
+        return database.approaches_at(self._record(key, selection, limit or None))
+
+    def clear(self):
+        """Forget every cached query, but keep the statistics."""
+        self._entries.clear()
+        self.size = 0
+
+    @staticmethod
+    def key(filters):
+        """Return a key that identifies the criteria of a collection of filters, in any order."""
+        return tuple(sorted((type(criterion).__name__, criterion.op.__name__, repr(criterion.value))
+                            for criterion in filters))
+
+    def _record(self, key, selection, limit):
+        """Generate the positions of a selection, up to a limit, and cache them once all are generated.
+
+        The positions are marked complete unless the limit may have cut them short.
+        """
+        positions = array.array('q')
+        try:
+            for index in selection:
+                positions.append(index)
+                if len(positions) == limit:
+                    self._store(key, positions, complete=False)
+                    yield index
+                    return
+                yield index
+            self._store(key, positions, complete=True)
+        finally:
+            selection.close()
+
+    def _store(self, key, positions, complete):
+        """Cache the positions that match a query, evicting the least recently used queries to make room."""
+        size = sys.getsizeof(positions)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self.size -= sys.getsizeof(previous[0])
+        self._entries[key] = positions, complete
+        self.size += size
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.size -= sys.getsizeof(evicted)
+            self.evictions += 1
+
+    def __str__(self):
+        """Return `str(self)`, a summary of the statistics of this cache."""
+        lookups = self.hits + self.misses
+        rate = f"{self.hits / lookups:.0%}" if lookups else "n/a"
+        return (f"{self.hits} hits, {self.misses} misses (hit rate {rate}), {self.evictions} evictions\n"
+                f"{len(self)}/{self.max_entries} queries cached, using "
+                f"{self.size / 1024:,.1f}/{self.max_bytes / 1024:,.0f} KiB")
@@ -0,0 +1,169 @@
+"""Check that `aggregate_approaches` summarizes close approaches in groups.
+
+The summaries are checked against statistics computed directly from the
+matching close approaches, both in a single streaming pass and, if NumPy is
+installed, with a columnar store.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_aggregate
+"""
+import collections
+import csv
+import datetime
+import json
+import pathlib
+import tempfile
+import unittest
+
+import aggregate
+from aggregate import GROUPS, SUMMARY_FIELDS, aggregate_approaches, fieldnames, summarize
+from columnar import numpy
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+from helpers import DATE_CACHE_SIZE
+from write import write_table_to_csv, write_table_to_json
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+GROUP_OF = {
+    'year': lambda approach: approach.time.year,
+    'month': lambda approach: approach.time.strftime('%Y-%m'),
+    'neo': lambda approach: approach.neo.designation if approach.neo else approach._designation,
+    'hazardous': lambda approach: bool(approach.neo and approach.neo.hazardous),
+}
+
+
+class TestAggregate(unittest.TestCase):
+    columnar = False
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE),
+                             columnar=cls.columnar)
+
+    def expected(self, filters, by):
+        """Summarize the matches of a query directly, one group at a time."""
+        groups = collections.defaultdict(list)
+        for approach in self.db.query(filters):
+            groups[GROUP_OF[by](approach)].append(approach)
+        rows = []
+        for group, approaches in sorted(groups.items()):
+            distances = [approach.distance for approach in approaches]
+            velocities = [approach.velocity for approach in approaches]
+            rows.append(dict(zip(fieldnames(by), (
+                group, len(approaches),
+                min(distances), sum(distances) / len(distances), max(distances),
+                min(velocities), sum(velocities) / len(velocities), max(velocities)))))
+        return rows
+
+    def assertSummaryEqual(self, rows, expected):
+        self.assertEqual(len(rows), len(expected))
+        for row, expected_row in zip(rows, expected):
+            self.assertEqual(list(row), list(expected_row))
+            for field, value in expected_row.items():
+                if field.endswith('_mean'):
+                    self.assertAlmostEqual(row[field], value, places=9)
+                else:
+                    self.assertEqual(row[field], value)
+                    self.assertEqual(type(row[field]), type(value))
+
+    def test_aggregate_every_approach(self):
+        for by in GROUPS:
+            with self.subTest(by=by):
+                self.assertSummaryEqual(aggregate_approaches(self.db, (), by),
+                                        self.expected((), by))
+
+    def test_aggregate_filtered_approaches(self):
+        filters = create_filters(start_date=datetime.date(2020, 3, 1),
+                                 end_date=datetime.date(2020, 8, 31),
+                                 distance_max=0.2, velocity_min=5)
+        for by in GROUPS:
+            with self.subTest(by=by):
+                self.assertSummaryEqual(aggregate_approaches(self.db, filters, by),
+                                        self.expected(filters, by))
+
+    def test_aggregate_by_month_groups_every_month_of_2020(self):
+        months = [row['month'] for row in aggregate_approaches(self.db, (), 'month')]
+        self.assertEqual(months, [f'2020-{month:02}' for month in range(1, 13)])
+
+    def test_aggregate_by_hazard_flag_counts_every_match(self):
+        filters = create_filters(distance_max=0.1)
+        rows = aggregate_approaches(self.db, filters, 'hazardous')
+        self.assertEqual([row['hazardous'] for row in rows], [False, True])
+        self.assertEqual(sum(row['count'] for row in rows), len(list(self.db.query(filters))))
+
+    def test_aggregate_without_matches(self):
+        filters = create_filters(date=datetime.date(2021, 1, 1))
+        for by in GROUPS:
+            with self.subTest(by=by):
+                self.assertEqual(aggregate_approaches(self.db, filters, by), [])
+
+    def test_aggregate_after_extending_the_database(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE)[:2000],
+                         columnar=self.columnar)
+        db.extend(approaches=load_approaches(TEST_CAD_FILE)[2000:])
+        for by in GROUPS:
+            with self.subTest(by=by):
+                self.assertSummaryEqual(aggregate_approaches(db, (), by), self.expected((), by))
+
+    def test_group_caches_are_bounded(self):
+        for group_of in (aggregate._year_of, aggregate._month_of):
+            with self.subTest(group_of=group_of.__name__):
+                for day in range(DATE_CACHE_SIZE + 10):
+                    group_of(day)
+                self.assertLessEqual(group_of.cache_info().currsize, DATE_CACHE_SIZE)
+        self.assertEqual(aggregate._month_of(0), '1970-01')
+        self.assertEqual(aggregate._year_of(-1), 1969)
+
+    def test_aggregate_rejects_an_unknown_group(self):
+        with self.assertRaises(ValueError):
+            aggregate_approaches(self.db, (), 'diameter')
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed.")
+class TestAggregateColumnar(TestAggregate):
+    columnar = True
+
+    def test_summaries_match_a_streaming_pass(self):
+        filters = create_filters(distance_max=0.3)
+        for by in ('year', 'month', 'hazardous'):
+            with self.subTest(by=by):
+                self.assertSummaryEqual(aggregate_approaches(self.db, filters, by),
+                                        summarize(self.db.query(filters), by))
+
+
+class TestWriteTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        cls.rows = aggregate_approaches(db, create_filters(distance_max=0.1), 'hazardous')
+
+    def test_write_table_to_csv(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / 'summary.csv'
+            write_table_to_csv(self.rows, fieldnames('hazardous'), path)
+            with open(path, newline='') as infile:
+                reader = csv.DictReader(infile)
+                self.assertEqual(tuple(reader.fieldnames), ('hazardous',) + SUMMARY_FIELDS)
+                written = list(reader)
+        self.assertEqual([row['hazardous'] for row in written], ['False', 'True'])
+        for row, expected in zip(written, self.rows):
+            self.assertEqual(int(row['count']), expected['count'])
+            self.assertEqual(float(row['distance_mean']), expected['distance_mean'])
+
+    def test_write_table_to_json(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / 'summary.json'
+            write_table_to_json(self.rows, path)
+            with open(path) as infile:
+                self.assertEqual(json.load(infile), self.rows)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+"""Check that NEOs and close approaches added to an `NEODatabase` are queried like a full rebuild.
+
+The test data is split into an initial database and a series of daily deltas of
+NEOs and close approaches, in no particular order of time. After adding each
+delta, the database should answer every query exactly as a database built from
+scratch with the same NEOs and close approaches does.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_append
+"""
+import datetime
+import math
+import pathlib
+import random
+import tempfile
+import unittest
+
+from columnar import numpy
+from compiled import compile_dataset, open_compiled
+from database import NEODatabase, FORK_AVAILABLE
+from extract import load_neos, load_approaches
+from filters import create_filters
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+QUERIES = [
+    {},
+    {'date': datetime.date(2020, 3, 2)},
+    {'start_date': datetime.date(2020, 6, 1), 'end_date': datetime.date(2020, 7, 31)},
+    {'distance_max': 0.05},
+    {'velocity_min': 20},
+    {'diameter_min': 0.5},
+    {'hazardous': True},
+    {'hazardous': False, 'distance_min': 0.2},
+    {'start_date': datetime.date(2020, 2, 1), 'velocity_max': 10, 'diameter_max': 1.0},
+]
+
+
+def summarize(approaches):
+    return [(approach._designation, approach.minutes, approach.distance, approach.velocity,
+             approach.neo.designation if approach.neo else None) for approach in approaches]
+
+
+class TestAppend(unittest.TestCase):
+    columnar = False
+    workers = None
+    deltas = 10
+
+    def setUp(self):
+        generator = random.Random(2020)
+        neos = load_neos(TEST_NEO_FILE)
+        approaches = load_approaches(TEST_CAD_FILE)
+        generator.shuffle(neos)
+        generator.shuffle(approaches)
+
+        # Leave a third of the NEOs and half of the close approaches for the deltas.
+        self.initial_neos, neos = neos[:len(neos) * 2 // 3], neos[len(neos) * 2 // 3:]
+        self.initial_approaches, approaches = approaches[:len(approaches) // 2], \
+            approaches[len(approaches) // 2:]
+        self.delta_neos = [neos[day::self.deltas] for day in range(self.deltas)]
+        self.delta_approaches = [approaches[day::self.deltas] for day in range(self.deltas)]
+
+        self.db = NEODatabase(list(self.initial_neos), list(self.initial_approaches),
+                              columnar=self.columnar)
+
+    def rebuild(self, days):
+        """Build a database from scratch with the same NEOs and close approaches, in the same order."""
+        neos = load_neos(TEST_NEO_FILE)
+        approaches = load_approaches(TEST_CAD_FILE)
+        neos_by_designation = {neo.designation: neo for neo in neos}
+        approaches_by_key = {(approach._designation, approach.minutes): approach
+                             for approach in approaches}
+        order = self.initial_neos + [neo for day in range(days) for neo in self.delta_neos[day]]
+        neos = [neos_by_designation[neo.designation] for neo in order]
+        order = self.initial_approaches + [approach for day in range(days)
+                                           for approach in self.delta_approaches[day]]
+        approaches = [approaches_by_key[approach._designation, approach.minutes]
+                      for approach in order]
+        return NEODatabase(neos, approaches, columnar=self.columnar)
+
+    def add(self, day):
+        self.db.add_neos(self.delta_neos[day])
+        self.db.add_approaches(self.delta_approaches[day])
+
+    def assertMatchesRebuild(self, days):
+        expected = self.rebuild(days)
+        for criteria in QUERIES:
+            filters = create_filters(**criteria)
+            self.assertEqual(summarize(self.db.query(filters, workers=self.workers)),
+                             summarize(expected.query(filters)), msg=f"Query for {criteria}")
+        for neo in expected._neos:
+            added = self.db.get_neo_by_designation(neo.designation)
+            self.assertEqual(summarize(added.approaches), summarize(neo.approaches))
+            if neo.name:
+                self.assertIs(self.db.get_neo_by_name(neo.name), added)
+
+    def test_initial_database_matches_rebuild(self):
+        self.assertMatchesRebuild(0)
+
+    def test_each_delta_matches_rebuild(self):
+        for day in range(self.deltas):
+            self.add(day)
+            self.assertMatchesRebuild(day + 1)
+
+    def test_approaches_added_before_their_neos_are_linked(self):
+        for day in reversed(range(self.deltas)):
+            self.db.add_approaches(self.delta_approaches[day])
+        for day in range(self.deltas):
+            self.db.add_neos(self.delta_neos[day])
+        for approach in self.db.query():
+            self.assertIsNotNone(approach.neo)
+            self.assertIn(approach, approach.neo.approaches)
+
+    def test_time_index_has_logarithmically_many_runs(self):
+        for day in range(self.deltas):
+            self.add(day)
+            runs = [len(time_order) for time_order, _ in self.db._time_runs]
+            self.assertEqual(sum(runs), len(self.db._approaches))
+            for run, next_run in zip(runs, runs[1:]):
+                self.assertGreater(run, 2 * next_run)
+            self.assertLessEqual(len(runs), math.log2(len(self.db._approaches)) + 1)
+
+    def test_adding_nothing_changes_nothing(self):
+        self.db.extend()
+        self.assertEqual(len(self.db._time_runs), 1)
+        self.assertMatchesRebuild(0)
+
+    def test_adding_a_known_designation_is_an_error(self):
+        with self.assertRaises(ValueError):
+            self.db.add_neos([self.initial_neos[0]])
+        duplicate = self.delta_neos[0][0]
+        with self.assertRaises(ValueError):
+            self.db.add_neos([duplicate, duplicate])
+        self.assertIsNone(self.db.get_neo_by_designation(duplicate.designation))
+
+
+@unittest.skipIf(numpy is None, "The columnar store requires NumPy.")
+class TestColumnarAppend(TestAppend):
+    columnar = True
+
+
+@unittest.skipUnless(FORK_AVAILABLE, "Parallel scans need to fork worker processes.")
+class TestParallelAppend(TestAppend):
+    workers = 2
+    deltas = 3
+
+
+class TestCompiledAppend(unittest.TestCase):
+    def test_compiled_dataset_cannot_be_extended(self):
+        with tempfile.TemporaryDirectory() as directory:
+            compile_dataset(TEST_NEO_FILE, TEST_CAD_FILE, directory)
+            neos = load_neos(TEST_NEO_FILE)
+            db = NEODatabase(neos, open_compiled(directory, TEST_NEO_FILE, neos))
+            with self.assertRaises(TypeError):
+                db.add_approaches(load_approaches(TEST_CAD_FILE)[:1])
+
+
+if __name__ == '__main__':
+    unittest.main()
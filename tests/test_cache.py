@@ -0,0 +1,166 @@
+"""Check that snapshots of an `NEODatabase` are saved, reused, and rebuilt.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_cache
+"""
+import gc
+import os
+import pathlib
+import shutil
+import tempfile
+import types
+import unittest
+import unittest.mock
+
+import cache
+from cache import USER_CACHE_NAME, default_cache_root, load_database, snapshot_path
+from compiled import file_digest
+from filters import create_filters
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestLoadDatabase(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = pathlib.Path(directory.name)
+        self.cache_root = self.root / 'cache'
+        self.neofile = shutil.copy(TEST_NEO_FILE, self.root / 'neos.csv')
+        self.cadfile = shutil.copy(TEST_CAD_FILE, self.root / 'cad.json')
+
+    def load(self, **kwargs):
+        with unittest.mock.patch('cache.build_database', wraps=cache.build_database) as build:
+            neo_database = load_database(self.neofile, self.cadfile,
+                                         cache_root=self.cache_root, **kwargs)
+        return neo_database, build.called
+
+    def test_first_load_saves_a_snapshot(self):
+        _, built = self.load()
+        self.assertTrue(built)
+        self.assertTrue(snapshot_path(self.cache_root, self.neofile, self.cadfile).exists())
+
+    def test_second_load_uses_the_snapshot(self):
+        original, _ = self.load()
+        snapshot, built = self.load()
+        self.assertFalse(built)
+
+        self.assertEqual(len(list(snapshot.query(create_filters()))),
+                         len(list(original.query(create_filters()))))
+        cerberus = snapshot.get_neo_by_designation('1865')
+        self.assertEqual(cerberus.name, 'Cerberus')
+        for approach in cerberus.approaches:
+            self.assertIs(approach.neo, cerberus)
+
+    def test_changed_data_file_rebuilds_the_snapshot(self):
+        self.load()
+        with open(self.cadfile, 'a') as cadfile:
+            cadfile.write('\n')
+        _, built = self.load()
+        self.assertTrue(built)
+        _, built = self.load()
+        self.assertFalse(built)
+
+    def test_unchanged_data_files_are_not_hashed_again(self):
+        self.load()
+        with unittest.mock.patch('compiled.file_digest') as digest:
+            _, built = self.load()
+        self.assertFalse(built)
+        digest.assert_not_called()
+
+    def test_touched_data_file_is_hashed_again(self):
+        self.load()
+        stat = os.stat(self.neofile)
+        os.utime(self.neofile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        with unittest.mock.patch('compiled.file_digest', wraps=file_digest) as digest:
+            _, built = self.load()
+        self.assertFalse(built)
+        digest.assert_called_once_with(str(pathlib.Path(self.neofile).resolve()))
+
+    def test_data_file_changed_in_place_rebuilds_the_snapshot(self):
+        self.load()
+        stat = os.stat(self.neofile)
+        with open(self.neofile, 'r+') as neofile:
+            contents = neofile.read()
+            neofile.seek(0)
+            neofile.write(contents.replace('Cerberus', 'Cerberos'))
+        os.utime(self.neofile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        neo_database, built = self.load()
+        self.assertTrue(built)
+        self.assertIsNotNone(neo_database.get_neo_by_name('Cerberos'))
+
+    def test_rebuild_ignores_the_snapshot(self):
+        self.load()
+        _, built = self.load(rebuild=True)
+        self.assertTrue(built)
+
+    def test_no_cache_neither_reads_nor_writes_snapshots(self):
+        _, built = self.load(use_cache=False)
+        self.assertTrue(built)
+        self.assertFalse(self.cache_root.exists())
+
+    def test_corrupt_snapshot_is_rebuilt(self):
+        self.load()
+        snapshot_path(self.cache_root, self.neofile, self.cadfile).write_bytes(b'not a pickle')
+        with unittest.mock.patch('sys.stderr'):
+            neo_database, built = self.load()
+        self.assertTrue(built)
+        self.assertIsNotNone(neo_database.get_neo_by_name('Cerberus'))
+
+    def test_snapshot_is_loaded_with_the_garbage_collector_paused(self):
+        if not hasattr(gc, 'freeze'):
+            self.skipTest("gc.freeze requires Python 3.7+.")
+        self.load()
+        self.addCleanup(gc.unfreeze)
+        collecting = []
+        pickle_load = cache.pickle.load
+
+        def load(snapshot_file):
+            collecting.append(gc.isenabled())
+            return pickle_load(snapshot_file)
+
+        with unittest.mock.patch('cache.pickle.load', load):
+            _, built = self.load()
+        self.assertFalse(built)
+        self.assertEqual(collecting, [True, False])
+        self.assertTrue(gc.isenabled())
+        self.assertGreater(gc.get_freeze_count(), 0)
+
+    def test_snapshot_is_loaded_without_gc_freeze(self):
+        self.load()
+        without_freeze = types.SimpleNamespace(isenabled=gc.isenabled, disable=gc.disable,
+                                               enable=gc.enable)
+        with unittest.mock.patch('cache.gc', without_freeze), \
+                unittest.mock.patch('sys.stderr') as stderr:
+            neo_database, built = self.load()
+        self.assertFalse(built)
+        stderr.write.assert_not_called()
+        self.assertIsNotNone(neo_database.get_neo_by_name('Cerberus'))
+
+
+class TestDefaultCacheRoot(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.root = pathlib.Path(directory.name)
+
+    def test_cache_root_next_to_the_source(self):
+        with unittest.mock.patch('cache.CACHE_ROOT', self.root / 'project' / '.cache'):
+            self.assertEqual(default_cache_root(), self.root / 'project' / '.cache')
+
+    def test_user_cache_directory_if_the_cache_root_cannot_be_written(self):
+        # Nothing can be created below a file, whatever the permissions.
+        (self.root / 'project').write_text('')
+        with unittest.mock.patch('cache.CACHE_ROOT', self.root / 'project' / '.cache'):
+            with unittest.mock.patch.dict('os.environ', {'XDG_CACHE_HOME': str(self.root / 'xdg')}):
+                self.assertEqual(default_cache_root(), self.root / 'xdg' / USER_CACHE_NAME)
+            with unittest.mock.patch.dict('os.environ', {'XDG_CACHE_HOME': '', 'HOME': str(self.root)}):
+                self.assertEqual(default_cache_root(), self.root / '.cache' / USER_CACHE_NAME)
+
+
+if __name__ == '__main__':
+    unittest.main()
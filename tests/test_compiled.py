@@ -0,0 +1,136 @@
+"""Check that a compiled dataset of close approaches answers queries like the JSON file.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_compiled
+"""
+import datetime
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+from columnar import numpy
+from compiled import CompiledApproaches, CompiledFormatError, compile_dataset, file_digest, open_compiled
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+def summarize(approaches):
+    return [(approach._designation, approach.time, approach.distance, approach.velocity,
+             approach.neo.designation) for approach in approaches]
+
+
+class TestCompiledDataset(unittest.TestCase):
+    columnar = False
+
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.compiled = pathlib.Path(cls.directory.name) / 'cad.compiled'
+        compile_dataset(TEST_NEO_FILE, TEST_CAD_FILE, cls.compiled)
+
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        neos = load_neos(TEST_NEO_FILE)
+        cls.approaches = open_compiled(cls.compiled, TEST_NEO_FILE, neos)
+        cls.compiled_db = NEODatabase(neos, cls.approaches, columnar=cls.columnar)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def assertSameResults(self, filters):
+        expected = summarize(self.db.query(filters))
+        received = summarize(self.compiled_db.query(filters))
+        self.assertEqual(expected, received)
+
+    def test_opened_dataset_is_a_sequence_of_all_approaches(self):
+        self.assertIsInstance(self.approaches, CompiledApproaches)
+        self.assertEqual(len(self.approaches), 4700)
+
+    def test_query_all(self):
+        self.assertSameResults(create_filters())
+
+    def test_query_date_range(self):
+        self.assertSameResults(create_filters(start_date=datetime.date(2020, 3, 1),
+                                              end_date=datetime.date(2020, 3, 31)))
+
+    def test_query_date_with_other_filters(self):
+        self.assertSameResults(create_filters(date=datetime.date(2020, 3, 2), distance_max=0.4))
+
+    def test_query_with_neo_filters(self):
+        self.assertSameResults(create_filters(diameter_min=0.5, hazardous=False, velocity_min=10))
+
+    def test_inspect_neo_approaches(self):
+        expected = self.db.get_neo_by_name('Cerberus')
+        received = self.compiled_db.get_neo_by_name('Cerberus')
+        self.assertEqual(summarize(expected.approaches), summarize(received.approaches))
+        for approach in received.approaches:
+            self.assertIs(approach.neo, received)
+
+    def test_approaches_are_the_same_objects_while_referenced(self):
+        first = self.approaches[10]
+        self.assertIs(self.approaches[10], first)
+
+    def test_mismatched_neo_file_is_rejected(self):
+        with tempfile.TemporaryDirectory() as directory:
+            neofile = pathlib.Path(directory) / 'neos.csv'
+            shutil.copy(TEST_NEO_FILE, neofile)
+            with open(neofile, 'a') as outfile:
+                outfile.write('\n')
+            with self.assertRaises(CompiledFormatError):
+                open_compiled(self.compiled, neofile, load_neos(neofile))
+
+    def test_unchanged_neo_file_is_not_hashed_again(self):
+        with unittest.mock.patch('compiled.file_digest') as digest:
+            open_compiled(self.compiled, TEST_NEO_FILE, load_neos(TEST_NEO_FILE))
+        digest.assert_not_called()
+
+    def test_touched_neo_file_is_hashed_again(self):
+        with tempfile.TemporaryDirectory() as directory:
+            neofile = shutil.copy(TEST_NEO_FILE, pathlib.Path(directory) / 'neos.csv')
+            compiled = pathlib.Path(directory) / 'cad.compiled'
+            compile_dataset(neofile, TEST_CAD_FILE, compiled)
+            stat = os.stat(neofile)
+            os.utime(neofile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+            with unittest.mock.patch('compiled.file_digest', wraps=file_digest) as digest:
+                approaches = open_compiled(compiled, neofile, load_neos(neofile))
+            digest.assert_called_once_with(neofile)
+            self.assertEqual(len(approaches), 4700)
+
+    def test_neo_approaches_are_viewed_when_first_read(self):
+        neos = load_neos(TEST_NEO_FILE)
+        approaches = open_compiled(self.compiled, TEST_NEO_FILE, neos)
+        NEODatabase(neos, approaches, columnar=self.columnar)
+        self.assertTrue(all(neo._approaches is approaches for neo in neos))
+        cerberus = next(neo for neo in neos if neo.name == 'Cerberus')
+        self.assertEqual(summarize(cerberus.approaches),
+                         summarize(self.db.get_neo_by_name('Cerberus').approaches))
+        self.assertIs(cerberus.approaches, cerberus.approaches)
+
+    def test_diameter_index_is_read_from_the_dataset(self):
+        neos = load_neos(TEST_NEO_FILE)
+        approaches = open_compiled(self.compiled, TEST_NEO_FILE, neos)
+        with unittest.mock.patch.object(NEODatabase, '_index_diameters') as index_diameters:
+            NEODatabase(neos, approaches, columnar=self.columnar)
+        index_diameters.assert_not_called()
+        self.assertEqual(list(approaches.columns['diameter_keys']), self.db._diameter_keys)
+        self.assertEqual([neos[position].designation for position in approaches.columns['diameter_order']],
+                         self.db._diameter_designations)
+
+
+@unittest.skipIf(numpy is None, "The columnar store requires NumPy.")
+class TestColumnarCompiledDataset(TestCompiledDataset):
+    columnar = True
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""Check that diameter filters answered with the diameter index match a scan of every close approach.
+
+The expected results are computed by checking every close approach against
+the filters, and ordering the matches by approach time (breaking ties by
+position), so they don't depend on the time index or the diameter index.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_diameter_index
+"""
+import datetime
+import math
+import pathlib
+import tempfile
+import unittest
+import unittest.mock
+
+import database
+from columnar import numpy
+from compiled import compile_dataset, open_compiled
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+QUERIES = [
+    {'diameter_min': 0.5},
+    {'diameter_max': 0.1},
+    {'diameter_min': 0.5, 'diameter_max': 1.5},
+    {'diameter_min': 1.0, 'diameter_max': 1.0},
+    {'diameter_min': 1.5, 'diameter_max': 0.5},
+    {'diameter_min': 100},
+    {'diameter_max': 0},
+    {'diameter_min': 0.2, 'start_date': datetime.date(2020, 4, 1)},
+    {'diameter_max': 1.0, 'date': datetime.date(2020, 1, 4)},
+    {'diameter_min': 0.3, 'distance_max': 0.2, 'hazardous': True},
+    {'diameter_min': 0.1, 'velocity_min': 15, 'end_date': datetime.date(2020, 9, 30)},
+]
+
+
+class TestDiameterIndex(unittest.TestCase):
+    columnar = False
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE),
+                             columnar=cls.columnar)
+
+    def expected(self, db, filters):
+        approaches = db._approaches
+        matches = [index for index in range(len(approaches))
+                   if all(criterion(approaches[index]) for criterion in filters)]
+        return sorted(matches, key=lambda index: (approaches[index].minutes, index))
+
+    def assertMatchesScan(self, db, **criteria):
+        filters = create_filters(**criteria)
+        self.assertEqual(list(db.select(filters)), self.expected(db, filters))
+
+    def test_diameter_queries_match_a_scan(self):
+        for criteria in QUERIES:
+            with self.subTest(**criteria):
+                self.assertMatchesScan(self.db, **criteria)
+
+    def test_narrow_diameter_range_is_answered_with_the_index(self):
+        filters = create_filters(diameter_min=1.0, diameter_max=2.0, distance_max=0.3)
+        candidates = self.db._diameter_candidates([], [], list(filters))
+        self.assertIsNotNone(candidates)
+        positions, remaining = candidates
+        self.assertLess(len(positions), len(self.db._approaches) // 100)
+        self.assertEqual([type(criterion).__name__ for criterion in remaining], ['DistanceFilter'])
+        self.assertEqual(list(self.db.select(filters)), self.expected(self.db, filters))
+
+    def test_wide_diameter_range_falls_back_to_a_scan(self):
+        with unittest.mock.patch.object(database, 'DIAMETER_INDEX_FRACTION', 0), \
+                unittest.mock.patch.object(database, 'COLUMNAR_DIAMETER_INDEX_FRACTION', 0):
+            for criteria in QUERIES[:4]:
+                with self.subTest(**criteria):
+                    filters = create_filters(**criteria)
+                    self.assertIsNone(self.db._diameter_candidates([], [], list(filters)))
+                    self.assertMatchesScan(self.db, **criteria)
+
+    def test_index_skips_neos_of_unknown_diameter(self):
+        keys = list(self.db._diameter_keys)
+        self.assertEqual(keys, sorted(keys))
+        self.assertFalse(any(math.isnan(diameter) for diameter in keys))
+        groups = self.db._diameter_groups(0, len(keys))
+        self.assertEqual(len(groups), sum(not math.isnan(neo.diameter) for neo in self.db._neos))
+        linked = 0
+        for diameter, positions in zip(keys, groups):
+            approaches = [self.db._approaches[index] for index in positions]
+            if approaches:
+                neo = approaches[0].neo
+                self.assertEqual(neo.diameter, diameter)
+                self.assertEqual(approaches, list(neo.approaches))
+                linked += 1
+        self.assertEqual(linked, sum(bool(neo.approaches) and not math.isnan(neo.diameter)
+                                     for neo in self.db._neos))
+
+    def test_index_is_kept_up_to_date_when_the_database_is_extended(self):
+        neos, approaches = load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE)
+        db = NEODatabase(neos[::2], approaches[::3], columnar=self.columnar)
+        db.add_approaches(approaches[1::3])
+        db.add_neos(neos[1::2][:5])
+        db.extend(neos[1::2][5:], approaches[2::3])
+        self.assertEqual(db._diameter_keys, self.db._diameter_keys)
+        self.assertEqual([db.get_neo_by_designation(designation).diameter
+                          for designation in db._diameter_designations], db._diameter_keys)
+        for criteria in QUERIES:
+            with self.subTest(**criteria):
+                self.assertMatchesScan(db, **criteria)
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed.")
+class TestColumnarDiameterIndex(TestDiameterIndex):
+    columnar = True
+
+
+class TestCompiledDiameterIndex(TestDiameterIndex):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        compile_dataset(TEST_NEO_FILE, TEST_CAD_FILE, cls.directory.name)
+        neos = load_neos(TEST_NEO_FILE)
+        cls.db = NEODatabase(neos, open_compiled(cls.directory.name, TEST_NEO_FILE, neos),
+                             columnar=cls.columnar)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.directory.cleanup()
+
+    def test_index_is_kept_up_to_date_when_the_database_is_extended(self):
+        self.skipTest("A compiled dataset can't be extended.")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,11 +12,14 @@ These tests should pass when Task 2 is complete.
 """
 import collections.abc
 import datetime
+import json
 import pathlib
 import math
+import tempfile
+import tracemalloc
 import unittest
 
-from extract import load_neos, load_approaches
+from extract import load_neos, load_approaches, iter_approaches, iter_neos
 from models import NearEarthObject, CloseApproach
 
 
@@ -78,6 +81,39 @@ class TestLoadNEOs(unittest.TestCase):
         self.assertEqual(neo.hazardous, True)
 
 
+class TestIterNEOs(unittest.TestCase):
+    def write_csv(self, text):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = pathlib.Path(directory.name) / 'neos.csv'
+        path.write_text(text)
+        return path
+
+    def test_iter_neos_is_an_iterator(self):
+        self.assertIsInstance(iter_neos(TEST_NEO_FILE), collections.abc.Iterator)
+
+    def test_iter_neos_reads_columns_by_header(self):
+        path = self.write_csv("pha,extra,name,diameter,pdes\n"
+                              "Y,1,Adonis,0.6,2101\n"
+                              "N,2,,,2019 SC8\n")
+        neos = list(iter_neos(path))
+        self.assertEqual([neo.designation for neo in neos], ['2101', '2019 SC8'])
+        self.assertEqual([neo.name for neo in neos], ['Adonis', None])
+        self.assertEqual(neos[0].diameter, 0.6)
+        self.assertTrue(math.isnan(neos[1].diameter))
+        self.assertEqual([neo.hazardous for neo in neos], [True, False])
+
+    def test_iter_neos_handles_quoted_fields(self):
+        path = self.write_csv('full_name,pdes,name,pha,diameter\n'
+                              '"  433 Eros, (A898 PA)",433,Eros,N,16.84\n'
+                              '"multi\nline",1P,"Halley, ""the"" comet",Y,11\n'
+                              'plain,2101,Adonis,Y,0.6\n')
+        neos = list(iter_neos(path))
+        self.assertEqual([neo.designation for neo in neos], ['433', '1P', '2101'])
+        self.assertEqual([neo.name for neo in neos], ['Eros', 'Halley, "the" comet', 'Adonis'])
+        self.assertEqual([neo.diameter for neo in neos], [16.84, 11.0, 0.6])
+
+
 class TestLoadApproaches(unittest.TestCase):
     @classmethod
     def setUpClass(cls):
@@ -118,5 +154,55 @@ class TestLoadApproaches(unittest.TestCase):
         self.assertIsInstance(approach.velocity, float)
 
 
+def load_approaches_eagerly(cad_json_path):
+    """Load close approaches the way `load_approaches` used to, as a memory baseline.
+
+    The whole document is decoded at once, then copied into a list of dicts,
+    and only then are the `CloseApproach` objects built.
+    """
+    with open(cad_json_path) as json_file:
+        contents = json.load(json_file)
+    records = [dict(_designation=row[0], time=row[3], distance=row[4], velocity=row[7])
+               for row in contents['data']]
+    return [CloseApproach(**record) for record in records]
+
+
+def measure_memory(loader, path):
+    """Return the memory retained by and the peak memory used while calling `loader(path)`."""
+    tracemalloc.start()
+    try:
+        result = loader(path)
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return retained, peak
+
+
+class TestStreamApproaches(unittest.TestCase):
+    def test_iter_approaches_is_an_iterator(self):
+        self.assertIsInstance(iter_approaches(TEST_CAD_FILE), collections.abc.Iterator)
+
+    def test_iter_approaches_matches_the_data_array(self):
+        with open(TEST_CAD_FILE) as json_file:
+            data = json.load(json_file)['data']
+
+        approaches = list(iter_approaches(TEST_CAD_FILE))
+        self.assertEqual(len(approaches), len(data))
+        for approach, row in zip(approaches, data):
+            self.assertEqual(approach._designation, row[0])
+            self.assertEqual(approach.distance, float(row[4]))
+            self.assertEqual(approach.velocity, float(row[7]))
+
+    def test_peak_memory_stays_near_the_size_of_the_approaches(self):
+        retained, peak = measure_memory(load_approaches, TEST_CAD_FILE)
+        self.assertLess(peak, 1.5 * retained)
+
+    def test_peak_memory_is_below_the_eager_loader(self):
+        _, eager_peak = measure_memory(load_approaches_eagerly, TEST_CAD_FILE)
+        _, peak = measure_memory(load_approaches, TEST_CAD_FILE)
+        self.assertLess(peak, eager_peak / 2)
+
+
 if __name__ == '__main__':
     unittest.main()
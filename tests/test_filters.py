@@ -0,0 +1,68 @@
+"""Check that `create_filters` produces a collection of `AttributeFilter`s.
+
+Each criterion passed to `create_filters` should produce a concrete filter, and
+criteria that aren't specified should produce no filter at all.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_filters
+"""
+import datetime
+import operator
+import unittest
+
+from filters import (create_filters, AttributeFilter, DateFilter, DistanceFilter,
+                     VelocityFilter, DiameterFilter, HazardousFilter)
+from models import CloseApproach
+
+
+class TestCreateFilters(unittest.TestCase):
+    def test_no_criteria_produce_no_filters(self):
+        self.assertEqual(len(create_filters()), 0)
+
+    def test_each_criterion_produces_a_filter(self):
+        date = datetime.date(2020, 3, 2)
+        filters = create_filters(
+            date=date, start_date=date, end_date=date,
+            distance_min=0.1, distance_max=0.2,
+            velocity_min=5, velocity_max=25,
+            diameter_min=0.5, diameter_max=1.5,
+            hazardous=False
+        )
+        self.assertEqual(len(filters), 10)
+        for criterion in filters:
+            self.assertIsInstance(criterion, AttributeFilter)
+
+        summary = {(type(criterion), criterion.op, criterion.value) for criterion in filters}
+        self.assertIn((DateFilter, operator.eq, date), summary)
+        self.assertIn((DateFilter, operator.ge, date), summary)
+        self.assertIn((DateFilter, operator.le, date), summary)
+        self.assertIn((DistanceFilter, operator.ge, 0.1), summary)
+        self.assertIn((DistanceFilter, operator.le, 0.2), summary)
+        self.assertIn((VelocityFilter, operator.ge, 5), summary)
+        self.assertIn((VelocityFilter, operator.le, 25), summary)
+        self.assertIn((DiameterFilter, operator.ge, 0.5), summary)
+        self.assertIn((DiameterFilter, operator.le, 1.5), summary)
+        self.assertIn((HazardousFilter, operator.eq, False), summary)
+
+    def test_only_specified_criteria_produce_filters(self):
+        filters = create_filters(velocity_max=25, hazardous=True)
+        self.assertEqual(
+            {(type(criterion), criterion.op, criterion.value) for criterion in filters},
+            {(VelocityFilter, operator.le, 25), (HazardousFilter, operator.eq, True)}
+        )
+
+
+class TestDateFilter(unittest.TestCase):
+    def test_date_filter_compares_dates(self):
+        approaches = [CloseApproach(time=calendar_date) for calendar_date in
+                      ('2020-Mar-01 23:59', '2020-Mar-02 00:00', '2020-Mar-02 23:59', '2020-Mar-03 00:00')]
+        date = datetime.date(2020, 3, 2)
+        for op in (operator.eq, operator.ne, operator.lt, operator.le, operator.gt, operator.ge):
+            self.assertEqual([DateFilter(op, date)(approach) for approach in approaches],
+                             [op(approach.time.date(), date) for approach in approaches],
+                             msg=op.__name__)
+
+
+if __name__ == '__main__':
+    unittest.main()
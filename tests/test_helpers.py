@@ -0,0 +1,79 @@
+"""Check that datetimes are converted to and from strings exactly as `strptime` would.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_helpers
+"""
+import datetime
+import json
+import pathlib
+import unittest
+
+import helpers
+from helpers import (cd_to_datetime, cd_to_minutes, datetime_to_str, datetime_to_minutes,
+                     minutes_to_datetime, date_to_days)
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestHelpers(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        with open(TEST_CAD_FILE) as infile:
+            cls.calendar_dates = [row[3] for row in json.load(infile)['data']]
+
+    def test_cd_to_datetime_matches_strptime_on_test_data(self):
+        for calendar_date in self.calendar_dates:
+            expected = datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
+            self.assertEqual(cd_to_datetime(calendar_date), expected, msg=calendar_date)
+
+    def test_cd_to_datetime_matches_strptime_on_unusual_formats(self):
+        for calendar_date in ('1900-Jan-01 00:00', '2200-Dec-31 23:59', '2020-dec-31 12:00',
+                              '2020-Feb-29 01:02', '2020-Mar-1 12:00', '2020-Mar-01 1:05'):
+            expected = datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
+            self.assertEqual(cd_to_datetime(calendar_date), expected, msg=calendar_date)
+
+    def test_cd_to_datetime_rejects_invalid_dates(self):
+        for calendar_date in ('2019-Feb-29 00:00', '2020-Foo-01 00:00', '2020-Jan-01 24:00', ''):
+            with self.assertRaises(ValueError, msg=calendar_date):
+                cd_to_datetime(calendar_date)
+
+    def test_cd_to_minutes_matches_cd_to_datetime(self):
+        for calendar_date in self.calendar_dates + ['1900-Jan-01 00:00', '2020-Mar-1 12:00']:
+            self.assertEqual(cd_to_minutes(calendar_date),
+                             datetime_to_minutes(cd_to_datetime(calendar_date)), msg=calendar_date)
+        for calendar_date in ('2020-Jan-01 24:00', '2020-Jan-01 12:60'):
+            with self.assertRaises(ValueError, msg=calendar_date):
+                cd_to_minutes(calendar_date)
+
+    def test_date_cache_is_bounded(self):
+        start = datetime.datetime(1900, 1, 1, 12, 34)
+        for offset in range(0, 2 * helpers.DATE_CACHE_SIZE):
+            dt = start + datetime.timedelta(days=offset)
+            calendar_date = dt.strftime("%Y-%b-%d %H:%M")
+            self.assertEqual(cd_to_datetime(calendar_date), dt)
+            self.assertEqual(cd_to_minutes(calendar_date), datetime_to_minutes(dt))
+        self.assertLessEqual(helpers._parse_cd_date.cache_info().currsize, helpers.DATE_CACHE_SIZE)
+
+    def test_date_to_days(self):
+        self.assertEqual(date_to_days(datetime.date(1970, 1, 1)), 0)
+        self.assertEqual(date_to_days(datetime.date(1969, 12, 31)), -1)
+        self.assertEqual(date_to_days(datetime.date(2020, 3, 2)) * 24 * 60,
+                         datetime_to_minutes(datetime.datetime(2020, 3, 2)))
+
+    def test_datetime_to_str_matches_strftime(self):
+        for calendar_date in self.calendar_dates:
+            dt = cd_to_datetime(calendar_date)
+            self.assertEqual(datetime_to_str(dt), dt.strftime("%Y-%m-%d %H:%M"))
+
+    def test_minutes_round_trip(self):
+        for calendar_date in self.calendar_dates:
+            dt = cd_to_datetime(calendar_date)
+            self.assertEqual(minutes_to_datetime(datetime_to_minutes(dt)), dt)
+        self.assertEqual(datetime_to_minutes(datetime.datetime(1969, 12, 31, 23, 59)), -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
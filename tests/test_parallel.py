@@ -0,0 +1,141 @@
+"""Check that loading the data files concurrently matches loading them one at a time.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_parallel
+"""
+import json
+import math
+import pathlib
+import tempfile
+import unittest
+
+from extract import load_neos, load_approaches
+from parallel import LoadTimings, load_concurrently, load_approaches_in_parallel, split_data_array
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+def describe_neo(neo):
+    return (neo.designation, neo.name,
+            None if math.isnan(neo.diameter) else neo.diameter, neo.hazardous)
+
+
+def describe_approach(approach):
+    return approach._designation, approach.time, approach.distance, approach.velocity
+
+
+class TestLoadConcurrently(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.timings = LoadTimings()
+        cls.neos, cls.approaches = load_concurrently(TEST_NEO_FILE, TEST_CAD_FILE, cls.timings,
+                                                     workers=3)
+
+    def test_neos_match_serial_load(self):
+        self.assertEqual([describe_neo(neo) for neo in self.neos],
+                         [describe_neo(neo) for neo in load_neos(TEST_NEO_FILE)])
+
+    def test_approaches_match_serial_load(self):
+        self.assertEqual([describe_approach(approach) for approach in self.approaches],
+                         [describe_approach(approach) for approach in load_approaches(TEST_CAD_FILE)])
+
+    def test_loaded_objects_are_unlinked(self):
+        self.assertTrue(all(neo.approaches == [] for neo in self.neos))
+        self.assertTrue(all(approach.neo is None for approach in self.approaches))
+
+    def test_timings_record_each_step(self):
+        names = [name for name, _, _ in self.timings.steps]
+        self.assertCountEqual(names, ['parse neos (worker)', 'build neos',
+                                      'parse approaches 1/2 (worker)', 'build approaches 1/2',
+                                      'parse approaches 2/2 (worker)', 'build approaches 2/2'])
+        for _, start, stop in self.timings.steps:
+            self.assertLessEqual(start, stop)
+
+
+class TestLoadApproachesInParallel(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = [describe_approach(approach) for approach in load_approaches(TEST_CAD_FILE)]
+        with open(TEST_CAD_FILE) as infile:
+            cls.contents = json.load(infile)
+
+    def assertLoadsInParallel(self, cadfile):
+        for workers in (1, 2, 3, 7):
+            with self.subTest(workers=workers):
+                approaches = load_approaches_in_parallel(cadfile, workers=workers)
+                self.assertEqual([describe_approach(approach) for approach in approaches],
+                                 self.expected)
+
+    def test_load_pretty_printed_file(self):
+        self.assertLoadsInParallel(TEST_CAD_FILE)
+
+    def test_load_compact_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cadfile = pathlib.Path(directory) / 'cad.json'
+            with open(cadfile, 'w') as outfile:
+                json.dump(self.contents, outfile, separators=(',', ':'))
+            self.assertLoadsInParallel(cadfile)
+
+    def test_load_file_with_data_before_other_keys(self):
+        contents = {'data': self.contents['data'], **self.contents}
+        with tempfile.TemporaryDirectory() as directory:
+            cadfile = pathlib.Path(directory) / 'cad.json'
+            with open(cadfile, 'w') as outfile:
+                json.dump(contents, outfile)
+            self.assertLoadsInParallel(cadfile)
+
+    def test_split_data_array_into_chunks_of_records(self):
+        with open(TEST_CAD_FILE, 'rb') as infile:
+            contents = infile.read()
+        chunks = split_data_array(TEST_CAD_FILE, 5)
+        self.assertEqual(len(chunks), 5)
+        self.assertIsNone(chunks[-1][1])
+        for (_, stop), (start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(contents[stop - 1:stop], b']')
+            self.assertEqual(contents[stop:start].strip(), b',')
+            self.assertEqual(contents[start:start + 1], b'[')
+
+    def test_split_data_array_into_balanced_chunks(self):
+        with open(TEST_CAD_FILE, 'rb') as infile:
+            contents = infile.read()
+        total = len(load_approaches(TEST_CAD_FILE))
+        for count in (2, 4, 8):
+            with self.subTest(count=count):
+                chunks = split_data_array(TEST_CAD_FILE, count)
+                self.assertEqual(len(chunks), count)
+                # The last chunk runs past the end of the array, to the end of the file.
+                decoder = json.JSONDecoder()
+                sizes = [len(decoder.raw_decode('[' + contents[start:stop].decode()
+                                                + (']' if stop is not None else ''))[0])
+                         for start, stop in chunks]
+                self.assertEqual(sum(sizes), total)
+                for size in sizes:
+                    self.assertLess(abs(size - total / count), total / count / 4)
+
+    def test_split_empty_data_array(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cadfile = pathlib.Path(directory) / 'cad.json'
+            with open(cadfile, 'w') as outfile:
+                json.dump({'count': 0, 'data': []}, outfile)
+            self.assertEqual(len(split_data_array(cadfile, 4)), 1)
+            self.assertEqual(load_approaches_in_parallel(cadfile, workers=4), [])
+
+
+class TestLoadTimings(unittest.TestCase):
+    def test_overlapped(self):
+        timings = LoadTimings()
+        timings.origin = 0.0
+        timings.add('a', 0.0, 2.0)
+        timings.add('b', 1.0, 4.0)
+        timings.add('c', 5.0, 6.0)
+        self.assertEqual(timings.total, 6.0)
+        self.assertEqual(timings.overlapped, 1.0)
+        self.assertEqual(len(str(timings).splitlines()), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
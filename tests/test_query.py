@@ -13,12 +13,16 @@ To run these tests from the project root, run::
 These tests should pass when Tasks 3a and 3b are complete.
 """
 import datetime
+import functools
+import multiprocessing
 import pathlib
 import unittest
+import unittest.mock
 
-from database import NEODatabase
+from columnar import numpy
+from database import NEODatabase, FORK_AVAILABLE
 from extract import load_neos, load_approaches
-from filters import create_filters
+from filters import create_filters, limit
 
 
 TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
@@ -29,12 +33,13 @@ TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
 class TestQuery(unittest.TestCase):
     # Set longMessage to True to enable lengthy diffs between set comparisons.
     longMessage = False
+    columnar = False
 
     @classmethod
     def setUpClass(cls):
         cls.neos = load_neos(TEST_NEO_FILE)
         cls.approaches = load_approaches(TEST_CAD_FILE)
-        cls.db = NEODatabase(cls.neos, cls.approaches)
+        cls.db = NEODatabase(cls.neos, cls.approaches, columnar=cls.columnar)
 
     def test_query_all(self):
         expected = set(self.approaches)
@@ -529,5 +534,85 @@ class TestQuery(unittest.TestCase):
         self.assertEqual(expected, received, msg="Computed results do not match expected results.")
 
 
+    #######################
+    # Ordering of results #
+    #######################
+
+    def test_query_all_is_in_time_order(self):
+        expected = sorted(self.approaches, key=lambda approach: approach.time)
+
+        filters = create_filters()
+        received = list(self.db.query(filters))
+        self.assertEqual([approach.time for approach in expected],
+                         [approach.time for approach in received])
+
+    def test_query_approaches_in_march_is_in_time_order(self):
+        start_date = datetime.date(2020, 3, 1)
+        end_date = datetime.date(2020, 3, 31)
+
+        expected = sorted(
+            (approach for approach in self.approaches
+             if start_date <= approach.time.date() <= end_date),
+            key=lambda approach: approach.time
+        )
+        self.assertGreater(len(expected), 0)
+
+        filters = create_filters(start_date=start_date, end_date=end_date)
+        received = list(self.db.query(filters))
+        self.assertEqual([approach.time for approach in expected],
+                         [approach.time for approach in received])
+
+    #########################
+    # Laziness of datetimes #
+    #########################
+
+    def test_query_only_builds_datetimes_of_results(self):
+        # Use fresh close approaches, whose datetimes no other test has built yet.
+        approaches = load_approaches(TEST_CAD_FILE)
+        db = NEODatabase(load_neos(TEST_NEO_FILE), approaches, columnar=self.columnar)
+
+        filters = create_filters(start_date=datetime.date(2020, 3, 1), distance_max=0.1)
+        received = list(db.query(filters))
+        self.assertGreater(len(received), 0)
+        self.assertTrue(all(approach._time is None for approach in approaches))
+
+        for approach in received:
+            approach.time_str
+        self.assertEqual({approach for approach in approaches if approach._time is not None},
+                         set(received))
+
+
+@unittest.skipIf(numpy is None, "The columnar store requires NumPy.")
+class TestColumnarQuery(TestQuery):
+    columnar = True
+
+
+@unittest.skipUnless(FORK_AVAILABLE, "Parallel queries require forked worker processes.")
+class TestParallelQuery(TestQuery):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.db.query = functools.partial(cls.db.query, workers=3)
+
+    def test_query_with_limit_stops_workers(self):
+        filters = create_filters(distance_min=0.01)
+        results = self.db.query(filters)
+        self.assertEqual(len(list(limit(results, 2))), 2)
+        self.assertTrue(multiprocessing.active_children())
+        results.close()
+        self.assertFalse(multiprocessing.active_children())
+
+    def test_replacement_workers_scan_the_same_database(self):
+        # Replace each worker after every shard, so the scan is mostly done
+        # by workers that the pool forked after it was created.
+        context = multiprocessing.get_context('fork')
+        replacing = unittest.mock.Mock(wraps=context)
+        replacing.Pool = functools.partial(context.Pool, maxtasksperchild=1)
+        filters = create_filters(distance_max=0.2, velocity_min=10)
+        expected = list(NEODatabase.query(self.db, filters))
+        with unittest.mock.patch('database.multiprocessing.get_context', return_value=replacing):
+            self.assertEqual(list(self.db.query(filters)), expected)
+
+
 if __name__ == '__main__':
     unittest.main()
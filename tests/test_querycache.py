@@ -0,0 +1,138 @@
+"""Check that a `QueryCache` answers repeated queries with the same results as the database.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_querycache
+"""
+import datetime
+import pathlib
+import unittest
+import unittest.mock
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import create_filters, limit
+from querycache import QueryCache
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestQueryCache(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def setUp(self):
+        self.cache = QueryCache()
+        self.filters = create_filters(start_date=datetime.date(2020, 3, 1), distance_max=0.1)
+        self.expected = list(self.db.query(self.filters))
+        self.assertGreater(len(self.expected), 20)
+
+    def query(self, filters=None, limit=None):
+        filters = self.filters if filters is None else filters
+        with unittest.mock.patch.object(self.db, 'select', wraps=self.db.select) as select:
+            results = list(self.cache.query(self.db, filters, limit))
+        return results, select.called
+
+    def test_repeated_query_is_served_from_the_cache(self):
+        results, scanned = self.query()
+        self.assertEqual(results, self.expected)
+        self.assertTrue(scanned)
+
+        results, scanned = self.query()
+        self.assertEqual(results, self.expected)
+        self.assertFalse(scanned)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 1))
+
+    def test_complete_results_serve_any_limit(self):
+        self.query()
+        for count in (1, 5, len(self.expected), len(self.expected) + 5):
+            results, scanned = self.query(limit=count)
+            self.assertEqual(results, self.expected[:count])
+            self.assertFalse(scanned)
+
+    def test_partial_results_serve_smaller_limits_only(self):
+        results, _ = self.query(limit=10)
+        self.assertEqual(results, self.expected[:10])
+
+        results, scanned = self.query(limit=5)
+        self.assertEqual(results, self.expected[:5])
+        self.assertFalse(scanned)
+
+        results, scanned = self.query(limit=15)
+        self.assertEqual(results, self.expected[:15])
+        self.assertTrue(scanned)
+
+        results, scanned = self.query()
+        self.assertEqual(results, self.expected)
+        self.assertTrue(scanned)
+
+    def test_results_read_through_a_limit_are_cached(self):
+        for result in limit(self.cache.query(self.db, self.filters, 3), 3):
+            pass
+        _, scanned = self.query(limit=3)
+        self.assertFalse(scanned)
+
+    def test_abandoned_results_are_not_cached(self):
+        results = self.cache.query(self.db, self.filters)
+        next(results)
+        results.close()
+        self.assertEqual(len(self.cache), 0)
+
+    def test_filters_in_any_order_share_an_entry(self):
+        self.query()
+        results, scanned = self.query(filters=list(reversed(self.filters)))
+        self.assertEqual(results, self.expected)
+        self.assertFalse(scanned)
+
+    def test_different_criteria_have_different_entries(self):
+        self.query()
+        other = create_filters(start_date=datetime.date(2020, 3, 1), distance_max=0.2)
+        results, scanned = self.query(filters=other)
+        self.assertEqual(results, list(self.db.query(other)))
+        self.assertTrue(scanned)
+        self.assertEqual(len(self.cache), 2)
+
+    def test_least_recently_used_entry_is_evicted_beyond_max_entries(self):
+        self.cache = QueryCache(max_entries=2)
+        queries = [create_filters(distance_max=distance) for distance in (0.1, 0.2, 0.3)]
+        self.query(queries[0])
+        self.query(queries[1])
+        self.query(queries[0])
+        self.query(queries[2])
+
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertFalse(self.query(queries[0])[1])
+        self.assertTrue(self.query(queries[1])[1])
+
+    def test_entries_are_evicted_beyond_max_bytes(self):
+        self.query()
+        size = self.cache.size
+        self.cache = QueryCache(max_bytes=size + size // 2)
+        self.query()
+        self.query(create_filters(start_date=datetime.date(2020, 3, 2), distance_max=0.1))
+
+        self.assertEqual(len(self.cache), 1)
+        self.assertLessEqual(self.cache.size, self.cache.max_bytes)
+        self.assertTrue(self.query()[1])
+
+    def test_results_larger_than_max_bytes_are_not_cached(self):
+        self.cache = QueryCache(max_bytes=1)
+        results, _ = self.query()
+        self.assertEqual(results, self.expected)
+        self.assertEqual(len(self.cache), 0)
+
+    def test_clear_forgets_entries(self):
+        self.query()
+        self.cache.clear()
+        self.assertEqual((len(self.cache), self.cache.size), (0, 0))
+        self.assertTrue(self.query()[1])
+        self.assertEqual(self.cache.misses, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""Check that `sort_results` sorts close approaches, and selects the first few of them in order.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_sort
+"""
+import heapq
+import math
+import pathlib
+import unittest
+import unittest.mock
+
+from database import NEODatabase
+from extract import load_neos, load_approaches
+from filters import SORT_KEYS, create_filters, sort_results
+from models import CloseApproach
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+def diameter(approach):
+    return approach.neo.diameter if approach.neo else float('nan')
+
+
+ATTRIBUTES = {
+    'time': lambda approach: approach.minutes,
+    'distance': lambda approach: approach.distance,
+    'velocity': lambda approach: approach.velocity,
+    'diameter': diameter,
+}
+
+
+class TestSortResults(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        cls.results = list(cls.db.query(create_filters(distance_max=0.2)))
+        # An approach of an unknown NEO, which has no diameter.
+        cls.results.append(CloseApproach(_designation='unknown', time='2020-Jun-01 00:00',
+                                         distance='0.1', velocity='10'))
+
+    def expected(self, by, descending):
+        """Sort the results with `sorted`, putting unknown diameters last."""
+        attribute = ATTRIBUTES[by]
+        known = [approach for approach in self.results if not math.isnan(attribute(approach))]
+        unknown = [approach for approach in self.results if math.isnan(attribute(approach))]
+        return sorted(known, key=attribute, reverse=descending) + unknown
+
+    def test_sort_results_matches_sorted(self):
+        for by in SORT_KEYS:
+            for descending in (False, True):
+                with self.subTest(by=by, descending=descending):
+                    received = list(sort_results(iter(self.results), by, descending))
+                    self.assertEqual(received, self.expected(by, descending))
+
+    def test_sort_results_selects_the_first_few(self):
+        for by in SORT_KEYS:
+            for descending in (False, True):
+                for n in (1, 10, len(self.results), len(self.results) + 10):
+                    with self.subTest(by=by, descending=descending, n=n):
+                        received = list(sort_results(iter(self.results), by, descending, n))
+                        self.assertEqual(received, self.expected(by, descending)[:n])
+
+    def assertSelectedWith(self, heap, n, by='distance', descending=False):
+        select = 'nlargest' if descending else 'nsmallest'
+        with unittest.mock.patch(f'filters.heapq.{select}', wraps=getattr(heapq, select)) as mock:
+            received = list(sort_results(iter(self.results), by, descending, n))
+        self.assertEqual(mock.called, heap)
+        self.assertEqual(received, self.expected(by, descending)[:n])
+
+    def test_few_of_many_are_selected_with_a_heap(self):
+        for by in SORT_KEYS:
+            for descending in (False, True):
+                with self.subTest(by=by, descending=descending):
+                    self.assertSelectedWith(True, 10, by, descending)
+
+    def test_large_share_of_the_stream_is_sorted(self):
+        for n in (len(self.results) // 4 + 1, len(self.results) // 2, len(self.results) + 1):
+            for descending in (False, True):
+                with self.subTest(n=n, descending=descending):
+                    self.assertSelectedWith(False, n, descending=descending)
+
+    def test_more_than_the_heap_selection_maximum_are_sorted(self):
+        with unittest.mock.patch('filters.HEAP_SELECTION_MAX', 5):
+            self.assertSelectedWith(True, 5)
+            self.assertSelectedWith(False, 6)
+            self.assertSelectedWith(False, 6, descending=True)
+
+    def test_unknown_diameters_come_last(self):
+        self.assertTrue(any(math.isnan(diameter(approach)) for approach in self.results))
+        for descending in (False, True):
+            received = list(sort_results(self.results, 'diameter', descending))
+            known = [math.isnan(diameter(approach)) for approach in received]
+            self.assertEqual(known, sorted(known))
+
+    def test_ties_keep_the_order_of_the_stream(self):
+        received = list(sort_results(self.results, 'diameter', n=len(self.results)))
+        for first, second in zip(received, received[1:]):
+            if diameter(first) == diameter(second):
+                self.assertLess(self.results.index(first), self.results.index(second))
+
+    def test_sort_results_of_nothing(self):
+        self.assertEqual(list(sort_results(iter(()), 'distance', n=5)), [])
+        self.assertEqual(list(sort_results(iter(()), 'distance')), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Check that a `DataFileWatcher` loads what is appended to the data files, and rebuilds otherwise.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_watch
+"""
+import json
+import pathlib
+import shutil
+import tempfile
+import time
+import unittest
+
+from cache import build_database
+from watch import DataFileWatcher
+
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / 'test-neos-2020.csv'
+TEST_CAD_FILE = TESTS_ROOT / 'test-cad-2020.json'
+
+
+class TestDataFileWatcher(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        root = pathlib.Path(directory.name)
+        self.neofile = shutil.copy(TEST_NEO_FILE, root / 'neos.csv')
+        self.cadfile = shutil.copy(TEST_CAD_FILE, root / 'cad.json')
+        with open(TEST_CAD_FILE) as infile:
+            self.contents = json.load(infile)
+        self.db = self.rebuild()
+        self.watcher = DataFileWatcher(self.neofile, self.cadfile, self.rebuild)
+        self.assertIsNone(self.wait())
+
+    def rebuild(self):
+        return build_database(self.neofile, self.cadfile)
+
+    def wait(self):
+        """Poll the watcher until it has finished loading any changes."""
+        for _ in range(200):
+            update = self.watcher.poll()
+            if update is not None or self.watcher._future is None:
+                return update
+            time.sleep(0.01)
+        self.fail("The watcher didn't finish loading the changes.")
+
+    def update(self):
+        update = self.wait()
+        self.assertIsNotNone(update)
+        self.assertIsNone(update.error)
+        self.db = update.apply(self.db)
+        return update
+
+    def write_approaches(self, records, indent=2):
+        self.contents['data'].extend(records)
+        self.contents['count'] = len(self.contents['data'])
+        with open(self.cadfile, 'w') as outfile:
+            json.dump(self.contents, outfile, indent=indent)
+
+    def assertMatchesRebuild(self):
+        expected = self.rebuild()
+        self.assertEqual([str(approach) for approach in self.db.query()],
+                         [str(approach) for approach in expected.query()])
+
+    def test_unchanged_files_have_no_update(self):
+        self.assertIsNone(self.wait())
+
+    def test_appended_approaches_are_added(self):
+        records = [list(record) for record in self.contents['data'][:3]]
+        for record in records:
+            record[3] = '2021-Jan-01 00:00'
+        self.write_approaches(records)
+
+        update = self.update()
+        self.assertIsNone(update.database)
+        self.assertEqual((len(update.neos), len(update.approaches)), (0, 3))
+        self.assertMatchesRebuild()
+
+    def test_appended_neos_are_added_and_linked(self):
+        records = [['ZZZ'] + list(self.contents['data'][0][1:])]
+        self.write_approaches(records)
+        self.update()
+        with open(TEST_NEO_FILE) as infile:
+            row = infile.readlines()[1].replace('1685,Toro', 'ZZZ,Zed')
+        with open(self.neofile, 'a') as outfile:
+            outfile.write(row)
+
+        update = self.update()
+        self.assertEqual((len(update.neos), len(update.approaches)), (1, 0))
+        neo = self.db.get_neo_by_name('Zed')
+        self.assertEqual(len(neo.approaches), 1)
+        self.assertIs(neo.approaches[0].neo, neo)
+        self.assertMatchesRebuild()
+
+    def test_changed_records_rebuild_the_database(self):
+        self.contents['data'][0][4] = '0.5'
+        self.write_approaches([])
+
+        update = self.update()
+        self.assertIsNotNone(update.database)
+        self.assertMatchesRebuild()
+
+    def test_incomplete_appends_are_reported(self):
+        with open(self.cadfile, 'rb') as infile:
+            data = infile.read()
+        end = data.index(b'"fields"')
+        end = data.rindex(b']', 0, end)
+        with open(self.cadfile, 'wb') as outfile:
+            outfile.write(data[:end] + b', ["2020 AB", "1", "2", "2020-Ja')
+
+        update = self.wait()
+        self.assertIsNotNone(update.error)
+        self.assertIs(update.apply(self.db), self.db)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,14 +20,19 @@ import csv
 import datetime
 import io
 import json
+import math
 import pathlib
+import sqlite3
+import tempfile
 import unittest
 import unittest.mock
 
 
 from extract import load_neos, load_approaches
 from database import NEODatabase
-from write import write_to_csv, write_to_json
+from models import CloseApproach
+import write
+from write import write_to_csv, write_to_json, write_to_ndjson, write_to_sqlite
 
 
 TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
@@ -45,6 +50,20 @@ def build_results(n):
     return approaches[:n]
 
 
+def expected_json_element(approach):
+    return {
+        'datetime_utc': approach.time_str,
+        'distance_au': approach.distance,
+        'velocity_km_s': approach.velocity,
+        'neo': {
+            'designation': approach.neo.designation,
+            'name': approach.neo.name or '',
+            'diameter_km': approach.neo.diameter,
+            'potentially_hazardous': approach.neo.hazardous,
+        },
+    }
+
+
 @contextlib.contextmanager
 def UncloseableStringIO(value=''):
     """A context manager for an uncloseable `io.StringIO`.
@@ -65,6 +84,19 @@ def UncloseableStringIO(value=''):
     buf.close()
 
 
+def write_to_string(writer, results):
+    """Write results with a writer to an in-memory file.
+
+    :return: A tuple of what was written to the file and what was printed to stdout.
+    """
+    with unittest.mock.patch('write.open') as mock_file, UncloseableStringIO() as buf, \
+            contextlib.redirect_stdout(io.StringIO()) as stdout:
+        mock_file.return_value = buf
+        writer(results, None)
+        buf.seek(0)
+        return buf.getvalue(), stdout.getvalue()
+
+
 class TestWriteToCSV(unittest.TestCase):
     @classmethod
     @unittest.mock.patch('write.open')
@@ -226,5 +258,194 @@ class TestWriteToJSON(unittest.TestCase):
         self.assertIsInstance(approach['neo']['potentially_hazardous'], bool)
 
 
+class TestWriteToCSVFormat(unittest.TestCase):
+    """Check the exact rows that `write_to_csv` writes."""
+    @classmethod
+    def setUpClass(cls):
+        cls.results = build_results(None)
+
+    def write(self, results):
+        with unittest.mock.patch('write.open') as mock_file, UncloseableStringIO() as buf:
+            mock_file.return_value = buf
+            write_to_csv(results, None)
+            buf.seek(0)
+            value = buf.getvalue()
+        self.assertEqual(mock_file.call_count, 1)
+        return value
+
+    def test_csv_rows_match_requirements(self):
+        rows = list(csv.reader(io.StringIO(self.write(iter(self.results)))))
+        self.assertEqual(rows[0], ['datetime_utc', 'distance_au', 'velocity_km_s', 'designation',
+                                   'name', 'diameter_km', 'potentially_hazardous'])
+        self.assertEqual(len(rows), len(self.results) + 1)
+        for approach, row in zip(self.results, rows[1:]):
+            self.assertEqual(row, [approach.time_str, repr(approach.distance),
+                                   repr(approach.velocity), approach.neo.designation,
+                                   approach.neo.name or '', repr(approach.neo.diameter),
+                                   str(approach.neo.hazardous)])
+        self.assertIn('', (row[4] for row in rows[1:]))
+        self.assertIn('nan', (row[5] for row in rows[1:]))
+
+    def test_csv_of_no_results_is_only_a_header(self):
+        self.assertEqual(self.write(iter(())).splitlines(),
+                         ['datetime_utc,distance_au,velocity_km_s,designation,name,'
+                          'diameter_km,potentially_hazardous'])
+
+
+class TestWriteToJSONFormat(unittest.TestCase):
+    """Check the exact bytes that `write_to_json` streams out."""
+    @classmethod
+    def setUpClass(cls):
+        cls.results = build_results(None)
+
+    def write(self, results):
+        value, stdout = write_to_string(write_to_json, results)
+        self.assertEqual(stdout, '', msg="write_to_json shouldn't print anything.")
+        return value
+
+    def test_json_matches_json_dump(self):
+        expected = [expected_json_element(approach) for approach in self.results]
+        self.assertTrue(any(not element['neo']['name'] for element in expected))
+        self.assertEqual(self.write(iter(self.results)), json.dumps(expected, indent=4))
+
+    def test_json_of_no_results_is_an_empty_list(self):
+        self.assertEqual(self.write(iter(())), json.dumps([], indent=4))
+
+
+class TestWriteToNDJSONFormat(unittest.TestCase):
+    """Check the exact lines that `write_to_ndjson` streams out."""
+    @classmethod
+    def setUpClass(cls):
+        cls.results = build_results(None)
+
+    def test_ndjson_lines_match_json_dumps(self):
+        value, _ = write_to_string(write_to_ndjson, iter(self.results))
+        lines = value.splitlines(keepends=True)
+        self.assertEqual(len(lines), len(self.results))
+        for approach, line in zip(self.results, lines):
+            self.assertEqual(line, json.dumps(expected_json_element(approach)) + '\n')
+
+    def test_ndjson_of_no_results_is_empty(self):
+        self.assertEqual(write_to_string(write_to_ndjson, iter(())), ('', ''))
+
+    def test_ndjson_can_be_read_while_it_is_written(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / 'results.ndjson'
+            seen = []
+
+            def results():
+                for count, approach in enumerate(self.results):
+                    if count in (1500, 2500, 3500):
+                        # Read the file as another process tailing it would.
+                        with open(path) as infile:
+                            seen.append((count, infile.read()))
+                    yield approach
+
+            write_to_ndjson(results(), path)
+
+        for count, value in seen:
+            with self.subTest(count=count):
+                self.assertGreaterEqual(len(value.splitlines()), write.NDJSON_FLUSH_RECORDS)
+                self.assertTrue(value.endswith('\n'))
+                lines = value.splitlines(keepends=True)
+                for approach, line in zip(self.results, lines):
+                    self.assertEqual(line, json.dumps(expected_json_element(approach)) + '\n')
+
+    def test_ndjson_is_flushed_after_an_interval(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = pathlib.Path(directory) / 'results.ndjson'
+            seen = []
+
+            def results():
+                yield self.results[0]
+                yield self.results[1]
+                with open(path) as infile:
+                    seen.append(infile.read())
+                yield self.results[2]
+
+            with unittest.mock.patch.object(write, 'NDJSON_FLUSH_INTERVAL', 0):
+                write_to_ndjson(results(), path)
+
+        self.assertEqual(seen, [''.join(json.dumps(expected_json_element(approach)) + '\n'
+                                        for approach in self.results[:2])])
+
+
+class TestWriteToSQLite(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.results = build_results(None)
+        cls.directory = tempfile.TemporaryDirectory()
+        cls.path = pathlib.Path(cls.directory.name) / 'results.sqlite'
+        write_to_sqlite(iter(cls.results), cls.path)
+        cls.connection = sqlite3.connect(cls.path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.connection.close()
+        cls.directory.cleanup()
+
+    def test_sqlite_approaches_match_results(self):
+        rows = self.connection.execute(
+            'SELECT datetime_utc, distance_au, velocity_km_s, designation, name, diameter_km, '
+            'potentially_hazardous FROM approaches JOIN neos ON approaches.neo_id = neos.id '
+            'ORDER BY approaches.id'
+        ).fetchall()
+        self.assertEqual(rows, [
+            (approach.time_str, approach.distance, approach.velocity, approach.neo.designation,
+             approach.neo.name, None if math.isnan(approach.neo.diameter) else approach.neo.diameter,
+             int(approach.neo.hazardous))
+            for approach in self.results
+        ])
+
+    def test_sqlite_neos_are_distinct(self):
+        (count,), = self.connection.execute('SELECT COUNT(*) FROM neos').fetchall()
+        self.assertEqual(count, len({approach.neo.designation for approach in self.results}))
+
+    def test_sqlite_has_indexes(self):
+        indexes = {name for name, in self.connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertLessEqual({'neos_designation', 'approaches_datetime_utc',
+                              'approaches_distance_au'}, indexes)
+
+    def test_sqlite_keeps_the_designation_of_an_unlinked_approach(self):
+        path = pathlib.Path(self.directory.name) / 'unlinked.sqlite'
+        unlinked = CloseApproach(_designation='2020 ZZ99', time='2020-Jan-02 03:04',
+                                 distance='0.1', velocity='5.5')
+        write_to_sqlite(iter([self.results[0], unlinked, self.results[1]]), path)
+        with contextlib.closing(sqlite3.connect(path)) as connection:
+            rows = connection.execute(
+                'SELECT datetime_utc, designation, name, diameter_km, potentially_hazardous '
+                'FROM approaches JOIN neos ON approaches.neo_id = neos.id ORDER BY approaches.id'
+            ).fetchall()
+        self.assertEqual(rows[1], ('2020-01-02 03:04', '2020 ZZ99', None, None, 0))
+        self.assertEqual([row[1] for row in rows[::2]],
+                         [approach.neo.designation for approach in self.results[:2]])
+
+    def test_sqlite_replaces_existing_file(self):
+        path = pathlib.Path(self.directory.name) / 'replaced.sqlite'
+        write_to_sqlite(iter(self.results), path)
+        write_to_sqlite(iter(self.results[:3]), path)
+        with contextlib.closing(sqlite3.connect(path)) as connection:
+            (count,), = connection.execute('SELECT COUNT(*) FROM approaches').fetchall()
+        self.assertEqual(count, 3)
+
+    def test_sqlite_error_keeps_existing_file(self):
+        directory = pathlib.Path(self.directory.name) / 'failed'
+        directory.mkdir()
+        path = directory / 'kept.sqlite'
+        write_to_sqlite(iter(self.results[:3]), path)
+
+        def results():
+            yield from self.results[:5]
+            raise KeyboardInterrupt
+
+        with self.assertRaises(KeyboardInterrupt):
+            write_to_sqlite(results(), path)
+        self.assertEqual(sorted(entry.name for entry in directory.iterdir()), ['kept.sqlite'])
+        with contextlib.closing(sqlite3.connect(path)) as connection:
+            (count,), = connection.execute('SELECT COUNT(*) FROM approaches').fetchall()
+        self.assertEqual(count, 3)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,307 @@
+"""Watch the data files of an interactive session, and load what was appended to them.
+
+A `DataFileWatcher` notices when the NEO file or the close approach file of an
+`NEODatabase` changes. If records were only appended to a file - rows to the end
+of the CSV file of NEOs, or records to the end of the `data` array of the JSON
+file of close approaches - only those new records are parsed, and then added to
+the database with `NEODatabase.extend`. If any of the existing records changed,
+the database is rebuilt instead.
+
+To tell the two apart, the watcher keeps a digest of the part of each file that
+it has already loaded, and checks that part of the file against it.
+
+Reading the files and rebuilding the database happen in a background thread,
+so that the interactive shell stays responsive. The shell polls the watcher
+before each command, and applies the `DataUpdate` that it hands back once the
+changes are ready.
+"""
+import concurrent.futures
+import hashlib
+import io
+import itertools
+import json
+import mmap
+import os
+import re
+
+from compiled import is_compiled
+from extract import approaches_from_records, find_data_array, neos_from_lines
+
+
+# The end of the `data` array of a JSON file of close approaches: the closing
+# bracket of its last record, and then its own (unless the array is empty). As
+# in `parallel`, this relies on the records not containing brackets.
+DATA_END = re.compile(rb'\]\s*\]')
+EMPTY_ARRAY = re.compile(rb'\[\s*\]')
+
+# How many bytes to read at a time while computing a digest.
+CHUNK_SIZE = 1024 * 1024
+
+
+class DataFileWatcher:
+    """A watcher of the NEO and close approach data files of an `NEODatabase`."""
+    def __init__(self, neofile, cadfile, rebuild):
+        """Start watching the data files that a database was just loaded from.
+
+        :param neofile: A path to the CSV file of NEOs.
+        :param cadfile: A path to the JSON file of close approaches, or to a compiled dataset.
+        :param rebuild: A function of no arguments that builds an `NEODatabase` from the data files.
+        """
+        if is_compiled(cadfile):
+            # A compiled dataset can't be extended, only recompiled.
+            self.files = (_WatchedFile(neofile), _WatchedFile(os.path.join(cadfile, 'manifest.json')))
+        else:
+            self.files = (_WatchedCSVFile(neofile), _WatchedJSONFile(cadfile))
+        self.rebuild = rebuild
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+        # Take note of what has been loaded in the background, as it means
+        # reading the whole of both files.
+        stats = [watched.stat for watched in self.files]
+        self._future = self._executor.submit(self._prepare, stats)
+
+    def poll(self):
+        """Check whether the data files changed, and whether their changes are ready.
+
+        If a file changed, start loading the changes in the background. This
+        is cheap enough to call before every command.
+
+        :return: A `DataUpdate` once the changes have been loaded, or else None.
+        """
+        if self._future is not None:
+            if not self._future.done():
+                return None
+            future, self._future = self._future, None
+            return future.result()
+        if any(watched.changed() for watched in self.files):
+            self._future = self._executor.submit(self._load_changes)
+        return None
+
+    def request_rebuild(self):
+        """Start rebuilding the database from the data files in the background."""
+        if self._future is None:
+            self._future = self._executor.submit(self._rebuild)
+
+    def _prepare(self, stats=None):
+        """Take note of the contents of each data file, unless it changed from a given `stat`."""
+        for watched, stat in zip(self.files, stats or itertools.repeat(None)):
+            watched.prepare(stat)
+
+    def _load_changes(self):
+        """Load the records appended to the data files, or rebuild the database if necessary."""
+        try:
+            changes = [watched.read_changes() for watched in self.files]
+        except (OSError, ValueError) as err:
+            return DataUpdate(error=err)
+        if None in changes:
+            return self._rebuild()
+        neos, approaches = changes
+        if not neos and not approaches:
+            return None
+        return DataUpdate(neos=neos, approaches=approaches)
+
+    def _rebuild(self):
+        """Rebuild the database from the data files, taking note of their contents first."""
+        while True:
+            self._prepare()
+            try:
+                database = self.rebuild()
+            except (OSError, ValueError) as err:
+                return DataUpdate(error=err)
+            # Try again if a file changed while the database was being built.
+            if not any(watched.changed() for watched in self.files):
+                return DataUpdate(database=database)
+
+
+class DataUpdate:
+    """The changes to the data files of an `NEODatabase`, as loaded by a `DataFileWatcher`.
+
+    An update holds either the new NEOs and close approaches that were
+    appended to the data files, or a rebuilt database, or the error that kept
+    the changes from being loaded.
+    """
+    def __init__(self, neos=(), approaches=(), database=None, error=None):
+        """Create a new `DataUpdate`.
+
+        :param neos: A collection of new `NearEarthObject`s.
+        :param approaches: A collection of new `CloseApproach`es.
+        :param database: A rebuilt `NEODatabase`, or None.
+        :param error: The exception raised while loading the changes, or None.
+        """
+        self.neos = neos
+        self.approaches = approaches
+        self.database = database
+        self.error = error
+
+    def apply(self, database):
+        """Apply this update to a database.
+
+        :param database: The `NEODatabase` of the data files before they changed.
+        :return: The `NEODatabase` of the data files after they changed.
+        :raise ValueError: If the new records conflict with the records in the database.
+        """
+        if self.error is not None:
+            return database
+        if self.database is not None:
+            return self.database
+        database.extend(self.neos, self.approaches)
+        return database
+
+    def __str__(self):
+        """Return `str(self)`, a description of this update."""
+        if self.error is not None:
+            return f"Unable to load the changes to the data files: {self.error}"
+        if self.database is not None:
+            return "Reloaded the data files, since existing records in them changed."
+        return (f"Loaded {len(self.neos)} new NEOs and {len(self.approaches)} new close approaches "
+                "from the data files.")
+
+
+class _WatchedFile:
+    """A file that is watched for changes, any of which calls for a rebuild."""
+    def __init__(self, path):
+        self.path = path
+        self.stat = _stat(path)
+        self.prepared = False
+
+    def changed(self):
+        """Return whether the file changed since the last time that it was read."""
+        return _stat(self.path) != self.stat
+
+    def prepare(self, stat=None):
+        """Take note of the contents of the file, unless it has changed from `stat`."""
+        current = _stat(self.path)
+        try:
+            noted = self.note()
+        except (OSError, ValueError):
+            noted = False
+        self.prepared = noted and stat in (None, current) and _stat(self.path) == current
+        # If the file already differs from `stat`, it is read again from scratch.
+        self.stat = current if stat is None else stat
+
+    def read_changes(self):
+        """Read the records appended to the file.
+
+        :return: A list of the new records, or None if existing records changed.
+        """
+        current = _stat(self.path)
+        if current == self.stat:
+            return []
+        self.stat = current
+        if not self.prepared:
+            return None
+        return self.read_appended()
+
+    def note(self):
+        """Take note of the contents of the file, returning whether that is possible."""
+        return False
+
+    def read_appended(self):
+        """Read the records appended to the file, after a successful `note`."""
+        return None
+
+
+class _WatchedCSVFile(_WatchedFile):
+    """A CSV file of NEOs, to which rows are appended."""
+    def note(self):
+        # Only whole lines have been loaded.
+        with open(self.path, 'rb') as infile:
+            self.offset = _end_of_last_line(infile)
+            self.digest = _digest(infile, 0, self.offset)
+        return True
+
+    def read_appended(self):
+        with open(self.path, 'rb') as infile:
+            if _digest(infile, 0, self.offset).digest() != self.digest.digest():
+                return None
+            infile.seek(0)
+            header = infile.readline()
+            infile.seek(self.offset)
+            data = infile.read()
+        data = data[:data.rfind(b'\n') + 1]
+        lines = io.StringIO(data.decode(), newline='')
+        neos = list(neos_from_lines(itertools.chain([header.decode()], lines)))
+        self.offset += len(data)
+        self.digest.update(data)
+        return neos
+
+
+class _WatchedJSONFile(_WatchedFile):
+    """A JSON file of close approaches, to whose `data` array records are appended."""
+    def note(self):
+        start = find_data_array(self.path)
+        with open(self.path, 'rb') as infile, \
+                mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            if EMPTY_ARRAY.match(mapped, start):
+                stop = start + 1
+            else:
+                match = DATA_END.search(mapped, start)
+                if not match:
+                    raise ValueError(f"The data array of {self.path} is incomplete.")
+                stop = match.start() + 1
+        # Keep the length of the array up to the end of its last record, as
+        # the array itself may start elsewhere once the file changes.
+        self.length = stop - start
+        with open(self.path, 'rb') as infile:
+            self.digest = _digest(infile, start, stop)
+        return True
+
+    def read_appended(self):
+        start = find_data_array(self.path)
+        with open(self.path, 'rb') as infile:
+            if _digest(infile, start, start + self.length).digest() != self.digest.digest():
+                return None
+            tail = infile.read()
+
+        text = tail.lstrip()
+        if text[:1] == b']':
+            return []
+        if self.length > 1:
+            # The new records follow the last of the old ones.
+            if text[:1] != b',':
+                return None
+            text = text[1:]
+        match = DATA_END.search(text)
+        if not match:
+            raise ValueError(f"The data array of {self.path} is incomplete.")
+        records = json.loads(b'[' + text[:match.start() + 1] + b']')
+        appended = tail[:len(tail) - len(text) + match.start() + 1]
+        self.length += len(appended)
+        self.digest.update(appended)
+        return list(approaches_from_records(records))
+
+
+def _stat(path):
+    """Return the size and modification time of a file, or None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _end_of_last_line(infile):
+    """Return the offset just after the last line ending of a binary file, or 0 if there is none."""
+    position = infile.seek(0, os.SEEK_END)
+    while position > 0:
+        size = min(CHUNK_SIZE, position)
+        position -= size
+        infile.seek(position)
+        newline = infile.read(size).rfind(b'\n')
+        if newline >= 0:
+            return position + newline + 1
+    return 0
+
+
+def _digest(infile, start, stop):
+    """Return a digest of a range of bytes of a binary file."""
+    digest = hashlib.blake2b()
+    infile.seek(start)
+    remaining = stop - start
+    while remaining > 0:
+        chunk = infile.read(min(CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        digest.update(chunk)
+        remaining -= len(chunk)
+    return digest
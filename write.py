@@ -1,6 +1,7 @@
 """Write a stream of close approaches to CSV or to JSON.
 
-This module exports two functions: `write_to_csv` and `write_to_json`, each of
+This module exports four functions: `write_to_csv`, `write_to_json`,
+`write_to_ndjson` (for newline-delimited JSON), and `write_to_sqlite`, each of
 which accept an `results` stream of close approaches and a path to which to
 write the data.
 
@@ -8,12 +9,86 @@ These functions are invoked by the main module with the output of the `limit`
 function and the filename supplied by the user at the command line. The file's
 extension determines which of these functions is used.
 
+The `write_table_to_csv` and `write_table_to_json` functions similarly write a
+table of rows (such as the summaries of the `aggregate` subcommand) to CSV or
+to JSON.
+
 You'll edit this file in Part 4.
 """
 import csv
 import json
+import math
+import os
+import sqlite3
+import tempfile
+import time
+from itertools import islice
+from json.encoder import encode_basestring_ascii
+
 from helpers import datetime_to_str
 
+
+# The size of the write buffer of each output file, in bytes.
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+# The header of the CSV output.
+CSV_FIELDNAMES = ('datetime_utc', 'distance_au', 'velocity_km_s',
+                  'designation', 'name', 'diameter_km', 'potentially_hazardous')
+
+# The number of rows to insert into a SQLite database at a time.
+SQLITE_BATCH_SIZE = 10000
+
+# The schema of the SQLite output, and the indexes that are built once the data is loaded.
+SQLITE_SCHEMA = (
+    """CREATE TABLE neos (
+        id INTEGER PRIMARY KEY,
+        designation TEXT NOT NULL,
+        name TEXT,
+        diameter_km REAL,
+        potentially_hazardous INTEGER NOT NULL
+    )""",
+    """CREATE TABLE approaches (
+        id INTEGER PRIMARY KEY,
+        neo_id INTEGER REFERENCES neos (id),
+        datetime_utc TEXT NOT NULL,
+        distance_au REAL NOT NULL,
+        velocity_km_s REAL NOT NULL
+    )""",
+)
+SQLITE_INDEXES = (
+    'CREATE UNIQUE INDEX neos_designation ON neos (designation)',
+    'CREATE INDEX approaches_neo_id ON approaches (neo_id)',
+    'CREATE INDEX approaches_datetime_utc ON approaches (datetime_utc)',
+    'CREATE INDEX approaches_distance_au ON approaches (distance_au)',
+)
+
+# The template of each element of the JSON output, indented as by `json.dump(..., indent=4)`.
+JSON_ENTRY = """\
+    {
+        "datetime_utc": %s,
+        "distance_au": %s,
+        "velocity_km_s": %s,
+        "neo": %s
+    }"""
+JSON_NEO = """{
+            "designation": %s,
+            "name": %s,
+            "diameter_km": %s,
+            "potentially_hazardous": %s
+        }"""
+
+# The templates of each line of the newline-delimited JSON output.
+NDJSON_ENTRY = '{"datetime_utc": %s, "distance_au": %s, "velocity_km_s": %s, "neo": %s}\n'
+NDJSON_NEO = '{"designation": %s, "name": %s, "diameter_km": %s, "potentially_hazardous": %s}'
+
+# The newline-delimited JSON output is flushed to disk, a whole number of lines
+# at a time, after this many records or once this many seconds have passed
+# since the last flush, whichever comes first. The batch of records is kept
+# well below `WRITE_BUFFER_SIZE`, so the file buffer never spills a partial line.
+NDJSON_FLUSH_RECORDS = 1000
+NDJSON_FLUSH_INTERVAL = 0.5
+
+
 def write_to_csv(results, filename):
     """Write an iterable of `CloseApproach` objects to a CSV file.
 
@@ -21,27 +96,27 @@ def write_to_csv(results, filename):
     corresponds to the information in a single close approach from the `results`
     stream and its associated near-Earth object.
 
+    Each row is formatted as a tuple and handed straight to the `csv` writer,
+    which writes the rows through a 1 MiB file buffer as they stream in.
+
     :param results: An iterable of `CloseApproach` objects.
     :param filename: A Path-like object pointing to where the data should be saved.
     """
-    fieldnames = (
-        'datetime_utc', 'distance_au', 'velocity_km_s',
-        'designation', 'name', 'diameter_km', 'potentially_hazardous'
-    )
-    field_names = {'time': 'datetime_utc', 'distance': 'distance_au', 'velocity': 'velocity_km_s', '_designation': 'designation', 'name': 'name', 'diameter': 'diameter_km', 'hazardous': 'potentially_hazardous'}
-
-    if not results:
-        with open(filename, 'w') as csv_outfile:
-            writer = csv.writer(csv_outfile)
-            writer.writerow(fieldnames)
-
-    # ELABORATE: https://stackoverflow.com/questions/59291949/change-column-headers-using-dictwriter
-    with open(filename, 'w', newline='') as csv_outfile:
-        writer = csv.DictWriter(csv_outfile, fieldnames=field_names, extrasaction='ignore')
-        writer.writerow(field_names)
+    with open(filename, 'w', newline='', buffering=WRITE_BUFFER_SIZE) as csv_outfile:
+        writer = csv.writer(csv_outfile)
+        writer.writerow(CSV_FIELDNAMES)
+        writer.writerows(map(_csv_row, results))
+
+
+def _csv_row(approach):
+    """Format a close approach (and its NEO) as a row of the CSV output."""
+    neo = approach.neo
+    if neo is None:
+        return (datetime_to_str(approach.time), approach.distance, approach.velocity,
+                approach._designation, '', math.nan, False)
+    return (datetime_to_str(approach.time), approach.distance, approach.velocity,
+            neo.designation, neo.name or '', neo.diameter, neo.hazardous)
 
-        for elem in results:
-            writer.writerow(elem.__dict__)
 
 def write_to_json(results, filename):
     """Write an iterable of `CloseApproach` objects to a JSON file.
@@ -51,26 +126,172 @@ def write_to_json(results, filename):
     their values and the 'neo' key mapping to a dictionary of the associated
     NEO's attributes.
 
+    The list is streamed to the file one element at a time, so the results are
+    never all held in memory at once. The output is byte-for-byte what
+    `json.dump(..., indent=4)` would write for the whole list.
+
     :param results: An iterable of `CloseApproach` objects.
     :param filename: A Path-like object pointing to where the data should be saved.
     """
-    fieldnames = (
-        'datetime_utc', 'neo', 'distance_au', 'velocity_km_s',
-        'designation', 'name', 'diameter_km', 'potentially_hazardous'
-    )
+    with open(filename, 'w', buffering=WRITE_BUFFER_SIZE) as json_outfile:
+        separator = '[\n'
+        for elem in results:
+            json_outfile.write(separator)
+            json_outfile.write(_json_entry(elem))
+            separator = ',\n'
+        json_outfile.write('\n]' if separator == ',\n' else '[]')
+
 
-    json_list = []
-    with open(filename, 'w') as json_outfile:
+def write_to_ndjson(results, filename):
+    """Write an iterable of `CloseApproach` objects to a newline-delimited JSON file.
+
+    Each line of the output is a JSON object for a single close approach, laid
+    out as an element of the `write_to_json` output (but on one line, as by
+    `json.dumps`). The lines are written as the results stream in, so another
+    process can consume them while the file is still being written.
+
+    The lines are flushed in batches (see `NDJSON_FLUSH_RECORDS` and
+    `NDJSON_FLUSH_INTERVAL`), so a reader that tails the file only ever sees
+    whole lines.
+
+    :param results: An iterable of `CloseApproach` objects.
+    :param filename: A Path-like object pointing to where the data should be saved.
+    """
+    with open(filename, 'w', buffering=WRITE_BUFFER_SIZE) as ndjson_outfile:
+        batch, flushed = [], time.monotonic()
         for elem in results:
-            print(elem.__dict__['neo'])
-            result_dict = dict(datetime_utc=datetime_to_str(elem.__dict__['time']), distance_au=elem.__dict__['distance'],
-                velocity_km_s=elem.__dict__['velocity'], neo={
-                "designation": elem.__dict__['neo'].designation,
-                "name": elem.__dict__['neo'].name,
-                "diameter_km": elem.__dict__['neo'].diameter,
-                "potentially_hazardous": elem.__dict__['neo'].hazardous
-            })
-            json_list.append(result_dict)
-        json.dump(json_list, json_outfile, indent=4)
+            batch.append(_json_entry(elem, NDJSON_ENTRY, NDJSON_NEO))
+            if len(batch) >= NDJSON_FLUSH_RECORDS or time.monotonic() - flushed >= NDJSON_FLUSH_INTERVAL:
+                ndjson_outfile.write(''.join(batch))
+                ndjson_outfile.flush()
+                batch, flushed = [], time.monotonic()
+        ndjson_outfile.write(''.join(batch))
+
+
+def write_to_sqlite(results, filename):
+    """Write an iterable of `CloseApproach` objects to a SQLite database.
+
+    The database has a `neos` table, with a row for each distinct NEO in the
+    results, and an `approaches` table, with a row for each close approach that
+    refers to its NEO's row by `neo_id`. The columns are named as in the CSV
+    output; a missing name or diameter is NULL, the hazard flag is 0 or 1, and
+    the approach time is a 'YYYY-MM-DD HH:MM' string. As in the CSV output, a
+    close approach without a known NEO refers to a row with just the
+    designation of its NEO (and an unknown name and diameter, and a hazard
+    flag of 0).
+
+    The rows are inserted in batches within a single transaction, and the
+    indexes are only built after all of the rows are in place. The database is
+    built in a temporary file that then replaces any existing file, so an error
+    part way through leaves the existing file untouched.
+
+    :param results: An iterable of `CloseApproach` objects.
+    :param filename: A Path-like object pointing to where the data should be saved.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    descriptor, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(descriptor)
+    try:
+        # Give the file the permissions of a newly created one, not of a private temporary file.
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temporary, 0o666 & ~umask)
+        _load_sqlite(results, temporary)
+        os.replace(temporary, filename)
+    except BaseException:
+        os.unlink(temporary)
+        raise
+
+
+def _load_sqlite(results, filename):
+    """Load close approaches into a new SQLite database, as described by `write_to_sqlite`."""
+    connection = sqlite3.connect(filename, isolation_level=None)
+    try:
+        # The file is a temporary one that is discarded if anything goes wrong,
+        # so there is nothing to protect from a crash part way through.
+        connection.execute('PRAGMA journal_mode = OFF')
+        connection.execute('PRAGMA synchronous = OFF')
+        connection.execute('BEGIN')
+        for statement in SQLITE_SCHEMA:
+            connection.execute(statement)
+
+        neo_ids = {}
+        results = iter(results)
+        while True:
+            batch = list(islice(results, SQLITE_BATCH_SIZE))
+            if not batch:
+                break
+            neo_rows, approach_rows = [], []
+            for approach in batch:
+                neo = approach.neo
+                designation = approach._designation if neo is None else neo.designation
+                neo_id = neo_ids.get(designation)
+                if neo_id is None:
+                    neo_id = neo_ids[designation] = len(neo_ids) + 1
+                    if neo is None:
+                        neo_rows.append((neo_id, designation, None, None, False))
+                    else:
+                        neo_rows.append((neo_id, designation, neo.name,
+                                         None if math.isnan(neo.diameter) else neo.diameter,
+                                         neo.hazardous))
+                approach_rows.append((neo_id, datetime_to_str(approach.time),
+                                      approach.distance, approach.velocity))
+            connection.executemany('INSERT INTO neos VALUES (?, ?, ?, ?, ?)', neo_rows)
+            connection.executemany('INSERT INTO approaches (neo_id, datetime_utc, distance_au, '
+                                   'velocity_km_s) VALUES (?, ?, ?, ?)', approach_rows)
+
+        for statement in SQLITE_INDEXES:
+            connection.execute(statement)
+        connection.execute('COMMIT')
+    finally:
+        connection.close()
+
+
+def write_table_to_csv(rows, fieldnames, filename):
+    """Write a table of rows to a CSV file, under a header of its field names.
+
+    :param rows: An iterable of dictionaries, each mapping the field names to values.
+    :param fieldnames: The names of the fields of each row, in order.
+    :param filename: A Path-like object pointing to where the data should be saved.
+    """
+    with open(filename, 'w', newline='', buffering=WRITE_BUFFER_SIZE) as csv_outfile:
+        writer = csv.DictWriter(csv_outfile, fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_table_to_json(rows, filename):
+    """Write a table of rows to a JSON file, as a list of objects.
+
+    :param rows: An iterable of dictionaries, each mapping field names to values.
+    :param filename: A Path-like object pointing to where the data should be saved.
+    """
+    with open(filename, 'w', buffering=WRITE_BUFFER_SIZE) as json_outfile:
+        json.dump(list(rows), json_outfile, indent=4)
+
+
+def _json_entry(approach, entry_template=JSON_ENTRY, neo_template=JSON_NEO):
+    """Encode a close approach (and its NEO) as an element of the JSON output."""
+    neo = approach.neo
+    if neo is None:
+        encoded_neo = 'null'
+    else:
+        encoded_neo = neo_template % (encode_basestring_ascii(neo.designation),
+                                      encode_basestring_ascii(neo.name or ''),
+                                      _json_float(neo.diameter),
+                                      'true' if neo.hazardous else 'false')
+    return entry_template % (encode_basestring_ascii(datetime_to_str(approach.time)),
+                             _json_float(approach.distance),
+                             _json_float(approach.velocity),
+                             encoded_neo)
 
 
+def _json_float(value):
+    """Encode a float as the `json` module does, including its spelling of NaN and infinities."""
+    if value != value:
+        return 'NaN'
+    if value == math.inf:
+        return 'Infinity'
+    if value == -math.inf:
+        return '-Infinity'
+    return float.__repr__(value)